@@ -1,2 +1,72 @@
 APP_NAME = "Sistema de Controle de Estoque"
-APP_VERSION = "1.0.0"
\ No newline at end of file
+APP_VERSION = "1.0.0"
+
+# Perfil de desempenho do SQLite, aplicado a toda conexão aberta
+# WAL permite leituras (ex.: aba de análises) enquanto uma venda é gravada
+DB_JOURNAL_MODE = "WAL"
+# NORMAL é seguro com WAL e evita um fsync completo a cada commit
+DB_SYNCHRONOUS = "NORMAL"
+# Valor negativo = tamanho em KiB (aprox. 20 MB de cache de páginas)
+DB_CACHE_SIZE = -20000
+# Leitura do arquivo via mmap (bytes); 0 desativa
+DB_MMAP_SIZE = 256 * 1024 * 1024
+DB_TEMP_STORE = "MEMORY"
+# Tempo (ms) de espera por um lock antes de falhar com "database is locked"
+DB_BUSY_TIMEOUT = 5000
+DB_FOREIGN_KEYS = True
+
+# Instrumentação de SQL (tempo por consulta e log de consultas lentas)
+# Também pode ser ligada em tempo de execução em Ferramentas > Manutenção do Banco
+SQL_INSTRUMENTATION_ENABLED = False
+# Consultas acima deste tempo (ms) têm o plano (EXPLAIN QUERY PLAN) registrado
+SQL_SLOW_QUERY_MS = 50
+# Log rotativo: tamanho máximo de cada arquivo (bytes) e quantos arquivos manter
+SQL_LOG_MAX_BYTES = 1024 * 1024
+SQL_LOG_BACKUP_COUNT = 3
+# Quantas durações recentes guardar por consulta para calcular p50/p95
+SQL_STATS_SAMPLES = 500
+
+# Razão de estoque: um novo snapshot de saldos é gravado na inicialização
+# quando o último tem mais de N dias ou há muitas linhas depois dele
+STOCK_SNAPSHOT_INTERVAL_DAYS = 7
+STOCK_SNAPSHOT_MAX_PENDING = 5000
+
+# Importação de produtos (CSV/XLSX): linhas gravadas por transação
+IMPORT_CHUNK_SIZE = 1000
+
+# Reservas de estoque: validade padrão e varredura das reservas vencidas
+RESERVA_VALIDADE_HORAS = 48
+RESERVA_SWEEP_INTERVAL_SECONDS = 60
+RESERVA_SWEEP_BATCH = 500
+
+# Cache dos resultados das análises (AnalyticsService): quantas consultas
+# guardar e por quanto tempo, no máximo, um resultado vale sem nova escrita
+ANALYTICS_CACHE_SIZE = 128
+ANALYTICS_CACHE_TTL_SECONDS = 300
+
+# Pool de leitura (conexões somente leitura) usado para carregar o dashboard
+# com as consultas em paralelo; orçamento total e limite de cada consulta
+READER_POOL_THREADS = 4
+DASHBOARD_TIME_BUDGET_SECONDS = 10
+DASHBOARD_QUERY_TIMEOUT_SECONDS = 5
+
+# Motor de análises em memória (NumPy, services/analytics_engine.py): os
+# métodos do AnalyticsService marcados com True calculam sobre as
+# movimentações carregadas em memória em vez de consultar o SQL. Sem o
+# numpy instalado, ou com False, o método usa a consulta SQL
+ANALYTICS_ENGINE_METHODS = {
+    "get_sales_chart_data": True,
+    "get_profit_chart_data": True,
+    "get_top_products_data": True,
+    "get_turnover_analysis": True,
+    "get_profit_margins": True,
+    "get_monthly_summary": True,
+    "get_abc_curve": True,
+}
+# Intervalo máximo (s) para o motor perceber remoções e produtos alterados
+# por outro terminal (as escritas desta aplicação são vistas na hora)
+ANALYTICS_ENGINE_VERIFY_SECONDS = 300
+
+# Curva ABC: percentual acumulado do faturamento que fecha as classes A e B
+ANALYTICS_ABC_LIMITE_A = 80
+ANALYTICS_ABC_LIMITE_B = 95
@@ -10,9 +10,9 @@ class CaixaController:
         """Abre um novo caixa."""
         return self.service.abrir_caixa(valor_abertura)
 
-    def fechar_caixa(self, caixa_id: int, valor_fechamento: float) -> dict:
+    def fechar_caixa(self, caixa_id: int, valor_fechamento: float, versao: int | None = None) -> dict:
         """Fecha o caixa."""
-        return self.service.fechar_caixa(caixa_id, valor_fechamento)
+        return self.service.fechar_caixa(caixa_id, valor_fechamento, versao)
 
     def get_caixa_hoje(self) -> dict | None:
         """Retorna caixa de hoje."""
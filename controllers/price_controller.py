@@ -0,0 +1,32 @@
+from services.price_service import PriceService
+
+class PriceController:
+    '''
+    Controlador responsável pelos reajustes de preço em lote.
+    '''
+    def __init__(self):
+        self.service = PriceService()
+
+    def preview(self, modo, valor, tag_id=None, termo=None, produto_ids=None):
+        try:
+            produtos = self.service.preview(modo, valor, tag_id, termo, produto_ids)
+            return {"success": True, "produtos": produtos}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def apply(self, modo, valor, descricao="", tag_id=None, termo=None, produto_ids=None):
+        try:
+            resultado = self.service.apply(modo, valor, descricao, tag_id, termo, produto_ids)
+            return {"success": True, **resultado}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def undo(self, reajuste_id):
+        try:
+            resultado = self.service.undo(reajuste_id)
+            return {"success": True, **resultado}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def list_reajustes(self):
+        return self.service.list_reajustes()
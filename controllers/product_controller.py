@@ -1,4 +1,6 @@
 from services.product_service import ProductService
+from services.product_import_service import ProductImportService
+from services.exceptions import VersionConflictError
 
 class ProductController:
     '''
@@ -7,6 +9,7 @@ class ProductController:
 
     def __init__(self):
         self.service = ProductService()
+        self.import_service = ProductImportService()
 
     def create_product(
             self,
@@ -43,7 +46,8 @@ class ProductController:
             data_validade,
             ativo,
             tag_ids,
-            estoque_minimo
+            estoque_minimo,
+            versao=None
     ):
         try:
             self.service.update_product(
@@ -55,11 +59,17 @@ class ProductController:
                 data_validade,
                 ativo,
                 tag_ids,
-                estoque_minimo
+                estoque_minimo,
+                versao
             )
             return {"success": True}
+        except VersionConflictError as e:
+            return {"success": False, "error": str(e), "conflito": True}
         except ValueError as e:
             return {"success": False, "error": str(e)}
+
+    def get_product(self, produto_id):
+        return self.service.get_product(produto_id)
         
     def list_products(self):
         return self.service.list_products()
@@ -69,6 +79,9 @@ class ProductController:
     
     def products_near_expiration(self, days):
         return self.service.get_products_near_expiration(days)
+
+    def expiring_lots(self, days):
+        return self.service.get_expiring_lots(days)
     
     def get_tags_by_product(self, produto_id):
         return self.service.product_tag_repo.get_tags_by_product(produto_id)
@@ -76,3 +89,13 @@ class ProductController:
     def search_by_name_or_tag(self, termo):
         return self.service.search_products_by_name_or_tag(termo)
 
+    def import_products(self, path):
+        """Importa produtos de um arquivo CSV/XLSX."""
+        try:
+            resultado = self.import_service.import_file(path)
+            return {"success": True, "importados": resultado["importados"], "erros": resultado["erros"]}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def save_import_errors(self, erros, path):
+        self.import_service.write_error_report(erros, path)
@@ -0,0 +1,34 @@
+import config
+from services.reserva_service import ReservaService
+
+
+class ReservaController:
+    '''
+    Controlador responsável pelas reservas de estoque.
+    '''
+    def __init__(self):
+        self.service = ReservaService()
+
+    def reservar(self, produto_id, quantidade, cliente, horas=config.RESERVA_VALIDADE_HORAS, observacao=""):
+        try:
+            reserva_id = self.service.reservar(produto_id, quantidade, cliente, horas, observacao)
+            return {"success": True, "reserva_id": reserva_id}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def liberar(self, reserva_id):
+        try:
+            self.service.liberar(reserva_id)
+            return {"success": True}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def converter_em_venda(self, reserva_id, fiado=False):
+        try:
+            venda = self.service.converter_em_venda(reserva_id, fiado)
+            return {"success": True, **venda}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    def list_reservas_ativas(self):
+        return self.service.list_reservas_ativas()
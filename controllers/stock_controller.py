@@ -13,14 +13,16 @@ class StockController:
         quantidade: int,
         observacao: str = "",
         fiado: bool = False,
-        cliente: str | None = None
+        cliente: str | None = None,
+        data_validade: str | None = None
     ):
         try:
             if tipo == "ENTRADA":
                 self.service.entrada_produto(
                     produto_id=produto_id,
                     quantidade=quantidade,
-                    observacao=observacao
+                    observacao=observacao,
+                    data_validade=data_validade
                 )
 
             elif tipo == "SAIDA":
@@ -46,6 +48,44 @@ class StockController:
                 "error": str(e)
             }
 
+    def register_batch(self, tipo: str, itens: list[tuple[int, int, str]]):
+        """Registra várias movimentações (produto_id, quantidade, observacao[, data_validade]) de uma vez."""
+        try:
+            if tipo == "ENTRADA":
+                total = self.service.entrada_lote(itens)
+            elif tipo == "SAIDA":
+                total = self.service.saida_lote(itens)
+            else:
+                return {
+                    "success": False,
+                    "error": "Tipo de movimentação inválido"
+                }
+
+            return {"success": True, "total": total}
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def registrar_venda(
+        self,
+        itens: list[tuple[int, int]],
+        fiado: bool = False,
+        cliente: str | None = None,
+        observacao: str = ""
+    ):
+        """Finaliza uma venda com vários itens (produto_id, quantidade)."""
+        try:
+            venda = self.service.registrar_venda(itens, fiado=fiado, cliente=cliente, observacao=observacao)
+            return {"success": True, "venda_id": venda["venda_id"], "total": venda["total"]}
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
     def list_open_fiados(self):
         try:
             fiados = self.service.list_open_fiados()
@@ -60,6 +100,20 @@ class StockController:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def pagar_fiados_cliente(self, cliente: str, ids: list[int] | None = None):
+        try:
+            resultado = self.service.pagar_fiados_cliente(cliente, ids)
+            return {"success": True, "pagos": resultado["pagos"], "total": resultado["total"]}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def list_fiado_clientes(self):
+        try:
+            clientes = self.service.list_fiado_clientes()
+            return {"success": True, "clientes": clientes}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
     def delete_fiado(self, fiado_id: int):
         try:
             self.service.remove_fiado(fiado_id)
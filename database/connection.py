@@ -1,6 +1,11 @@
+import atexit
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import sys
+import config
+from database.migrations import migrate
 
 # Caminho para o arquivo do banco de dados SQLite
 # Usa a pasta do usuário para persistir dados mesmo quando executado como .exe
@@ -17,40 +22,216 @@ def get_db_path():
 
 DB_PATH = get_db_path()
 
-def get_connection():
-    # Cria e retorna uma conexão com o banco de dados SQLite
-    # Define o row_factory para sqlite3.Row para acessar colunas por nome
-    try:
-        conn = sqlite3.connect(DB_PATH)
+
+def apply_performance_profile(conn, read_only=False):
+    # Aplica o perfil de desempenho definido em config.py à conexão
+    # Conexões somente leitura não alteram o modo do journal (quem define o
+    # WAL é a conexão de escrita) e recusam qualquer escrita com query_only
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn.execute(f"PRAGMA journal_mode = {config.DB_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous = {config.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = {int(config.DB_CACHE_SIZE)}")
+    conn.execute(f"PRAGMA mmap_size = {int(config.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA temp_store = {config.DB_TEMP_STORE}")
+    conn.execute(f"PRAGMA busy_timeout = {int(config.DB_BUSY_TIMEOUT)}")
+    conn.execute(f"PRAGMA foreign_keys = {'ON' if config.DB_FOREIGN_KEYS else 'OFF'}")
+
+
+class ConnectionManager:
+    """
+    Gerencia conexões SQLite reutilizáveis, uma por thread.
+
+    A primeira chamada em uma thread abre a conexão; as seguintes reutilizam
+    a mesma. Todas as conexões abertas ficam registradas para que possam ser
+    fechadas explicitamente no encerramento da aplicação (ou antes de
+    substituir o arquivo do banco, como na restauração de backup).
+
+    Threads marcadas com mark_reader() (as do pool de leitura) recebem uma
+    conexão somente leitura (mode=ro): com WAL elas leem o último commit
+    sem bloquear nem serem bloqueadas pela conexão que grava.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        # Papel de cada thread; fica fora de _local para sobreviver ao close_all()
+        self._roles = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    @property
+    def transaction_depth(self):
+        # Quantos unit_of_work() estão abertos na thread atual
+        return getattr(self._local, "depth", 0)
+
+    @transaction_depth.setter
+    def transaction_depth(self, value):
+        self._local.depth = value
+
+    def mark_reader(self):
+        # As próximas conexões abertas pela thread atual serão somente leitura
+        self._roles.reader = True
+
+    def is_reader(self):
+        return getattr(self._roles, "reader", False)
+
+    def _open(self):
+        # check_same_thread=False permite que close_all() feche conexões
+        # de outras threads no encerramento; o uso normal continua
+        # restrito à thread dona da conexão.
+        if self.is_reader():
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        apply_performance_profile(conn, read_only=self.is_reader())
+        return conn
+
+    def get(self):
+        # Retorna a conexão da thread atual, abrindo-a se necessário
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.add(conn)
         return conn
+
+    def close(self):
+        # Fecha a conexão da thread atual (se existir)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.discard(conn)
+        conn.close()
+
+    def close_all(self):
+        # Fecha todas as conexões abertas por qualquer thread.
+        # Threads que usarem o banco depois disso recebem uma conexão nova.
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_manager = ConnectionManager(DB_PATH)
+atexit.register(_manager.close_all)
+
+
+# Geração dos dados: contador global incrementado a cada escrita feita pelos
+# repositórios (e no commit de cada unit_of_work). Caches de consultas
+# guardam a geração em que foram calculados e descartam o resultado quando
+# ela muda. Escritas de outros processos no mesmo arquivo não passam por
+# aqui; para elas vale a validade (TTL) de cada cache.
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def data_generation() -> int:
+    # Geração atual dos dados
+    return _generation
+
+def bump_data_generation():
+    # Marca que os dados mudaram
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def get_connection():
+    # Retorna a conexão reutilizável da thread atual com o banco SQLite
+    # O row_factory é sqlite3.Row para acessar colunas por nome
+    try:
+        return _manager.get()
     except sqlite3.Error as e:
         raise Exception(f"Erro ao conectar ao banco de dados: {e}")
 
+def close_connection():
+    # Fecha a conexão da thread atual
+    _manager.close()
+
+def close_all_connections():
+    # Fecha todas as conexões abertas (encerramento ou troca do arquivo do banco)
+    _manager.close_all()
+    bump_data_generation()
+
+def use_read_only_connection():
+    # Marca a thread atual como leitora: get_connection() passa a devolver uma
+    # conexão somente leitura (usado como initializer do pool de leitura)
+    _manager.mark_reader()
+
+def in_unit_of_work():
+    # Indica se a thread atual está dentro de um unit_of_work()
+    return _manager.transaction_depth > 0
+
+@contextmanager
+def unit_of_work():
+    """
+    Agrupa várias chamadas de repositório em uma única transação.
+
+    Os repositórios usam a mesma conexão da thread e, enquanto houver um
+    unit_of_work aberto, não fazem commit por conta própria: tudo é
+    confirmado uma única vez na saída do bloco, ou desfeito se ocorrer
+    qualquer exceção. Blocos aninhados usam SAVEPOINT, de modo que uma
+    falha interna capturada pelo chamador desfaz apenas a parte interna.
+
+    Uso:
+        with unit_of_work():
+            product_repo.update(...)
+            stock_repo.register(...)
+    """
+    conn = get_connection()
+    depth = _manager.transaction_depth
+    if depth == 0:
+        # IMMEDIATE reserva o lock de escrita já no início, evitando que
+        # outro terminal altere os dados lidos durante a operação
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.execute(f"SAVEPOINT uow_{depth}")
+    _manager.transaction_depth = depth + 1
+
+    try:
+        yield conn
+    except BaseException:
+        _manager.transaction_depth = depth
+        if depth == 0:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO uow_{depth}")
+            conn.execute(f"RELEASE uow_{depth}")
+        # As escritas desfeitas já tinham incrementado a geração, e leituras
+        # desta thread dentro do bloco podem ter guardado em cache dados que
+        # não existem mais
+        bump_data_generation()
+        raise
+    else:
+        _manager.transaction_depth = depth
+        if depth == 0:
+            conn.commit()
+            # Leituras feitas durante a transação (por outras threads) podem
+            # ter visto os dados anteriores: invalida de novo após o commit
+            bump_data_generation()
+        else:
+            conn.execute(f"RELEASE uow_{depth}")
+
 def initialize_database():
-    # Inicializa o banco de dados executando o script SQL do schema
+    # Inicializa o banco de dados aplicando as migrações pendentes do schema
+    # (em um banco já atualizado é apenas a leitura de PRAGMA user_version)
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Caminho para o arquivo schema.sql
-        Schema_path = Path(__file__).parent / "schema.sql"
-        # Lé e executa o script SQL para criar as tabelas
-        with open(Schema_path, "r", encoding="utf-8") as f: cursor.executescript(f.read())
-
-        # Migração: Adicionar coluna observacao em fiados se não existir(Estava dando erro lembrar de apagar depois)
-        try:
-            cursor.execute("ALTER TABLE fiados ADD COLUMN observacao TEXT")
-        except sqlite3.OperationalError:
-            # Coluna já existe, ignorar
-            pass
-
-        # Confirma as mudanças e fecha a conexão
-        conn.commit()
-        conn.close()
+        migrate(get_connection())
     except FileNotFoundError:
         raise Exception("Arquivo schema.sql não encontrado.")
     except sqlite3.Error as e:
         raise Exception(f"Erro ao inicializar o banco de dados: {e}")
     except Exception as e:
-        raise Exception(f"Erro inesperado durante a inicialização: {e}")
\ No newline at end of file
+        raise Exception(f"Erro inesperado durante a inicialização: {e}")
@@ -0,0 +1,177 @@
+import logging
+import re
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import config
+from database.connection import DB_PATH
+
+# Arquivo de log das consultas (rotacionado), ao lado do banco de dados
+LOG_PATH = DB_PATH.parent / "sql_profile.log"
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normaliza uma consulta para agrupar as estatísticas: remove espaços
+    extras e troca literais e listas de "?" por um único marcador.
+    """
+    sql = _WHITESPACE.sub(" ", query).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("?, ...", sql)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _QueryStats:
+    """
+    Amostras de uma consulta normalizada.
+
+    `durations` guarda só as últimas config.SQL_STATS_SAMPLES durações (para
+    p50/p95); total_ms e max_ms cobrem todas as chamadas desde o reset.
+    """
+
+    __slots__ = ("sql", "call_sites", "durations", "count", "rows", "total_ms", "max_ms", "plan")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.call_sites = set()
+        self.durations = deque(maxlen=config.SQL_STATS_SAMPLES)
+        self.count = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.plan = None
+
+
+class SqlInstrumentation:
+    """
+    Instrumentação opcional das consultas feitas pelos repositórios.
+
+    Quando ativa, BaseRepository informa cada consulta executada: SQL
+    normalizado, local da chamada (método do repositório), duração e
+    número de linhas. Os dados vão para um log rotativo e para uma tabela
+    em memória com p50/p95/máximo por consulta. Consultas acima de
+    config.SQL_SLOW_QUERY_MS têm o EXPLAIN QUERY PLAN registrado no log.
+    """
+
+    def __init__(self):
+        self.enabled = config.SQL_INSTRUMENTATION_ENABLED
+        self.slow_query_ms = config.SQL_SLOW_QUERY_MS
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._logger = None
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def _get_logger(self):
+        if self._logger is None:
+            logger = logging.getLogger("estoque.sql")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(
+                LOG_PATH,
+                maxBytes=config.SQL_LOG_MAX_BYTES,
+                backupCount=config.SQL_LOG_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def record(self, conn, query: str, params, call_site: str, duration_ms: float, rows: int):
+        sql = normalize_sql(query)
+
+        with self._lock:
+            stats = self._stats.get(sql)
+            if stats is None:
+                stats = self._stats[sql] = _QueryStats(sql)
+            stats.call_sites.add(call_site)
+            stats.durations.append(duration_ms)
+            stats.count += 1
+            stats.rows += max(rows, 0)
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            needs_plan = duration_ms >= self.slow_query_ms and stats.plan is None
+
+        logger = self._get_logger()
+        if duration_ms < self.slow_query_ms:
+            logger.info("%.2fms rows=%d %s | %s", duration_ms, rows, call_site, sql)
+            return
+
+        if needs_plan:
+            stats.plan = self._explain(conn, query, params)
+        logger.warning(
+            "LENTA %.2fms rows=%d %s | %s\n%s",
+            duration_ms, rows, call_site, sql, stats.plan or "(plano indisponível)"
+        )
+
+    def _explain(self, conn, query: str, params):
+        # executemany recebe uma lista de parâmetros: usa o primeiro conjunto
+        if isinstance(params, list):
+            params = params[0] if params else ()
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        except sqlite3.Error:
+            return None
+        return "\n".join(f"  {row[3]}" for row in rows)
+
+    def stats(self) -> list[dict]:
+        """Estatísticas por consulta, ordenadas pelo tempo total."""
+        with self._lock:
+            snapshot = list(self._stats.values())
+
+        result = []
+        for stats in snapshot:
+            durations = sorted(stats.durations)
+            result.append({
+                "sql": stats.sql,
+                "locais": ", ".join(sorted(stats.call_sites)),
+                "chamadas": stats.count,
+                "linhas": stats.rows,
+                "p50_ms": _percentile(durations, 50),
+                "p95_ms": _percentile(durations, 95),
+                "max_ms": stats.max_ms,
+                "total_ms": stats.total_ms,
+                "plano": stats.plan,
+            })
+        result.sort(key=lambda item: item["total_ms"], reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def dump(self, path) -> None:
+        """Grava a tabela de estatísticas em um arquivo texto."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Estatísticas de SQL - {datetime.now():%d-%m-%Y %H:%M:%S}\n\n")
+            for item in self.stats():
+                f.write(
+                    f"chamadas={item['chamadas']} linhas={item['linhas']} "
+                    f"p50={item['p50_ms']:.2f}ms p95={item['p95_ms']:.2f}ms "
+                    f"max={item['max_ms']:.2f}ms total={item['total_ms']:.2f}ms\n"
+                )
+                f.write(f"  local: {item['locais']}\n")
+                f.write(f"  sql: {item['sql']}\n")
+                if item["plano"]:
+                    f.write(f"  plano:\n{item['plano']}\n")
+                f.write("\n")
+
+
+instrumentation = SqlInstrumentation()
@@ -0,0 +1,564 @@
+import sqlite3
+from pathlib import Path
+
+from utils.text import normalize_key
+
+# Migrações do schema do banco de dados
+#
+# A versão do schema fica gravada no próprio arquivo (PRAGMA user_version).
+# Cada passo é aplicado uma única vez, em ordem, dentro de uma transação
+# junto com a atualização da versão: se falhar, nada é gravado.
+#
+# database/schema.sql é a base (versão 1) e não deve mais ser alterado;
+# qualquer mudança no schema entra como um novo passo no fim de MIGRATIONS.
+
+SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+
+
+def _split_statements(script: str):
+    # Divide um script SQL em comandos completos (sem usar executescript,
+    # que faz COMMIT implícito e impediria rodar o passo em uma transação)
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement.strip()
+            statement = ""
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _001_schema_inicial(conn):
+    """Tabelas e índices de database/schema.sql"""
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        script = f.read()
+    for statement in _split_statements(script):
+        conn.execute(statement)
+
+    # Bancos criados antes da coluna observacao existir em fiados
+    if not _column_exists(conn, "fiados", "observacao"):
+        conn.execute("ALTER TABLE fiados ADD COLUMN observacao TEXT")
+
+
+def _002_vendas(conn):
+    """Vendas com vários itens (carrinho)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vendas(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            valor_total REAL NOT NULL,
+            fiado INTEGER NOT NULL DEFAULT 0,
+            cliente TEXT,
+            observacao TEXT,
+            data_venda DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Cada item aponta para a movimentação de SAIDA (venda à vista)
+    # ou para o registro de fiado (venda fiado) que gerou
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS venda_itens(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            venda_id INTEGER NOT NULL,
+            produto_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL,
+            valor_unitario REAL NOT NULL,
+            valor_total REAL NOT NULL,
+            movimentacao_id INTEGER,
+            fiado_id INTEGER,
+            FOREIGN KEY (venda_id) REFERENCES vendas(id) ON DELETE CASCADE,
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE,
+            FOREIGN KEY (movimentacao_id) REFERENCES movimentacoes(id) ON DELETE SET NULL,
+            FOREIGN KEY (fiado_id) REFERENCES fiados(id) ON DELETE SET NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vendas_data ON vendas(data_venda)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_venda_itens_venda ON venda_itens(venda_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_venda_itens_produto ON venda_itens(produto_id)")
+
+
+def _003_precos_movimentacoes(conn):
+    """Preço de venda e custo gravados em cada movimentação"""
+    if not _column_exists(conn, "movimentacoes", "valor_unitario"):
+        conn.execute("ALTER TABLE movimentacoes ADD COLUMN valor_unitario REAL")
+    if not _column_exists(conn, "movimentacoes", "custo_unitario"):
+        conn.execute("ALTER TABLE movimentacoes ADD COLUMN custo_unitario REAL")
+
+    # Pagamentos de fiado e itens de venda conhecem o preço praticado
+    conn.execute("""
+        UPDATE movimentacoes
+        SET valor_unitario = (
+            SELECT f.valor_unitario FROM fiados f WHERE f.movimentacao_id = movimentacoes.id
+        )
+        WHERE valor_unitario IS NULL
+          AND id IN (SELECT movimentacao_id FROM fiados WHERE movimentacao_id IS NOT NULL)
+    """)
+    conn.execute("""
+        UPDATE movimentacoes
+        SET valor_unitario = (
+            SELECT vi.valor_unitario FROM venda_itens vi WHERE vi.movimentacao_id = movimentacoes.id
+        )
+        WHERE valor_unitario IS NULL
+          AND id IN (SELECT movimentacao_id FROM venda_itens WHERE movimentacao_id IS NOT NULL)
+    """)
+    # Demais movimentações: melhor aproximação disponível é o preço atual
+    conn.execute("""
+        UPDATE movimentacoes
+        SET valor_unitario = COALESCE(
+                valor_unitario,
+                (SELECT p.valor_venda FROM produtos p WHERE p.id = movimentacoes.produto_id)
+            ),
+            custo_unitario = COALESCE(
+                custo_unitario,
+                (SELECT p.valor_compra FROM produtos p WHERE p.id = movimentacoes.produto_id)
+            )
+        WHERE valor_unitario IS NULL OR custo_unitario IS NULL
+    """)
+
+
+def _004_razao_estoque(conn):
+    """Razão de estoque (ledger) com snapshots por produto"""
+    # Toda alteração de quantidade de um produto gera uma linha com o delta
+    # e a origem; referencia_id aponta para o registro de origem
+    # (movimentação, fiado ou prejuízo), quando houver
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS estoque_ledger(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            delta INTEGER NOT NULL,
+            origem TEXT NOT NULL CHECK(origem IN (
+                'SALDO_INICIAL', 'ENTRADA', 'SAIDA', 'FIADO', 'PREJUIZO', 'ESTORNO', 'AJUSTE'
+            )),
+            referencia_id INTEGER,
+            data DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE
+        )
+    """)
+    # (produto_id) + rowid implícito: busca da "cauda" após um snapshot
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_estoque_ledger_produto ON estoque_ledger(produto_id)")
+
+    # Saldo acumulado de cada produto até a linha ledger_id do razão
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS estoque_snapshots(
+            produto_id INTEGER NOT NULL,
+            ledger_id INTEGER NOT NULL,
+            data DATETIME NOT NULL,
+            quantidade INTEGER NOT NULL,
+            PRIMARY KEY (produto_id, ledger_id),
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_estoque_snapshots_data ON estoque_snapshots(data)")
+
+    # O histórico anterior não é confiável (fiados e prejuízos não geravam
+    # movimentação): o razão começa com o saldo atual de cada produto
+    conn.execute("""
+        INSERT INTO estoque_ledger (produto_id, delta, origem)
+        SELECT id, quantidade, 'SALDO_INICIAL'
+        FROM produtos
+        WHERE id NOT IN (SELECT produto_id FROM estoque_ledger)
+    """)
+
+
+def _005_reajustes_preco(conn):
+    """Reajustes de preço em lote com histórico para desfazer"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reajustes_preco(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descricao TEXT,
+            modo TEXT NOT NULL CHECK(modo IN ('PERCENTUAL', 'FIXO', 'MARGEM')),
+            valor REAL NOT NULL,
+            produtos INTEGER NOT NULL DEFAULT 0,
+            desfeito INTEGER NOT NULL DEFAULT 0,
+            data DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Preço anterior e novo de cada produto alterado por um reajuste
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS historico_precos(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reajuste_id INTEGER NOT NULL,
+            produto_id INTEGER NOT NULL,
+            valor_venda_anterior REAL NOT NULL,
+            valor_venda_novo REAL NOT NULL,
+            data DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (reajuste_id) REFERENCES reajustes_preco(id) ON DELETE CASCADE,
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_historico_precos_reajuste
+        ON historico_precos(reajuste_id, produto_id)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_historico_precos_produto ON historico_precos(produto_id)")
+
+
+def _006_versao_linhas(conn):
+    """Coluna versao para atualizações condicionais (concorrência otimista)"""
+    # Toda escrita em produtos/caixa incrementa a versão; quem edita a partir
+    # de uma leitura antiga (ex.: formulário aberto em outro terminal) só
+    # grava se a versão ainda for a mesma que leu
+    for table in ("produtos", "caixa"):
+        if not _column_exists(conn, table, "versao"):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+
+
+def _007_fiados_cliente(conn):
+    """Índice dos fiados em aberto por cliente (pagamento da conta do cliente)"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fiados_cliente_pago ON fiados(cliente, pago)")
+
+
+def _008_clientes(conn):
+    """Cadastro de clientes com chave normalizada e saldo de fiados em aberto"""
+    # chave = nome sem acentos, em minúsculas e com espaços normalizados
+    # (utils.text.normalize_key); saldo_aberto, fiados_abertos e
+    # primeiro_fiado_aberto são mantidos pelo StockService na mesma
+    # transação que cria, paga ou exclui um fiado
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS clientes(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            chave TEXT NOT NULL UNIQUE,
+            saldo_aberto REAL NOT NULL DEFAULT 0,
+            fiados_abertos INTEGER NOT NULL DEFAULT 0,
+            primeiro_fiado_aberto DATETIME,
+            data_cadastro DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_abertos ON clientes(saldo_aberto) WHERE fiados_abertos > 0")
+
+    if not _column_exists(conn, "fiados", "cliente_id"):
+        conn.execute("ALTER TABLE fiados ADD COLUMN cliente_id INTEGER REFERENCES clientes(id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fiados_cliente_id_pago ON fiados(cliente_id, pago)")
+
+    # Um cliente por chave; o nome exibido é a grafia mais recente
+    nomes = conn.execute("""
+        SELECT cliente FROM fiados
+        WHERE cliente_id IS NULL
+        GROUP BY cliente
+        ORDER BY MAX(data_fiado)
+    """).fetchall()
+    grafias = {}
+    for (nome,) in nomes:
+        chave = normalize_key(nome)
+        if chave:
+            grafias.setdefault(chave, []).append(nome)
+
+    for chave, variantes in grafias.items():
+        conn.execute(
+            "INSERT OR IGNORE INTO clientes (nome, chave) VALUES (?, ?)",
+            (" ".join(variantes[-1].split()), chave)
+        )
+        conn.executemany("""
+            UPDATE fiados SET cliente_id = (SELECT id FROM clientes WHERE chave = ?)
+            WHERE cliente = ? AND cliente_id IS NULL
+        """, [(chave, nome) for nome in variantes])
+
+    conn.execute("""
+        UPDATE clientes
+        SET (saldo_aberto, fiados_abertos, primeiro_fiado_aberto) = (
+            SELECT COALESCE(SUM(valor_total), 0), COUNT(*), MIN(data_fiado)
+            FROM fiados
+            WHERE fiados.cliente_id = clientes.id AND pago = 0
+        )
+    """)
+
+
+def _009_reservas(conn):
+    """Reservas de estoque para pedidos a retirar"""
+    # quantidade_reservada é mantida pelo ReservaService junto com cada
+    # reserva; o disponível para venda é quantidade - quantidade_reservada
+    if not _column_exists(conn, "produtos", "quantidade_reservada"):
+        conn.execute("ALTER TABLE produtos ADD COLUMN quantidade_reservada INTEGER NOT NULL DEFAULT 0")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reservas(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL CHECK(quantidade > 0),
+            cliente TEXT NOT NULL,
+            observacao TEXT,
+            status TEXT NOT NULL DEFAULT 'ATIVA'
+                CHECK(status IN ('ATIVA', 'LIBERADA', 'EXPIRADA', 'CONVERTIDA')),
+            data_reserva DATETIME DEFAULT CURRENT_TIMESTAMP,
+            expira_em DATETIME NOT NULL,
+            data_baixa DATETIME,
+            venda_id INTEGER,
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE,
+            FOREIGN KEY (venda_id) REFERENCES vendas(id) ON DELETE SET NULL
+        )
+    """)
+    # A varredura só olha as reservas ativas, em ordem de vencimento
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_reservas_ativas_expira
+        ON reservas(expira_em) WHERE status = 'ATIVA'
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reservas_produto ON reservas(produto_id)")
+
+
+def _010_lotes(conn):
+    """Lotes de estoque com validade própria e baixa FEFO"""
+    # Cada entrada gera um lote; a soma de lotes.quantidade de um produto
+    # acompanha produtos.quantidade, e as saídas consomem primeiro os lotes
+    # que vencem antes (lotes sem validade por último)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lotes(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            quantidade_inicial INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL CHECK(quantidade >= 0),
+            data_validade DATE NULL,
+            data_entrada DATETIME DEFAULT CURRENT_TIMESTAMP,
+            movimentacao_id INTEGER,
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE,
+            FOREIGN KEY (movimentacao_id) REFERENCES movimentacoes(id) ON DELETE SET NULL
+        )
+    """)
+    # Alertas de validade: só os lotes com saldo, em ordem de vencimento
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lotes_validade
+        ON lotes(data_validade) WHERE quantidade > 0
+    """)
+    # Fila FEFO de cada produto
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lotes_produto_validade
+        ON lotes(produto_id, data_validade) WHERE quantidade > 0
+    """)
+
+    # Quanto cada saída tirou de cada lote, para que o estorno (exclusão de
+    # fiado ou prejuízo) devolva a quantidade aos mesmos lotes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lote_consumos(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lote_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL CHECK(quantidade > 0),
+            origem TEXT NOT NULL CHECK(origem IN ('SAIDA', 'FIADO', 'PREJUIZO', 'AJUSTE')),
+            referencia_id INTEGER,
+            data DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (lote_id) REFERENCES lotes(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lote_consumos_origem
+        ON lote_consumos(origem, referencia_id)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lote_consumos_lote ON lote_consumos(lote_id)")
+
+    # O estoque atual de cada produto vira um lote com a validade do cadastro
+    conn.execute("""
+        INSERT INTO lotes (produto_id, quantidade_inicial, quantidade, data_validade, data_entrada)
+        SELECT id, quantidade, quantidade, data_validade, COALESCE(data_cadastro, CURRENT_TIMESTAMP)
+        FROM produtos
+        WHERE quantidade > 0
+          AND id NOT IN (SELECT produto_id FROM lotes)
+    """)
+
+
+def _011_vendas_diarias(conn):
+    """Resumo diário de vendas por produto, mantido por gatilhos"""
+    # Uma linha por (dia, produto) com o total das movimentações SAIDA do dia
+    # (vendas à vista e pagamentos de fiado). Os gatilhos em movimentacoes
+    # atualizam o resumo na mesma transação de cada gravação, então nenhum
+    # caminho que grave movimentações precisa lembrar de mantê-lo
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vendas_diarias(
+            dia DATE NOT NULL,
+            produto_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            faturamento REAL NOT NULL DEFAULT 0,
+            lucro REAL NOT NULL DEFAULT 0,
+            vendas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, produto_id),
+            FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vendas_diarias_produto ON vendas_diarias(produto_id)")
+
+    # Soma a movimentação NEW ao resumo do seu dia
+    soma = """
+        INSERT INTO vendas_diarias (dia, produto_id, quantidade, faturamento, lucro, vendas)
+        VALUES (
+            DATE(NEW.data_movimentacao),
+            NEW.produto_id,
+            NEW.quantidade,
+            COALESCE(NEW.quantidade * NEW.valor_unitario, 0),
+            COALESCE(NEW.quantidade * (NEW.valor_unitario - NEW.custo_unitario), 0),
+            1
+        )
+        ON CONFLICT (dia, produto_id) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            faturamento = faturamento + excluded.faturamento,
+            lucro = lucro + excluded.lucro,
+            vendas = vendas + 1;
+    """
+    # Retira a movimentação OLD do resumo do seu dia
+    subtrai = """
+        UPDATE vendas_diarias
+        SET quantidade = quantidade - OLD.quantidade,
+            faturamento = faturamento - COALESCE(OLD.quantidade * OLD.valor_unitario, 0),
+            lucro = lucro - COALESCE(OLD.quantidade * (OLD.valor_unitario - OLD.custo_unitario), 0),
+            vendas = vendas - 1
+        WHERE dia = DATE(OLD.data_movimentacao) AND produto_id = OLD.produto_id;
+        DELETE FROM vendas_diarias
+        WHERE dia = DATE(OLD.data_movimentacao) AND produto_id = OLD.produto_id AND vendas <= 0;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_vendas_insert
+        AFTER INSERT ON movimentacoes
+        WHEN NEW.tipo = 'SAIDA'
+        BEGIN
+            {soma}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_vendas_delete
+        AFTER DELETE ON movimentacoes
+        WHEN OLD.tipo = 'SAIDA'
+        BEGIN
+            {subtrai}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_vendas_update_old
+        AFTER UPDATE OF produto_id, tipo, quantidade, data_movimentacao, valor_unitario, custo_unitario
+        ON movimentacoes
+        WHEN OLD.tipo = 'SAIDA'
+        BEGIN
+            {subtrai}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_vendas_update_new
+        AFTER UPDATE OF produto_id, tipo, quantidade, data_movimentacao, valor_unitario, custo_unitario
+        ON movimentacoes
+        WHEN NEW.tipo = 'SAIDA'
+        BEGIN
+            {soma}
+        END
+    """)
+
+    # Carga inicial com todo o histórico
+    conn.execute("DELETE FROM vendas_diarias")
+    conn.execute("""
+        INSERT INTO vendas_diarias (dia, produto_id, quantidade, faturamento, lucro, vendas)
+        SELECT
+            DATE(data_movimentacao),
+            produto_id,
+            SUM(quantidade),
+            COALESCE(SUM(quantidade * valor_unitario), 0),
+            COALESCE(SUM(quantidade * (valor_unitario - custo_unitario)), 0),
+            COUNT(*)
+        FROM movimentacoes
+        WHERE tipo = 'SAIDA'
+        GROUP BY DATE(data_movimentacao), produto_id
+    """)
+
+
+def _012_indices_kpis(conn):
+    """Índices cobrindo os totais dos cards da visão geral"""
+    # Vendas e dias com venda saem só do índice, já na ordem de dia
+    # (COUNT(DISTINCT dia) sem B-tree temporária)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vendas_diarias_dia_vendas ON vendas_diarias(dia, vendas)")
+    # Total dos fiados pagos sem ler as linhas da tabela
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fiados_pago_valor ON fiados(pago, valor_total)")
+
+
+def _013_saldo_clientes_triggers(conn):
+    """Saldo dos clientes recalculado pelo banco ao excluir ou alterar fiados"""
+    # Exclusões em cascata (produto excluído) e alterações feitas fora do
+    # StockService também atualizam o resumo; a criação do fiado continua
+    # chamando ClienteRepository.refresh_balances
+    def recalcula(linha):
+        return f"""
+            UPDATE clientes
+            SET (saldo_aberto, fiados_abertos, primeiro_fiado_aberto) = (
+                SELECT COALESCE(SUM(valor_total), 0), COUNT(*), MIN(data_fiado)
+                FROM fiados
+                WHERE cliente_id = {linha}.cliente_id AND pago = 0
+            )
+            WHERE id = {linha}.cliente_id;
+        """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_fiados_saldo_delete
+        AFTER DELETE ON fiados
+        WHEN OLD.cliente_id IS NOT NULL
+        BEGIN
+            {recalcula("OLD")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_fiados_saldo_update
+        AFTER UPDATE OF cliente_id, pago, valor_total, data_fiado ON fiados
+        BEGIN
+            {recalcula("OLD")}
+            {recalcula("NEW")}
+        END
+    """)
+
+    # Clientes que ficaram com saldo de fiados já excluídos em cascata
+    conn.execute("""
+        UPDATE clientes
+        SET (saldo_aberto, fiados_abertos, primeiro_fiado_aberto) = (
+            SELECT COALESCE(SUM(valor_total), 0), COUNT(*), MIN(data_fiado)
+            FROM fiados
+            WHERE fiados.cliente_id = clientes.id AND pago = 0
+        )
+    """)
+
+
+# (versão, função) em ordem crescente; a versão é a posição na lista
+MIGRATIONS = [
+    (1, _001_schema_inicial),
+    (2, _002_vendas),
+    (3, _003_precos_movimentacoes),
+    (4, _004_razao_estoque),
+    (5, _005_reajustes_preco),
+    (6, _006_versao_linhas),
+    (7, _007_fiados_cliente),
+    (8, _008_clientes),
+    (9, _009_reservas),
+    (10, _010_lotes),
+    (11, _011_vendas_diarias),
+    (12, _012_indices_kpis),
+    (13, _013_saldo_clientes_triggers),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn) -> int:
+    """
+    Aplica as migrações pendentes e retorna a versão final do schema.
+
+    Com o banco já atualizado o custo é uma única leitura de PRAGMA.
+    """
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    for version, step in MIGRATIONS:
+        # BEGIN IMMEDIATE + nova leitura da versão: se outro processo
+        # migrou enquanto esperávamos o lock, o passo não é repetido
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise sqlite3.DatabaseError(
+                f"Falha na migração {version} ({step.__doc__ or step.__name__}): {e}"
+            ) from e
+        except BaseException:
+            conn.rollback()
+            raise
+
+    return get_schema_version(conn)
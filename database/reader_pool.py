@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import config
+from database.connection import get_connection, in_unit_of_work, use_read_only_connection
+
+# Quantas instruções da VM do SQLite entre uma verificação de prazo e outra
+_PROGRESS_STEPS = 10000
+
+
+class QueryTimeoutError(Exception):
+    """Consulta interrompida por estourar o tempo limite."""
+
+
+class ReaderPool:
+    """
+    Pool de threads para consultas somente leitura em paralelo.
+
+    Cada thread do pool é marcada como leitora e usa a própria conexão
+    somente leitura (ver ConnectionManager); com o banco em WAL as leituras
+    rodam juntas, e ao lado de uma escrita, sem disputar lock. O SQLite
+    libera o GIL enquanto executa a consulta, então consultas independentes
+    realmente ocupam núcleos diferentes.
+
+    run() recebe {nome: função sem argumentos} e devolve os resultados e os
+    erros por nome. Cada consulta tem um tempo limite próprio, contado a
+    partir do momento em que começa a rodar, e o conjunto tem um orçamento
+    total: o que não terminar a tempo é interrompido no próprio SQLite
+    (progress handler) e aparece nos erros como QueryTimeoutError.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Criado no primeiro uso (e de novo depois de um shutdown())
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="leitura-bd",
+                    initializer=use_read_only_connection,
+                )
+            return self._executor
+
+    def shutdown(self):
+        # Para as threads do pool. As conexões delas continuam registradas no
+        # gerenciador e são fechadas por close_all_connections()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, func):
+        # Executa func em segundo plano em uma thread leitora, sem prazo
+        # (ex.: aquecer o motor de análises na inicialização)
+        return self._get_executor().submit(func)
+
+    def _execute(self, func, timeout, fim_orcamento):
+        inicio = time.monotonic()
+        prazo = min(inicio + timeout, fim_orcamento)
+        if inicio >= prazo:
+            raise QueryTimeoutError("Orçamento de tempo esgotado antes de a consulta começar.")
+
+        conn = get_connection()
+        conn.set_progress_handler(lambda: time.monotonic() > prazo, _PROGRESS_STEPS)
+        try:
+            return func()
+        except sqlite3.OperationalError as e:
+            if time.monotonic() > prazo:
+                raise QueryTimeoutError(
+                    f"Consulta interrompida após {time.monotonic() - inicio:.1f} s."
+                ) from e
+            raise
+        finally:
+            conn.set_progress_handler(None, _PROGRESS_STEPS)
+
+    def run(self, consultas: dict, budget: float, timeout: float):
+        """
+        Executa as consultas em paralelo e devolve (resultados, erros), dois
+        dicionários pelo nome da consulta; os erros guardam a exceção.
+        `budget` é o tempo total (s) e `timeout` o limite de cada consulta.
+
+        Dentro de um unit_of_work() as consultas rodam em sequência na
+        própria thread, que é a única que enxerga a transação em aberto.
+        """
+        resultados = {}
+        erros = {}
+
+        if in_unit_of_work():
+            for nome, func in consultas.items():
+                try:
+                    resultados[nome] = func()
+                except Exception as e:
+                    erros[nome] = e
+            return resultados, erros
+
+        fim_orcamento = time.monotonic() + budget
+        executor = self._get_executor()
+        futures = {
+            executor.submit(self._execute, func, timeout, fim_orcamento): nome
+            for nome, func in consultas.items()
+        }
+        wait(futures, timeout=budget)
+
+        for future, nome in futures.items():
+            if not future.done():
+                # As que já começaram param sozinhas no prazo (progress handler)
+                future.cancel()
+                erros[nome] = QueryTimeoutError("Orçamento de tempo esgotado.")
+            elif future.exception() is not None:
+                erros[nome] = future.exception()
+            else:
+                resultados[nome] = future.result()
+        return resultados, erros
+
+
+# Pool compartilhado pela aplicação (encerrado em main antes de fechar as conexões)
+reader_pool = ReaderPool(config.READER_POOL_THREADS)
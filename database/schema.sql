@@ -93,6 +93,35 @@ CREATE TABLE IF NOT EXISTS caixa_movimentacoes(
     FOREIGN KEY (caixa_id) REFERENCES caixa(id) ON DELETE SET NULL
 );
 
+-- Índices para os caminhos de consulta mais frequentes
+-- (análises, relatórios por período, fiados em aberto, caixa do dia)
+
+-- Vendas/entradas por período: filtros por tipo + data
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_tipo_data ON movimentacoes(tipo, data_movimentacao);
+-- Movimentações por período sem filtro de tipo (histórico, rotatividade)
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_data ON movimentacoes(data_movimentacao);
+-- Junções a partir de produtos (vendas por produto, última movimentação) e ON DELETE CASCADE
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_produto_tipo ON movimentacoes(produto_id, tipo, data_movimentacao);
+
+-- Fiados em aberto ordenados por data e listagem por período
+CREATE INDEX IF NOT EXISTS idx_fiados_pago_data ON fiados(pago, data_fiado);
+CREATE INDEX IF NOT EXISTS idx_fiados_data ON fiados(data_fiado);
+CREATE INDEX IF NOT EXISTS idx_fiados_produto ON fiados(produto_id);
+
+-- Prejuízos por período e por produto
+CREATE INDEX IF NOT EXISTS idx_prejuizos_data ON prejuizos(data_prejuizo);
+CREATE INDEX IF NOT EXISTS idx_prejuizos_produto ON prejuizos(produto_id);
+
+-- Entradas/saídas avulsas do caixa do dia
+CREATE INDEX IF NOT EXISTS idx_caixa_movimentacoes_data_tipo ON caixa_movimentacoes(data_movimentacao, tipo);
+
+-- Listagem de produtos ativos por nome e alertas de vencimento
+CREATE INDEX IF NOT EXISTS idx_produtos_ativo_nome ON produtos(ativo, nome);
+CREATE INDEX IF NOT EXISTS idx_produtos_validade ON produtos(data_validade) WHERE data_validade IS NOT NULL;
+
+-- Produtos por tag (a chave primária cobre apenas produto_id -> tag_id)
+CREATE INDEX IF NOT EXISTS idx_produto_tag_tag ON produto_tag(tag_id);
+
 -- INSERT INTO produtos (
 --     nome,
 --     quantidade,
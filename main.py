@@ -1,6 +1,11 @@
 import sys
+import config
 from PySide6.QtWidgets import QApplication
-from database.connection import initialize_database
+from database.connection import initialize_database, close_all_connections
+from database.reader_pool import reader_pool
+from services.analytics_engine import analytics_engine
+from services.stock_ledger_service import StockLedgerService
+from services.reserva_service import ReservationSweeper
 from ui.windows.main_window import MainWindow
 
 def main():
@@ -11,6 +16,21 @@ def main():
         print(f"Erro ao inicializar o banco de dados: {e}")
         sys.exit(1)
 
+    # Snapshot periódico dos saldos do razão de estoque
+    try:
+        StockLedgerService().snapshot_if_due()
+    except Exception as e:
+        print(f"Erro ao gravar snapshot do estoque: {e}")
+
+    # Expira as reservas de estoque vencidas em segundo plano
+    sweeper = ReservationSweeper()
+    sweeper.start()
+
+    # Carrega o histórico no motor de análises em memória em segundo plano,
+    # para que a primeira abertura do dashboard não espere pela carga
+    if analytics_engine.available and any(config.ANALYTICS_ENGINE_METHODS.values()):
+        reader_pool.submit(analytics_engine.refresh)
+
     # Cria a aplicação Qt
     app = QApplication(sys.argv)
 
@@ -19,7 +39,13 @@ def main():
     window.show()
 
     # Executa o loop principal da aplicação
-    sys.exit(app.exec())
+    exit_code = app.exec()
+
+    # Para a varredura e o pool de leitura e fecha as conexões com o banco antes de sair
+    sweeper.stop()
+    reader_pool.shutdown()
+    close_all_connections()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
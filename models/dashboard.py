@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from models.kpi import Kpis
+
+
+# Dados do dashboard de análises, carregados de uma vez pelo pool de leitura.
+# Cada campo é o resultado de uma consulta independente; o que falhou ou não
+# terminou dentro do orçamento de tempo fica None e tem a mensagem em `erros`.
+@dataclass
+class DashboardSnapshot:
+    kpis: Optional[Kpis] = None
+    vendas_grafico: Optional[Any] = None
+    vendas_resumo: Optional[Any] = None
+    categorias: Optional[Any] = None
+    produtos_top: Optional[Any] = None
+    prejuizos_motivo: Optional[Any] = None
+    prejuizos_detalhados: Optional[Any] = None
+    margens: Optional[Any] = None
+    curva_abc: Optional[Any] = None
+    rotatividade: Optional[Any] = None
+    fiados_aging: Optional[Any] = None
+    clientes_em_aberto: Optional[Any] = None
+    fiados_detalhados: Optional[Any] = None
+    erros: dict[str, str] = field(default_factory=dict)
+    duracao_ms: float = 0.0
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+
+# Números dos cards da visão geral do dashboard (AnalyticsService.get_kpis)
+@dataclass
+class Kpis:
+    total_produtos: int = 0
+    total_itens: int = 0
+    valor_custo: float = 0.0
+    valor_venda: float = 0.0
+    total_vendas: int = 0
+    dias_com_vendas: int = 0
+    fiados_abertos: int = 0
+    valor_fiados_abertos: float = 0.0
+    fiados_pagos: int = 0
+    valor_fiados_pagos: float = 0.0
+    prejuizos: int = 0
+    valor_prejuizos: float = 0.0
+
+    @property
+    def margem_estoque(self) -> float:
+        # Lucro previsto se todo o estoque for vendido pelo preço atual
+        return self.valor_venda - self.valor_custo
@@ -1,24 +1,41 @@
 from repositories.base_repository import BaseRepository
+from utils.dates import day_range
 
 
 class AnalyticsRepository(BaseRepository):
-    """Repositório para consultas analíticas avançadas"""
+    """
+    Repositório para consultas analíticas avançadas.
+
+    Os totais de venda vêm de vendas_diarias (um registro por dia e produto,
+    mantido junto com cada movimentação), então o custo das consultas cresce
+    com os dias do período e não com o histórico de movimentações.
+    """
 
     def get_sales_by_period(self, start_date, end_date):
         """Vendas por dia no período"""
         query = """
         SELECT 
-            DATE(m.data_movimentacao) as data,
-            SUM(m.quantidade * p.valor_venda) as faturamento,
-            SUM(m.quantidade * (p.valor_venda - p.valor_compra)) as lucro
-        FROM movimentacoes m
-        JOIN produtos p ON p.id = m.produto_id
-        WHERE m.tipo = 'SAIDA' 
-          AND DATE(m.data_movimentacao) BETWEEN DATE(?) AND DATE(?)
-        GROUP BY DATE(m.data_movimentacao)
+            dia as data,
+            SUM(faturamento) as faturamento,
+            SUM(lucro) as lucro
+        FROM vendas_diarias
+        WHERE dia >= ? AND dia < ?
+        GROUP BY dia
         ORDER BY data
         """
-        return self.fetchall(query, (start_date, end_date))
+        return self.fetchall(query, day_range(start_date, end_date))
+
+    def get_vendas_summary(self, start_date, end_date):
+        """Vendas registradas pelo carrinho no período: quantidade, total e ticket médio"""
+        query = """
+        SELECT
+            COUNT(*) as num_vendas,
+            COALESCE(SUM(valor_total), 0) as total,
+            COALESCE(AVG(valor_total), 0) as ticket_medio
+        FROM vendas
+        WHERE data_venda >= ? AND data_venda < ?
+        """
+        return self.fetchone(query, day_range(start_date, end_date))
 
     def get_top_products(self, limit=10):
         """Produtos mais vendidos"""
@@ -26,15 +43,22 @@ class AnalyticsRepository(BaseRepository):
         SELECT 
             p.id,
             p.nome,
-            SUM(m.quantidade) as total_vendido,
-            SUM(m.quantidade * p.valor_venda) as faturamento,
-            SUM(m.quantidade * (p.valor_venda - p.valor_compra)) as lucro
-        FROM movimentacoes m
+            m.quantidade,
+            m.faturamento,
+            m.lucro
+        FROM (
+            SELECT
+                produto_id,
+                SUM(quantidade) as quantidade,
+                SUM(faturamento) as faturamento,
+                SUM(lucro) as lucro
+            FROM vendas_diarias
+            GROUP BY produto_id
+            ORDER BY quantidade DESC
+            LIMIT ?
+        ) m
         JOIN produtos p ON p.id = m.produto_id
-        WHERE m.tipo = 'SAIDA'
-        GROUP BY p.id, p.nome
-        ORDER BY total_vendido DESC
-        LIMIT ?
+        ORDER BY m.quantidade DESC
         """
         return self.fetchall(query, (limit,))
 
@@ -43,14 +67,18 @@ class AnalyticsRepository(BaseRepository):
         query = """
         SELECT 
             t.nome as categoria,
-            COUNT(DISTINCT p.id) as total_produtos,
-            SUM(m.quantidade) as total_vendido,
-            SUM(m.quantidade * p.valor_venda) as faturamento,
-            SUM(m.quantidade * (p.valor_venda - p.valor_compra)) as lucro
+            COUNT(DISTINCT p.id) as produtos,
+            COALESCE(SUM(v.quantidade), 0) as vendidas,
+            COALESCE(SUM(v.faturamento), 0) as faturamento,
+            COALESCE(SUM(v.lucro), 0) as lucro
         FROM produto_tag pt
         JOIN tags t ON t.id = pt.tag_id
         JOIN produtos p ON p.id = pt.produto_id
-        LEFT JOIN movimentacoes m ON m.produto_id = p.id AND m.tipo = 'SAIDA'
+        LEFT JOIN (
+            SELECT produto_id, SUM(quantidade) as quantidade, SUM(faturamento) as faturamento, SUM(lucro) as lucro
+            FROM vendas_diarias
+            GROUP BY produto_id
+        ) v ON v.produto_id = p.id
         GROUP BY t.id, t.nome
         ORDER BY faturamento DESC
         """
@@ -60,10 +88,10 @@ class AnalyticsRepository(BaseRepository):
         """Valor total do estoque"""
         query = """
         SELECT 
-            SUM(quantidade * valor_compra) as valor_total_custo,
-            SUM(quantidade * valor_venda) as valor_total_venda,
+            COALESCE(SUM(quantidade * valor_compra), 0) as valor_custo,
+            COALESCE(SUM(quantidade * valor_venda), 0) as valor_venda,
             COUNT(DISTINCT id) as total_produtos,
-            SUM(quantidade) as total_itens
+            COALESCE(SUM(quantidade), 0) as total_itens
         FROM produtos
         WHERE ativo = 1
         """
@@ -76,8 +104,8 @@ class AnalyticsRepository(BaseRepository):
             id,
             nome,
             quantidade,
-            estoque_minimo,
-            valor_venda
+            estoque_minimo as minimo,
+            valor_venda as valor
         FROM produtos
         WHERE ativo = 1 
           AND quantidade <= estoque_minimo
@@ -91,15 +119,15 @@ class AnalyticsRepository(BaseRepository):
         SELECT 
             p.id,
             p.nome,
-            COUNT(m.id) as num_movimentacoes,
-            SUM(CASE WHEN m.tipo = 'SAIDA' THEN m.quantidade ELSE 0 END) as total_saidas,
-            SUM(CASE WHEN m.tipo = 'ENTRADA' THEN m.quantidade ELSE 0 END) as total_entradas
+            COUNT(m.id) as movimentacoes,
+            SUM(CASE WHEN m.tipo = 'SAIDA' THEN m.quantidade ELSE 0 END) as saidas,
+            SUM(CASE WHEN m.tipo = 'ENTRADA' THEN m.quantidade ELSE 0 END) as entradas
         FROM movimentacoes m
         JOIN produtos p ON p.id = m.produto_id
-        WHERE DATE(m.data_movimentacao) >= DATE('now', '-' || ? || ' days')
+        WHERE m.data_movimentacao >= DATE('now', '-' || ? || ' days')
         GROUP BY p.id, p.nome
-        HAVING num_movimentacoes > 0
-        ORDER BY total_saidas DESC
+        HAVING COUNT(m.id) > 0
+        ORDER BY saidas DESC
         """
         return self.fetchall(query, (days,))
 
@@ -109,34 +137,77 @@ class AnalyticsRepository(BaseRepository):
         SELECT 
             p.id,
             p.nome,
-            p.valor_compra,
-            p.valor_venda,
-            ROUND(((p.valor_venda - p.valor_compra) / p.valor_venda * 100), 2) as margem_percentual,
-            SUM(m.quantidade) as total_vendido,
-            SUM(m.quantidade * (p.valor_venda - p.valor_compra)) as lucro_total
+            p.valor_compra as custo,
+            p.valor_venda as venda,
+            ROUND(((p.valor_venda - p.valor_compra) / p.valor_venda * 100), 2) as margem,
+            COALESCE(SUM(v.quantidade), 0) as vendidas,
+            COALESCE(SUM(v.lucro), 0) as lucro_total
         FROM produtos p
-        LEFT JOIN movimentacoes m ON m.produto_id = p.id AND m.tipo = 'SAIDA'
+        LEFT JOIN vendas_diarias v ON v.produto_id = p.id
         WHERE p.ativo = 1
         GROUP BY p.id, p.nome
-        ORDER BY margem_percentual DESC
+        ORDER BY margem DESC
         """
         return self.fetchall(query)
 
+    def get_abc_curve(self, limite_a, limite_b):
+        """
+        Curva ABC dos produtos pelo faturamento acumulado (maior primeiro).
+
+        `participacao` e `acumulado` são percentuais do faturamento total; o
+        produto é A enquanto o acumulado antes dele está abaixo de limite_a,
+        B abaixo de limite_b e C no restante.
+        """
+        query = """
+        WITH
+            totais AS (
+                SELECT produto_id, SUM(faturamento) as faturamento
+                FROM vendas_diarias
+                GROUP BY produto_id
+                HAVING SUM(faturamento) > 0
+            ),
+            curva AS (
+                SELECT
+                    produto_id,
+                    faturamento,
+                    faturamento * 100.0 / SUM(faturamento) OVER () as participacao,
+                    SUM(faturamento) OVER (ORDER BY faturamento DESC, produto_id ROWS UNBOUNDED PRECEDING)
+                        * 100.0 / SUM(faturamento) OVER () as acumulado
+                FROM totais
+            )
+        SELECT
+            p.id,
+            p.nome,
+            c.faturamento,
+            c.participacao,
+            c.acumulado,
+            CASE
+                WHEN c.acumulado - c.participacao < ? THEN 'A'
+                WHEN c.acumulado - c.participacao < ? THEN 'B'
+                ELSE 'C'
+            END as classe
+        FROM curva c
+        JOIN produtos p ON p.id = c.produto_id
+        ORDER BY c.faturamento DESC, p.id
+        """
+        return self.fetchall(query, (limite_a, limite_b))
+
     def get_expiring_products(self, days=30):
-        """Produtos próximos do vencimento"""
+        """Produtos próximos do vencimento (um registro por lote com saldo)"""
         query = """
         SELECT 
-            id,
-            nome,
-            data_validade,
-            quantidade,
-            valor_venda,
-            CAST((julianday(data_validade) - julianday('now')) AS INTEGER) as dias_para_vencer
-        FROM produtos
-        WHERE data_validade IS NOT NULL
-          AND ativo = 1
-          AND data_validade <= DATE('now', '+' || ? || ' days')
-        ORDER BY data_validade ASC
+            p.id,
+            p.nome,
+            l.data_validade as validade,
+            l.quantidade,
+            p.valor_venda as valor,
+            COALESCE(CAST((julianday(l.data_validade) - julianday('now')) AS INTEGER), 0) as dias
+        FROM lotes l
+        CROSS JOIN produtos p ON p.id = l.produto_id
+        WHERE l.quantidade > 0
+          AND l.data_validade <= DATE('now', '+' || ? || ' days')
+          AND p.ativo = 1
+        ORDER BY l.data_validade ASC
         """
         return self.fetchall(query, (days,))
 
@@ -148,19 +219,19 @@ class AnalyticsRepository(BaseRepository):
             p.nome,
             p.quantidade,
             p.data_cadastro,
-            p.valor_venda,
+            p.valor_venda as valor,
             CASE 
                 WHEN MAX(m.id) IS NOT NULL THEN
                     CAST((julianday(DATE('now')) - julianday(DATE(MAX(m.data_movimentacao)))) AS INTEGER)
                 ELSE
                     CAST((julianday(DATE('now')) - julianday(DATE(p.data_cadastro))) AS INTEGER)
-            END as dias_sem_movimento
+            END as dias_parado
         FROM produtos p
         LEFT JOIN movimentacoes m ON p.id = m.produto_id
         WHERE p.ativo = 1
         GROUP BY p.id, p.nome, p.data_cadastro
-        HAVING dias_sem_movimento > ?
-        ORDER BY dias_sem_movimento DESC
+        HAVING dias_parado > ?
+        ORDER BY dias_parado DESC
         """
         return self.fetchall(query, (days,))
 
@@ -168,52 +239,88 @@ class AnalyticsRepository(BaseRepository):
         """Resumo mensal de vendas e lucro"""
         query = """
         SELECT 
-            strftime('%Y-%m', m.data_movimentacao) as mes,
-            SUM(CASE WHEN m.tipo = 'SAIDA' THEN m.quantidade ELSE 0 END) as qtd_vendida,
-            SUM(CASE WHEN m.tipo = 'SAIDA' THEN m.quantidade * p.valor_venda ELSE 0 END) as faturamento,
-            SUM(CASE WHEN m.tipo = 'SAIDA' THEN m.quantidade * (p.valor_venda - p.valor_compra) ELSE 0 END) as lucro
-        FROM movimentacoes m
-        JOIN produtos p ON p.id = m.produto_id
-        WHERE m.data_movimentacao >= DATE('now', '-' || ? || ' months')
-        GROUP BY strftime('%Y-%m', m.data_movimentacao)
+            substr(dia, 1, 7) as mes,
+            COALESCE(SUM(quantidade), 0) as qtd_vendida,
+            COALESCE(SUM(faturamento), 0) as faturamento,
+            COALESCE(SUM(lucro), 0) as lucro
+        FROM vendas_diarias
+        WHERE dia >= DATE('now', '-' || ? || ' months')
+        GROUP BY substr(dia, 1, 7)
         ORDER BY mes DESC
         """
         return self.fetchall(query, (months,))
 
+    # Cargas do motor de análises em memória (services/analytics_engine.py)
+
+    def get_movement_columns(self, after_id=0):
+        """
+        Movimentações com id > after_id, em ordem de id, como tuplas
+        (id, produto_id, dia, saida, quantidade, faturamento, lucro). `dia`
+        é o número de dias desde 1970-01-01 e faturamento/lucro seguem as
+        mesmas contas do resumo vendas_diarias.
+        """
+        query = """
+        SELECT
+            id,
+            produto_id,
+            CAST(julianday(DATE(data_movimentacao)) - 2440587.5 AS INTEGER) as dia,
+            tipo = 'SAIDA' as saida,
+            quantidade,
+            COALESCE(quantidade * valor_unitario, 0) as faturamento,
+            COALESCE(quantidade * (valor_unitario - custo_unitario), 0) as lucro
+        FROM movimentacoes
+        WHERE id > ?
+        ORDER BY id
+        """
+        return self.fetchall_tuples(query, (after_id,))
+
+    def count_movements_until(self, last_id):
+        """Quantas movimentações existem com id <= last_id"""
+        return self.fetchone("SELECT COUNT(*) FROM movimentacoes WHERE id <= ?", (last_id,))[0]
+
+    def get_product_columns(self):
+        """Produtos como tuplas (id, nome, valor_compra, valor_venda, ativo)"""
+        query = "SELECT id, nome, valor_compra, valor_venda, ativo FROM produtos ORDER BY id"
+        return self.fetchall_tuples(query)
+
     def get_cash_flow_summary(self, start_date, end_date):
         """Resumo de fluxo de caixa"""
+        # Vendas do dia de cada caixa, lidas do resumo diário (caixa.data é
+        # uma data simples, igual a vendas_diarias.dia)
         query = """
         SELECT 
             DATE(c.data) as data,
-            c.valor_abertura,
-            c.valor_fechamento,
-            COALESCE(SUM(m.quantidade * p.valor_venda), 0) as vendas_total
+            c.valor_abertura as abertura,
+            c.valor_fechamento as fechamento,
+            (
+                SELECT COALESCE(SUM(v.faturamento), 0)
+                FROM vendas_diarias v
+                WHERE v.dia = c.data
+            ) as vendas
         FROM caixa c
-        LEFT JOIN movimentacoes m ON DATE(m.data_movimentacao) = c.data AND m.tipo = 'SAIDA'
-        LEFT JOIN produtos p ON p.id = m.produto_id
-        WHERE DATE(c.data) BETWEEN DATE(?) AND DATE(?)
-        GROUP BY DATE(c.data)
+        WHERE c.data >= ? AND c.data < ?
         ORDER BY data DESC
         """
-        return self.fetchall(query, (start_date, end_date))
+        return self.fetchall(query, day_range(start_date, end_date))
 
     def get_total_statistics(self):
         """Estatísticas gerais do sistema"""
         query = """
         SELECT 
             (SELECT COUNT(*) FROM produtos WHERE ativo = 1) as total_produtos,
-            (SELECT SUM(quantidade) FROM produtos WHERE ativo = 1) as total_itens_estoque,
-            (SELECT COUNT(*) FROM movimentacoes WHERE tipo = 'SAIDA') as total_vendas,
-            (SELECT COUNT(DISTINCT strftime('%Y-%m-%d', data_movimentacao)) FROM movimentacoes WHERE tipo = 'SAIDA') as dias_com_vendas
+            (SELECT COALESCE(SUM(quantidade), 0) FROM produtos WHERE ativo = 1) as total_itens,
+            (SELECT COALESCE(SUM(vendas), 0) FROM vendas_diarias) as total_vendas,
+            (SELECT COUNT(DISTINCT dia) FROM vendas_diarias) as dias_com_vendas
         """
         return self.fetchone(query)
 
     def get_fiados_summary(self):
         """Retorna resumo de fiados: abertos e pagos"""
+        # Os abertos vêm do saldo mantido em clientes, sem percorrer os fiados
         query = """
         SELECT
-            (SELECT COUNT(*) FROM fiados WHERE pago = 0) as count_open,
-            (SELECT COALESCE(SUM(valor_total),0) FROM fiados WHERE pago = 0) as total_open,
+            (SELECT COALESCE(SUM(fiados_abertos),0) FROM clientes) as count_open,
+            (SELECT COALESCE(SUM(saldo_aberto),0) FROM clientes) as total_open,
             (SELECT COUNT(*) FROM fiados WHERE pago = 1) as count_paid,
             (SELECT COALESCE(SUM(valor_total),0) FROM fiados WHERE pago = 1) as total_paid
         """
@@ -226,12 +333,64 @@ class AnalyticsRepository(BaseRepository):
         """
         return self.fetchone(query)
 
+    def get_kpis(self):
+        """
+        Todos os números dos cards da visão geral em uma única consulta.
+
+        Cada tabela é lida uma vez só: produtos ativos (quantidade e valores
+        do estoque juntos), vendas_diarias (vendas e dias com venda, só pelo
+        índice (dia, vendas)), o saldo mantido em clientes para os fiados em
+        aberto, os fiados pagos pelo índice (pago, valor_total) e prejuízos.
+        Antes eram quatro consultas e dez subconsultas, três delas sobre
+        produtos e duas sobre vendas_diarias.
+        """
+        query = """
+        WITH
+            estoque AS (
+                SELECT
+                    COUNT(*) as total_produtos,
+                    COALESCE(SUM(quantidade), 0) as total_itens,
+                    COALESCE(SUM(quantidade * valor_compra), 0) as valor_custo,
+                    COALESCE(SUM(quantidade * valor_venda), 0) as valor_venda
+                FROM produtos
+                WHERE ativo = 1
+            ),
+            vendas AS (
+                SELECT
+                    COALESCE(SUM(vendas), 0) as total_vendas,
+                    COUNT(DISTINCT dia) as dias_com_vendas
+                FROM vendas_diarias
+            ),
+            abertos AS (
+                SELECT
+                    COALESCE(SUM(fiados_abertos), 0) as fiados_abertos,
+                    COALESCE(SUM(saldo_aberto), 0) as valor_fiados_abertos
+                FROM clientes
+            ),
+            pagos AS (
+                SELECT
+                    COUNT(*) as fiados_pagos,
+                    COALESCE(SUM(valor_total), 0) as valor_fiados_pagos
+                FROM fiados
+                WHERE pago = 1
+            ),
+            perdas AS (
+                SELECT
+                    COUNT(*) as prejuizos,
+                    COALESCE(SUM(valor_total), 0) as valor_prejuizos
+                FROM prejuizos
+            )
+        SELECT *
+        FROM estoque, vendas, abertos, pagos, perdas
+        """
+        return self.fetchone(query)
+
     def get_prejuizos_by_motivo(self, limit=10):
         query = """
-        SELECT motivo, COUNT(*) as count_motivo, COALESCE(SUM(valor_total),0) as total_motivo
+        SELECT motivo, COUNT(*) as count, COALESCE(SUM(valor_total),0) as total
         FROM prejuizos
         GROUP BY motivo
-        ORDER BY total_motivo DESC
+        ORDER BY total DESC
         LIMIT ?
         """
         return self.fetchall(query, (limit,))
@@ -256,8 +415,8 @@ class AnalyticsRepository(BaseRepository):
         params = []
         
         if start_date and end_date:
-            query += " AND DATE(pr.data_prejuizo) BETWEEN DATE(?) AND DATE(?)"
-            params = [start_date, end_date]
+            query += " AND pr.data_prejuizo >= ? AND pr.data_prejuizo < ?"
+            params = list(day_range(start_date, end_date))
 
         if params:
             query += " ORDER BY pr.data_prejuizo DESC"
@@ -287,8 +446,8 @@ class AnalyticsRepository(BaseRepository):
         """
         params = []
         if start_date and end_date:
-            query += " AND DATE(f.data_fiado) BETWEEN DATE(?) AND DATE(?)"
-            params = [start_date, end_date]
+            query += " AND f.data_fiado >= ? AND f.data_fiado < ?"
+            params = list(day_range(start_date, end_date))
 
         query += " ORDER BY f.data_fiado DESC"
         return self.fetchall(query, tuple(params) if params else ())
@@ -1,4 +1,86 @@
-from database.connection import get_connection
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from functools import partial
+
+from database.connection import get_connection, in_unit_of_work, bump_data_generation
+from database.instrumentation import instrumentation
+
+
+class _RecordMixin:
+    """
+    Comportamento comum dos registros retornados pelos repositórios.
+
+    Um registro é uma tupla imutável: aceita acesso por posição (r[0]),
+    por nome de coluna (r["nome"], r.get("nome")) e por atributo (r.nome),
+    e dict(r) funciona como com sqlite3.Row.
+    """
+
+    __slots__ = ()
+    _columns = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return list(self._columns)
+
+    def _asdict(self):
+        return {name: tuple.__getitem__(self, i) for name, i in self._index.items()}
+
+
+# Um tipo de registro por formato de consulta (nomes das colunas), criado uma única vez
+_record_types = {}
+
+
+def record_type(columns: tuple):
+    """Retorna (criando na primeira vez) o tipo de registro para as colunas."""
+    cls = _record_types.get(columns)
+    if cls is None:
+        index = {}
+        for i, name in enumerate(columns):
+            index.setdefault(name, i)
+        # rename=True: nomes que não são identificadores válidos (ex.: "COUNT(*)")
+        # viram _0, _1... como atributo, mas continuam acessíveis por r["COUNT(*)"]
+        base = namedtuple("Record", columns, rename=True)
+        cls = type("Record", (_RecordMixin, base), {
+            "__slots__": (),
+            "_columns": columns,
+            "_index": index,
+        })
+        _record_types[columns] = cls
+    return cls
+
+
+def map_rows(description, rows: list) -> list:
+    """Converte tuplas vindas do cursor em registros do formato da consulta."""
+    if not rows:
+        return rows
+    make = partial(tuple.__new__, record_type(tuple(col[0] for col in description)))
+    return list(map(make, rows))
+
+
+def _fetch_one(cursor):
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return map_rows(cursor.description, [row])[0]
+
+
+def _fetch_all(cursor):
+    return map_rows(cursor.description, cursor.fetchall())
+
 
 class BaseRepository:
 
@@ -7,34 +89,159 @@ class BaseRepository:
     fornecendo métodos comuns para executar consultas SQL.
     '''
 
+    # A conexão vem do gerenciador em database.connection: é reutilizada
+    # entre chamadas (uma por thread) e não deve ser fechada aqui.
+    # Dentro de um unit_of_work() as escritas não fazem commit sozinhas;
+    # a transação é confirmada (ou desfeita) ao final do bloco.
+    # Toda escrita bem-sucedida incrementa a geração dos dados
+    # (bump_data_generation), o que invalida os caches de consultas; uma
+    # escrita que falhou e foi desfeita não muda nada e mantém os caches.
+    # Consultas retornam registros (ver record_type) em vez de sqlite3.Row.
+
+    # Cursor que entrega tuplas simples; o mapeamento para registros é feito
+    # de uma vez por consulta em map_rows
+    def _cursor(self, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    # Executa a consulta no cursor e, com a instrumentação ligada, mede o
+    # tempo (incluindo a leitura das linhas) e informa o método chamador
+    def _run(self, conn, cursor, query, params, fetch=None, many=False):
+        if not instrumentation.enabled:
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params)
+            return fetch(cursor) if fetch else None
+
+        start = time.perf_counter()
+        if many:
+            cursor.executemany(query, params)
+        else:
+            cursor.execute(query, params)
+        result = fetch(cursor) if fetch else None
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if isinstance(result, list):
+            rows = len(result)
+        elif fetch:
+            rows = 0 if result is None else 1
+        else:
+            rows = cursor.rowcount
+
+        # _run <- execute/fetchall/... <- método do repositório (ou serviço)
+        code = sys._getframe(2).f_code
+        call_site = getattr(code, "co_qualname", code.co_name)
+        instrumentation.record(conn, query, params, call_site, duration_ms, rows)
+        return result
+
     # Método para executar uma consulta SQL sem retorno
     def execute(self, query: str, params: tuple = ()):
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        lastrowid = cursor.lastrowid
-        cursor.close()
-        return lastrowid
+        cursor = self._cursor(conn)
+        try:
+            self._run(conn, cursor, query, params)
+            if not in_unit_of_work():
+                conn.commit()
+            bump_data_generation()
+            return cursor.lastrowid
+        except Exception:
+            # A conexão é compartilhada: não deixa transação pendente
+            # (dentro de um unit_of_work quem desfaz é o próprio bloco)
+            if not in_unit_of_work():
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    # Método para executar a mesma escrita para vários conjuntos de parâmetros
+    # (executemany), devolvendo o total de linhas afetadas
+    def execute_many(self, query: str, params_list):
+        conn = get_connection()
+        cursor = self._cursor(conn)
+        try:
+            self._run(conn, cursor, query, params_list, many=True)
+            if not in_unit_of_work():
+                conn.commit()
+            bump_data_generation()
+            return cursor.rowcount
+        except Exception:
+            if not in_unit_of_work():
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    # Método para inserir várias linhas (executemany) devolvendo os ids gerados,
+    # na ordem dos parâmetros. O executemany roda em uma única transação com o
+    # lock de escrita, então os ids de uma tabela AUTOINCREMENT são
+    # consecutivos e terminam em last_insert_rowid()
+    def insert_many(self, query: str, params_list) -> list[int]:
+        params_list = list(params_list)
+        if not params_list:
+            return []
+
+        conn = get_connection()
+        cursor = self._cursor(conn)
+        try:
+            self._run(conn, cursor, query, params_list, many=True)
+            if cursor.rowcount != len(params_list):
+                raise sqlite3.DatabaseError("Inserção em lote incompleta.")
+            ultimo = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if not in_unit_of_work():
+                conn.commit()
+            bump_data_generation()
+            return list(range(ultimo - len(params_list) + 1, ultimo + 1))
+        except Exception:
+            if not in_unit_of_work():
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    # Método para executar uma escrita com RETURNING, devolvendo a primeira linha
+    def execute_returning(self, query: str, params: tuple = ()):
+        conn = get_connection()
+        cursor = self._cursor(conn)
+        try:
+            # A linha precisa ser lida antes do commit
+            result = self._run(conn, cursor, query, params, fetch=_fetch_one)
+            if not in_unit_of_work():
+                conn.commit()
+            bump_data_generation()
+            return result
+        except Exception:
+            if not in_unit_of_work():
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
 
     # Método para executar uma consulta SQL que retorna um único registro
     def fetchone(self, query: str, params: tuple = ()):
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        cursor = self._cursor(conn)
+        try:
+            return self._run(conn, cursor, query, params, fetch=_fetch_one)
+        finally:
+            cursor.close()
     
     # Método para executar uma consulta SQL que retorna múltiplos registros
     def fetchall(self, query: str, params: tuple = ()):
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
-            
-
-        
-        
+        cursor = self._cursor(conn)
+        try:
+            return self._run(conn, cursor, query, params, fetch=_fetch_all)
+        finally:
+            cursor.close()
+
+    # Como fetchall, mas devolve as tuplas do cursor sem convertê-las em
+    # registros (cargas grandes, como as do motor de análises em memória)
+    def fetchall_tuples(self, query: str, params: tuple = ()):
+        conn = get_connection()
+        cursor = self._cursor(conn)
+        try:
+            return self._run(conn, cursor, query, params, fetch=lambda c: c.fetchall())
+        finally:
+            cursor.close()
@@ -1,5 +1,6 @@
 from repositories.base_repository import BaseRepository
 from datetime import date
+from utils.dates import day_range
 
 
 class CaixaMovimentacaoRepository(BaseRepository):
@@ -22,20 +23,20 @@ class CaixaMovimentacaoRepository(BaseRepository):
         if tipo:
             query = """
                 SELECT IFNULL(SUM(valor), 0) FROM caixa_movimentacoes
-                WHERE DATE(data_movimentacao) = DATE(?) AND tipo = ?
+                WHERE data_movimentacao >= ? AND data_movimentacao < ? AND tipo = ?
             """
-            return self.fetchone(query, (target_date, tipo))[0]
+            return self.fetchone(query, (*day_range(target_date), tipo))[0]
         else:
             query = """
                 SELECT IFNULL(SUM(valor), 0) FROM caixa_movimentacoes
-                WHERE DATE(data_movimentacao) = DATE(?)
+                WHERE data_movimentacao >= ? AND data_movimentacao < ?
             """
-            return self.fetchone(query, (target_date,))[0]
+            return self.fetchone(query, day_range(target_date))[0]
 
     def list_by_date(self, target_date: str):
         query = """
             SELECT * FROM caixa_movimentacoes
-            WHERE DATE(data_movimentacao) = DATE(?)
+            WHERE data_movimentacao >= ? AND data_movimentacao < ?
             ORDER BY data_movimentacao
         """
-        return self.fetchall(query, (target_date,))
+        return self.fetchall(query, day_range(target_date))
@@ -18,61 +18,48 @@ class CaixaRepository(BaseRepository):
         result = self.fetchone("SELECT last_insert_rowid() as id")
         return result[0] if result else None
 
-    def find_by_date(self, data: str) -> dict | None:
+    def find_by_date(self, data: str):
         """Busca caixa por data."""
         query = "SELECT * FROM caixa WHERE data = ?"
-        result = self.fetchone(query, (data,))
-        return self._map_to_dict(result) if result else None
+        return self.fetchone(query, (data,))
 
-    def find_today_caixa(self) -> dict | None:
+    def find_today_caixa(self):
         """Busca caixa de hoje."""
         today = date.today().isoformat()
         return self.find_by_date(today)
 
-    def find_open_caixa(self) -> dict | None:
+    def find_open_caixa(self):
         """Busca caixa aberto (ABERTO)."""
         query = "SELECT * FROM caixa WHERE status = 'ABERTO' LIMIT 1"
-        result = self.fetchone(query)
-        return self._map_to_dict(result) if result else None
+        return self.fetchone(query)
 
-    def update_close(self, caixa_id: int, valor_fechamento: float) -> None:
-        """Fecha o caixa com valor de fechamento."""
+    def update_close(self, caixa_id: int, valor_fechamento: float, versao: int | None = None) -> bool:
+        """
+        Fecha o caixa com valor de fechamento. Só fecha um caixa ainda aberto e,
+        com `versao`, só se ele não foi alterado desde a leitura.
+
+        Retorna False se nenhuma linha foi atualizada.
+        """
         query = """
             UPDATE caixa 
-            SET valor_fechamento = ?, status = 'FECHADO', data_fechamento = ?
-            WHERE id = ?
+            SET valor_fechamento = ?, status = 'FECHADO', data_fechamento = ?, versao = versao + 1
+            WHERE id = ? AND status = 'ABERTO' AND (? IS NULL OR versao = ?)
+            RETURNING id
         """
-        params = (valor_fechamento, datetime.now(), caixa_id)
-        self.execute(query, params)
+        params = (valor_fechamento, datetime.now(), caixa_id, versao, versao)
+        return self.execute_returning(query, params) is not None
 
-    def find_by_id(self, caixa_id: int) -> dict | None:
+    def find_by_id(self, caixa_id: int):
         """Busca caixa por ID."""
         query = "SELECT * FROM caixa WHERE id = ?"
-        result = self.fetchone(query, (caixa_id,))
-        return self._map_to_dict(result) if result else None
+        return self.fetchone(query, (caixa_id,))
 
     def delete(self, caixa_id: int) -> None:
         """Deleta um caixa."""
         query = "DELETE FROM caixa WHERE id = ?"
         self.execute(query, (caixa_id,))
 
-    def get_all(self) -> list[dict]:
+    def get_all(self):
         """Retorna todos os caixas."""
         query = "SELECT * FROM caixa ORDER BY data DESC"
-        results = self.fetchall(query)
-        return [self._map_to_dict(r) for r in results]
-
-    def _map_to_dict(self, row: tuple) -> dict | None:
-        """Converte linha do banco para dicionário."""
-        if not row:
-            return None
-        
-        return {
-            "id": row[0],
-            "data": row[1],
-            "valor_abertura": row[2],
-            "valor_fechamento": row[3],
-            "status": row[4],
-            "data_abertura": row[5],
-            "data_fechamento": row[6]
-        }
+        return self.fetchall(query)
@@ -0,0 +1,90 @@
+from repositories.base_repository import BaseRepository
+from utils.text import normalize_key
+
+
+class ClienteRepository(BaseRepository):
+    """
+    Repositório de clientes (fiados).
+
+    O cliente é identificado pela chave normalizada do nome, então grafias
+    diferentes ("José", "jose ") caem no mesmo cadastro. saldo_aberto,
+    fiados_abertos e primeiro_fiado_aberto são um resumo dos fiados em
+    aberto do cliente: ao criar um fiado o serviço chama refresh_balances;
+    exclusões (inclusive em cascata) e pagamentos são refletidos pelos
+    triggers da migração 13.
+    """
+
+    def get_or_create(self, nome: str) -> int:
+        """Retorna o id do cliente com a chave do nome, cadastrando se preciso."""
+        existente = self.find_by_name(nome)
+        if existente:
+            return existente["id"]
+
+        query = "INSERT INTO clientes (nome, chave) VALUES (?, ?)"
+        return self.execute(query, (" ".join(nome.split()), normalize_key(nome)))
+
+    def find_by_name(self, nome: str):
+        query = "SELECT * FROM clientes WHERE chave = ?"
+        return self.fetchone(query, (normalize_key(nome),))
+
+    def get_by_id(self, cliente_id: int):
+        query = "SELECT * FROM clientes WHERE id = ?"
+        return self.fetchone(query, (cliente_id,))
+
+    def refresh_balances(self, cliente_ids):
+        """
+        Recalcula o resumo dos fiados em aberto dos clientes informados.
+        Usa o índice (cliente_id, pago): o custo é o número de fiados em
+        aberto desses clientes, não o histórico inteiro.
+        """
+        ids = {cliente_id for cliente_id in cliente_ids if cliente_id is not None}
+        if not ids:
+            return 0
+        query = """
+        UPDATE clientes
+        SET (saldo_aberto, fiados_abertos, primeiro_fiado_aberto) = (
+            SELECT COALESCE(SUM(valor_total), 0), COUNT(*), MIN(data_fiado)
+            FROM fiados
+            WHERE cliente_id = ? AND pago = 0
+        )
+        WHERE id = ?
+        """
+        return self.execute_many(query, [(cliente_id, cliente_id) for cliente_id in ids])
+
+    def list_open_balances(self):
+        """Clientes com fiados em aberto, com saldo e dias desde o fiado mais antigo."""
+        query = """
+        SELECT
+            id,
+            nome,
+            saldo_aberto,
+            fiados_abertos,
+            primeiro_fiado_aberto,
+            CAST(julianday('now') - julianday(primeiro_fiado_aberto) AS INTEGER) as dias_em_aberto
+        FROM clientes
+        WHERE fiados_abertos > 0
+        ORDER BY saldo_aberto DESC
+        """
+        return self.fetchall(query)
+
+    def get_aging_summary(self):
+        """Saldo em aberto por faixa de atraso do fiado mais antigo de cada cliente."""
+        query = """
+        SELECT
+            CASE
+                WHEN dias <= 30 THEN 'Até 30 dias'
+                WHEN dias <= 60 THEN '31 a 60 dias'
+                WHEN dias <= 90 THEN '61 a 90 dias'
+                ELSE 'Mais de 90 dias'
+            END as faixa,
+            COUNT(*) as clientes,
+            SUM(saldo_aberto) as saldo
+        FROM (
+            SELECT saldo_aberto, julianday('now') - julianday(primeiro_fiado_aberto) as dias
+            FROM clientes
+            WHERE fiados_abertos > 0
+        )
+        GROUP BY faixa
+        ORDER BY MIN(dias)
+        """
+        return self.fetchall(query)
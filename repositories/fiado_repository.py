@@ -1,26 +1,71 @@
 from repositories.base_repository import BaseRepository
+from utils.dates import day_range
 
 
 class FiadoRepository(BaseRepository):
     """Repositório para operações de fiados"""
 
-    def create(self, produto_id: int, quantidade: int, valor_unitario: float, valor_total: float, cliente: str, observacao: str = ""):
+    def create(
+        self,
+        produto_id: int,
+        quantidade: int,
+        valor_unitario: float,
+        valor_total: float,
+        cliente: str,
+        observacao: str = "",
+        cliente_id: int | None = None
+    ):
         query = """
         INSERT INTO fiados (
-            produto_id, quantidade, valor_unitario, valor_total, cliente, observacao
-        ) VALUES (?, ?, ?, ?, ?, ?)
+            produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, cliente_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
         """
-        return self.execute(query, (produto_id, quantidade, valor_unitario, valor_total, cliente, observacao))
+        return self.execute(query, (produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, cliente_id))
+
+    # Colunas dos fiados em aberto, na ordem usada por quem lê por posição:
+    # (id, produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, data_fiado,
+    #  produto_nome, cliente_id)
+    _OPEN_COLUMNS = """
+        f.id, f.produto_id, f.quantidade, f.valor_unitario, f.valor_total,
+        f.cliente, f.observacao, f.data_fiado, p.nome as produto_nome, f.cliente_id
+    """
 
     def list_open(self):
-        query = """
-        SELECT f.id, f.produto_id, f.quantidade, f.valor_unitario, f.valor_total, f.cliente, f.observacao, f.data_fiado
+        query = f"""
+        SELECT {self._OPEN_COLUMNS}
         FROM fiados f
+        LEFT JOIN produtos p ON p.id = f.produto_id
         WHERE f.pago = 0
         ORDER BY f.data_fiado DESC
         """
         return self.fetchall(query)
 
+    def get_open_by_id(self, fiado_id: int):
+        """Fiado em aberto pela chave primária (None se não existe ou já foi pago)."""
+        query = f"""
+        SELECT {self._OPEN_COLUMNS}
+        FROM fiados f
+        LEFT JOIN produtos p ON p.id = f.produto_id
+        WHERE f.id = ? AND f.pago = 0
+        """
+        return self.fetchone(query, (fiado_id,))
+
+    def list_open_by_cliente(self, cliente_id: int, ids: list[int] | None = None):
+        """Fiados em aberto do cliente; com `ids`, apenas esses fiados."""
+        query = f"""
+        SELECT {self._OPEN_COLUMNS}
+        FROM fiados f
+        LEFT JOIN produtos p ON p.id = f.produto_id
+        WHERE f.cliente_id = ? AND f.pago = 0
+        """
+        params = [cliente_id]
+        if ids is not None:
+            ids = list(set(ids))
+            query += f" AND f.id IN ({', '.join('?' for _ in ids) or 'NULL'})"
+            params.extend(ids)
+        query += " ORDER BY f.data_fiado"
+        return self.fetchall(query, tuple(params))
+
     def mark_paid(self, fiado_id: int, movimentacao_id: int | None = None):
         query = """
         UPDATE fiados
@@ -31,10 +76,24 @@ class FiadoRepository(BaseRepository):
         """
         self.execute(query, (movimentacao_id, fiado_id))
 
+    def mark_paid_many(self, pagamentos: list[tuple[int, int]]):
+        """
+        Marca vários fiados como pagos (executemany). Cada item é
+        (movimentacao_id, fiado_id). Retorna quantos estavam em aberto.
+        """
+        query = """
+        UPDATE fiados
+        SET pago = 1,
+            data_pagamento = CURRENT_TIMESTAMP,
+            movimentacao_id = ?
+        WHERE id = ? AND pago = 0
+        """
+        return self.execute_many(query, pagamentos)
+
     def get_by_id(self, fiado_id: int):
         query = """
         SELECT id, produto_id, quantidade, valor_unitario, valor_total,
-               cliente, observacao, data_fiado, pago
+               cliente, observacao, data_fiado, pago, cliente_id
         FROM fiados
         WHERE id = ?
         """
@@ -61,8 +120,8 @@ class FiadoRepository(BaseRepository):
         """
         params = []
         if start_date and end_date:
-            query += " AND DATE(f.data_fiado) BETWEEN DATE(?) AND DATE(?)"
-            params = [start_date, end_date]
+            query += " AND f.data_fiado >= ? AND f.data_fiado < ?"
+            params = list(day_range(start_date, end_date))
 
         query += " ORDER BY f.data_fiado DESC"
         return self.fetchall(query, tuple(params) if params else ())
@@ -0,0 +1,157 @@
+from repositories.base_repository import BaseRepository
+from utils.dates import day_range
+
+
+class LedgerRepository(BaseRepository):
+    """
+    Repositório do razão de estoque (estoque_ledger) e dos snapshots.
+
+    O saldo de um produto em qualquer data é o último snapshot até a data
+    mais a soma das linhas do razão posteriores a ele (cauda curta), sem
+    precisar reprocessar todo o histórico.
+    """
+
+    def record(self, produto_id: int, delta: int, origem: str, referencia_id: int | None = None):
+        query = """
+        INSERT INTO estoque_ledger (produto_id, delta, origem, referencia_id)
+        VALUES (?, ?, ?, ?)
+        """
+        return self.execute(query, (produto_id, delta, origem, referencia_id))
+
+    def record_many(self, linhas: list[tuple]):
+        """Cada linha é (produto_id, delta, origem, referencia_id)."""
+        query = """
+        INSERT INTO estoque_ledger (produto_id, delta, origem, referencia_id)
+        VALUES (?, ?, ?, ?)
+        """
+        return self.execute_many(query, linhas)
+
+    def create_snapshots(self):
+        """
+        Grava um snapshot para cada produto com linhas novas no razão desde
+        o último snapshot (último saldo + soma da cauda).
+        """
+        query = """
+        INSERT INTO estoque_snapshots (produto_id, ledger_id, data, quantidade)
+        SELECT
+            l.produto_id,
+            MAX(l.id),
+            MAX(l.data),
+            COALESCE(s.quantidade, 0) + SUM(l.delta)
+        FROM estoque_ledger l
+        LEFT JOIN (
+            SELECT es.produto_id, es.ledger_id, es.quantidade
+            FROM estoque_snapshots es
+            JOIN (
+                SELECT produto_id, MAX(ledger_id) as ledger_id
+                FROM estoque_snapshots
+                GROUP BY produto_id
+            ) ultimo ON ultimo.produto_id = es.produto_id AND ultimo.ledger_id = es.ledger_id
+        ) s ON s.produto_id = l.produto_id
+        WHERE l.id > COALESCE(s.ledger_id, 0)
+        GROUP BY l.produto_id
+        """
+        self.execute(query)
+
+    def snapshot_status(self):
+        """
+        Data do último snapshot, há quantos dias foi (calculado no SQL: as
+        datas do razão são CURRENT_TIMESTAMP, em UTC) e quantas linhas do
+        razão vieram depois dele.
+        """
+        query = """
+        SELECT
+            (SELECT MAX(data) FROM estoque_snapshots) as ultimo_snapshot,
+            (SELECT julianday('now') - julianday(MAX(data)) FROM estoque_snapshots) as dias_desde_snapshot,
+            (SELECT COUNT(*) FROM estoque_ledger
+              WHERE id > COALESCE((SELECT MAX(ledger_id) FROM estoque_snapshots), 0)) as linhas_pendentes
+        """
+        return self.fetchone(query)
+
+    def quantity_at(self, produto_id: int, data):
+        """Saldo do produto ao final do dia `data` (None se o razão ainda não existia)."""
+        _, limite = day_range(data)
+        query = """
+        WITH snap AS (
+            SELECT ledger_id, quantidade
+            FROM estoque_snapshots
+            WHERE produto_id = ? AND data < ?
+            ORDER BY ledger_id DESC
+            LIMIT 1
+        )
+        SELECT
+            (SELECT quantidade FROM snap) as snapshot,
+            (SELECT SUM(delta) FROM estoque_ledger
+              WHERE produto_id = ?
+                AND id > COALESCE((SELECT ledger_id FROM snap), 0)
+                AND data < ?) as cauda
+        """
+        row = self.fetchone(query, (produto_id, limite, produto_id, limite))
+        if row["snapshot"] is None and row["cauda"] is None:
+            return None
+        return (row["snapshot"] or 0) + (row["cauda"] or 0)
+
+    def quantities_at(self, data):
+        """Saldo de todos os produtos ao final do dia `data`."""
+        _, limite = day_range(data)
+        query = """
+        WITH snap AS (
+            SELECT es.produto_id, es.ledger_id, es.quantidade
+            FROM estoque_snapshots es
+            JOIN (
+                SELECT produto_id, MAX(ledger_id) as ledger_id
+                FROM estoque_snapshots
+                WHERE data < ?
+                GROUP BY produto_id
+            ) ultimo ON ultimo.produto_id = es.produto_id AND ultimo.ledger_id = es.ledger_id
+        ),
+        cauda AS (
+            SELECT l.produto_id, SUM(l.delta) as delta
+            FROM estoque_ledger l
+            LEFT JOIN snap ON snap.produto_id = l.produto_id
+            WHERE l.id > COALESCE(snap.ledger_id, 0) AND l.data < ?
+            GROUP BY l.produto_id
+        )
+        SELECT
+            p.id as produto_id,
+            p.nome,
+            COALESCE(snap.quantidade, 0) + COALESCE(cauda.delta, 0) as quantidade
+        FROM produtos p
+        LEFT JOIN snap ON snap.produto_id = p.id
+        LEFT JOIN cauda ON cauda.produto_id = p.id
+        WHERE snap.produto_id IS NOT NULL OR cauda.produto_id IS NOT NULL
+        ORDER BY p.nome
+        """
+        return self.fetchall(query, (limite, limite))
+
+    def find_drift(self):
+        """Produtos cujo produtos.quantidade difere do saldo calculado pelo razão."""
+        query = """
+        WITH snap AS (
+            SELECT es.produto_id, es.ledger_id, es.quantidade
+            FROM estoque_snapshots es
+            JOIN (
+                SELECT produto_id, MAX(ledger_id) as ledger_id
+                FROM estoque_snapshots
+                GROUP BY produto_id
+            ) ultimo ON ultimo.produto_id = es.produto_id AND ultimo.ledger_id = es.ledger_id
+        ),
+        cauda AS (
+            SELECT l.produto_id, SUM(l.delta) as delta
+            FROM estoque_ledger l
+            LEFT JOIN snap ON snap.produto_id = l.produto_id
+            WHERE l.id > COALESCE(snap.ledger_id, 0)
+            GROUP BY l.produto_id
+        )
+        SELECT
+            p.id as produto_id,
+            p.nome,
+            p.quantidade,
+            COALESCE(snap.quantidade, 0) + COALESCE(cauda.delta, 0) as quantidade_razao
+        FROM produtos p
+        LEFT JOIN snap ON snap.produto_id = p.id
+        LEFT JOIN cauda ON cauda.produto_id = p.id
+        WHERE p.quantidade <> COALESCE(snap.quantidade, 0) + COALESCE(cauda.delta, 0)
+        ORDER BY p.nome
+        """
+        return self.fetchall(query)
@@ -0,0 +1,141 @@
+from repositories.base_repository import BaseRepository
+
+
+class LoteRepository(BaseRepository):
+    """
+    Repositório dos lotes de estoque.
+
+    Cada entrada de um produto gera um lote com a própria validade; as saídas
+    consomem os lotes em ordem FEFO (primeiro o que vence antes, lotes sem
+    validade por último) e ficam registradas em lote_consumos para o estorno.
+    """
+
+    # Sem validade informada, o lote herda a validade do cadastro do produto
+    _INSERT = """
+    INSERT INTO lotes (produto_id, quantidade_inicial, quantidade, data_validade, movimentacao_id)
+    VALUES (?, ?, ?, COALESCE(?, (SELECT data_validade FROM produtos WHERE id = ?)), ?)
+    """
+
+    def create(self, produto_id: int, quantidade: int, data_validade=None, movimentacao_id: int | None = None):
+        return self.execute(
+            self._INSERT,
+            (produto_id, quantidade, quantidade, data_validade, produto_id, movimentacao_id)
+        )
+
+    def create_many(self, linhas: list[tuple]) -> list[int]:
+        """Cada linha é (produto_id, quantidade, data_validade, movimentacao_id)."""
+        return self.insert_many(self._INSERT, [
+            (produto_id, quantidade, quantidade, data_validade, produto_id, movimentacao_id)
+            for produto_id, quantidade, data_validade, movimentacao_id in linhas
+        ])
+
+    def consume(self, produto_id: int, quantidade: int, origem: str, referencia_id: int | None = None) -> int:
+        """
+        Baixa `quantidade` dos lotes do produto em ordem FEFO e registra o
+        consumo de cada lote. A fila é calculada em uma única consulta com
+        soma acumulada, só sobre os lotes com saldo.
+
+        Retorna quanto foi baixado (menos que `quantidade` apenas se os lotes
+        não cobrirem o estoque do produto).
+        """
+        query = """
+        SELECT id, MIN(quantidade, ? - (acumulado - quantidade)) as baixa
+        FROM (
+            SELECT
+                id,
+                quantidade,
+                SUM(quantidade) OVER (
+                    ORDER BY data_validade IS NULL, data_validade, id
+                ) as acumulado
+            FROM lotes
+            WHERE produto_id = ? AND quantidade > 0
+        )
+        WHERE acumulado - quantidade < ?
+        """
+        baixas = self.fetchall(query, (quantidade, produto_id, quantidade))
+        if not baixas:
+            return 0
+
+        self.execute_many(
+            "UPDATE lotes SET quantidade = quantidade - ? WHERE id = ?",
+            [(baixa["baixa"], baixa["id"]) for baixa in baixas]
+        )
+        self.execute_many(
+            "INSERT INTO lote_consumos (lote_id, quantidade, origem, referencia_id) VALUES (?, ?, ?, ?)",
+            [(baixa["id"], baixa["baixa"], origem, referencia_id) for baixa in baixas]
+        )
+        return sum(baixa["baixa"] for baixa in baixas)
+
+    def restore(self, origem: str, referencia_id: int) -> int:
+        """
+        Devolve aos lotes de origem o que foi consumido por (origem,
+        referencia_id) e apaga os consumos. Retorna a quantidade devolvida.
+        """
+        row = self.fetchone(
+            "SELECT COALESCE(SUM(quantidade), 0) FROM lote_consumos WHERE origem = ? AND referencia_id = ?",
+            (origem, referencia_id)
+        )
+        if not row[0]:
+            return 0
+
+        self.execute("""
+        UPDATE lotes
+        SET quantidade = lotes.quantidade + c.quantidade
+        FROM (
+            SELECT lote_id, SUM(quantidade) as quantidade
+            FROM lote_consumos
+            WHERE origem = ? AND referencia_id = ?
+            GROUP BY lote_id
+        ) c
+        WHERE lotes.id = c.lote_id
+        """, (origem, referencia_id))
+        self.execute(
+            "DELETE FROM lote_consumos WHERE origem = ? AND referencia_id = ?",
+            (origem, referencia_id)
+        )
+        return row[0]
+
+    def update_validade(self, produto_id: int, anterior, nova):
+        """Leva a nova validade do cadastro aos lotes com saldo que usavam a anterior."""
+        query = """
+        UPDATE lotes
+        SET data_validade = ?
+        WHERE produto_id = ? AND quantidade > 0 AND data_validade IS ?
+        """
+        self.execute(query, (nova, produto_id, anterior))
+
+    def list_by_product(self, produto_id: int):
+        """Lotes com saldo do produto, na ordem em que serão consumidos."""
+        query = """
+        SELECT id, quantidade_inicial, quantidade, data_validade, data_entrada
+        FROM lotes
+        WHERE produto_id = ? AND quantidade > 0
+        ORDER BY data_validade IS NULL, data_validade, id
+        """
+        return self.fetchall(query, (produto_id,))
+
+    def list_expiring(self, ate: str):
+        """
+        Lotes com saldo de produtos ativos que vencem antes de `ate`
+        (yyyy-mm-dd, exclusivo), incluindo os já vencidos. A faixa é lida
+        direto do índice parcial de validade; o CROSS JOIN fixa lotes como
+        tabela externa, senão o planejador percorre todos os produtos ativos.
+        """
+        query = """
+        SELECT
+            l.id as lote_id,
+            l.produto_id,
+            p.nome,
+            l.quantidade,
+            l.data_validade,
+            l.data_entrada,
+            p.estoque_minimo,
+            p.valor_venda
+        FROM lotes l
+        CROSS JOIN produtos p ON p.id = l.produto_id
+        WHERE l.quantidade > 0
+          AND l.data_validade < ?
+          AND p.ativo = 1
+        ORDER BY l.data_validade, l.id
+        """
+        return self.fetchall(query, (ate,))
@@ -1,4 +1,5 @@
 from repositories.base_repository import BaseRepository
+from utils.dates import day_range
 
 
 class PrejuizoRepository(BaseRepository):
@@ -20,8 +21,8 @@ class PrejuizoRepository(BaseRepository):
         """
         params = []
         if start_date and end_date:
-            query += " AND DATE(p.data_prejuizo) BETWEEN DATE(?) AND DATE(?)"
-            params = [start_date, end_date]
+            query += " AND p.data_prejuizo >= ? AND p.data_prejuizo < ?"
+            params = list(day_range(start_date, end_date))
 
         query += " ORDER BY p.data_prejuizo DESC"
         return self.fetchall(query, tuple(params))
@@ -0,0 +1,111 @@
+from repositories.base_repository import BaseRepository
+
+
+# Expressão SQL do novo preço de venda para cada modo de reajuste (o
+# parâmetro é o valor do reajuste). MARGEM é a margem sobre o preço de
+# venda: venda = compra / (1 - margem)
+_NOVO_PRECO = {
+    "PERCENTUAL": "ROUND(MAX(p.valor_venda * (1 + ? / 100.0), 0), 2)",
+    "FIXO": "ROUND(MAX(p.valor_venda + ?, 0), 2)",
+    "MARGEM": "ROUND(p.valor_compra / (1 - ? / 100.0), 2)",
+}
+
+
+class PriceRepository(BaseRepository):
+    """
+    Reajuste de preços em lote.
+
+    O novo preço é calculado pelo próprio banco para todos os produtos do
+    filtro de uma vez; a prévia e a aplicação usam a mesma expressão.
+    """
+
+    @staticmethod
+    def _filtro(tag_id=None, termo=None, produto_ids=None):
+        """Monta o WHERE dos produtos afetados e seus parâmetros."""
+        condicoes = ["p.ativo = 1"]
+        params = []
+        if tag_id is not None:
+            condicoes.append("EXISTS (SELECT 1 FROM produto_tag pt WHERE pt.produto_id = p.id AND pt.tag_id = ?)")
+            params.append(tag_id)
+        if termo:
+            condicoes.append("p.nome LIKE ?")
+            params.append(f"%{termo}%")
+        if produto_ids is not None:
+            ids = list(set(produto_ids))
+            condicoes.append(f"p.id IN ({', '.join('?' for _ in ids) or 'NULL'})")
+            params.extend(ids)
+        return " AND ".join(condicoes), params
+
+    def preview(self, modo: str, valor: float, tag_id=None, termo=None, produto_ids=None):
+        where, params = self._filtro(tag_id, termo, produto_ids)
+        query = f"""
+        SELECT *
+        FROM (
+            SELECT
+                p.id,
+                p.nome,
+                p.valor_compra,
+                p.valor_venda,
+                {_NOVO_PRECO[modo]} as valor_venda_novo
+            FROM produtos p
+            WHERE {where}
+        )
+        WHERE valor_venda_novo <> valor_venda
+        ORDER BY nome
+        """
+        return self.fetchall(query, (valor, *params))
+
+    def create_reajuste(self, descricao: str, modo: str, valor: float):
+        query = "INSERT INTO reajustes_preco (descricao, modo, valor) VALUES (?, ?, ?)"
+        return self.execute(query, (descricao, modo, valor))
+
+    def record_history(self, reajuste_id: int, modo: str, valor: float, tag_id=None, termo=None, produto_ids=None):
+        """Grava o preço anterior e o novo de cada produto afetado pelo reajuste."""
+        where, params = self._filtro(tag_id, termo, produto_ids)
+        query = f"""
+        INSERT INTO historico_precos (reajuste_id, produto_id, valor_venda_anterior, valor_venda_novo)
+        SELECT ?, id, valor_venda, valor_venda_novo
+        FROM (
+            SELECT p.id, p.valor_venda, {_NOVO_PRECO[modo]} as valor_venda_novo
+            FROM produtos p
+            WHERE {where}
+        )
+        WHERE valor_venda_novo <> valor_venda
+        """
+        self.execute(query, (reajuste_id, valor, *params))
+
+    def apply_history(self, reajuste_id: int) -> int:
+        """Aplica aos produtos os preços novos gravados no histórico; retorna quantos."""
+        query = """
+        UPDATE produtos
+        SET valor_venda = h.valor_venda_novo, versao = versao + 1
+        FROM historico_precos h
+        WHERE h.reajuste_id = ? AND h.produto_id = produtos.id
+        """
+        alterados = self.execute_many(query, [(reajuste_id,)])
+        self.execute("UPDATE reajustes_preco SET produtos = ? WHERE id = ?", (alterados, reajuste_id))
+        return alterados
+
+    def revert_history(self, reajuste_id: int):
+        """
+        Volta os preços anteriores do reajuste. Produtos cujo preço foi
+        alterado depois do reajuste são mantidos. Retorna quantos voltaram.
+        """
+        query = """
+        UPDATE produtos
+        SET valor_venda = h.valor_venda_anterior, versao = versao + 1
+        FROM historico_precos h
+        WHERE h.reajuste_id = ?
+          AND h.produto_id = produtos.id
+          AND produtos.valor_venda = h.valor_venda_novo
+        """
+        revertidos = self.execute_many(query, [(reajuste_id,)])
+        self.execute("UPDATE reajustes_preco SET desfeito = 1 WHERE id = ?", (reajuste_id,))
+        return revertidos
+
+    def get_reajuste(self, reajuste_id: int):
+        return self.fetchone("SELECT * FROM reajustes_preco WHERE id = ?", (reajuste_id,))
+
+    def list_reajustes(self, limit: int = 50):
+        query = "SELECT * FROM reajustes_preco ORDER BY id DESC LIMIT ?"
+        return self.fetchall(query, (limit,))
@@ -21,7 +21,19 @@ class ProductRepository(BaseRepository):
         INSERT INTO produtos (nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo)
         VALUES (?, ?, ?, ?, ?, ?)
         """
-        self.execute(query, (nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo))
+        return self.execute(query, (nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo))
+
+    def create_many(self, linhas: list[tuple]) -> list[int]:
+        """
+        Insere vários produtos com um único executemany e devolve os ids na
+        ordem das linhas. Cada linha é
+        (nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo).
+        """
+        query = """
+        INSERT INTO produtos (nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        return self.insert_many(query, linhas)
     
     def update(
             self,
@@ -33,24 +45,142 @@ class ProductRepository(BaseRepository):
             data_validade: Optional[date],
             ativo: bool,
             estoque_minimo: int = 5,
+            versao: Optional[int] = None,
     ):
+        """
+        Grava o formulário do produto. Com `versao`, a atualização só acontece
+        se a linha ainda estiver na versão lida (concorrência otimista).
+
+        Retorna a nova versão, ou None se o produto não existe ou foi alterado
+        por outra escrita desde a leitura.
+        """
         query = """
         UPDATE produtos
-        SET nome = ?, quantidade = ?, valor_compra = ?, valor_venda = ?, data_validade = ?, ativo = ?, estoque_minimo = ?
-        WHERE id = ?
+        SET nome = ?, quantidade = ?, valor_compra = ?, valor_venda = ?, data_validade = ?, ativo = ?, estoque_minimo = ?,
+            versao = versao + 1
+        WHERE id = ? AND (? IS NULL OR versao = ?)
+        RETURNING versao
         """
-        self.execute(query, (nome, quantidade, valor_compra, valor_venda, data_validade, int(ativo), estoque_minimo, product_id))
+        row = self.execute_returning(query, (
+            nome, quantidade, valor_compra, valor_venda, data_validade, int(ativo), estoque_minimo,
+            product_id, versao, versao
+        ))
+        return row[0] if row else None
     
+    def adjust_quantity(self, produto_id: int, delta: int, min_remaining: Optional[int] = 0):
+        """
+        Soma delta ao estoque do produto em um único UPDATE condicional.
+
+        A atualização só acontece se o estoque disponível resultante (quantidade
+        menos o que está reservado) for >= min_remaining (None desativa a
+        verificação, útil para entradas e estornos). Como a
+        checagem é feita pelo próprio banco, dois terminais vendendo o mesmo
+        item não conseguem passar juntos pela validação de estoque.
+
+        Retorna a linha atualizada (quantidade, valor_compra, valor_venda) ou
+        None se o produto não existe ou o estoque seria insuficiente.
+        """
+        if min_remaining is None:
+            query = """
+            UPDATE produtos
+            SET quantidade = quantidade + ?, versao = versao + 1
+            WHERE id = ?
+            RETURNING quantidade, valor_compra, valor_venda
+            """
+            params = (delta, produto_id)
+        else:
+            query = """
+            UPDATE produtos
+            SET quantidade = quantidade + ?, versao = versao + 1
+            WHERE id = ? AND quantidade - quantidade_reservada + ? >= ?
+            RETURNING quantidade, valor_compra, valor_venda
+            """
+            params = (delta, produto_id, delta, min_remaining)
+        return self.execute_returning(query, params)
+
+    def adjust_quantities(self, deltas: list[tuple[int, int]], min_remaining: Optional[int] = 0):
+        """
+        Versão em lote de adjust_quantity: recebe uma lista de (produto_id, delta)
+        e aplica todos com executemany.
+
+        Retorna quantas linhas foram atualizadas; um valor menor que len(deltas)
+        indica produto inexistente ou estoque insuficiente em alguma linha.
+        """
+        if min_remaining is None:
+            query = "UPDATE produtos SET quantidade = quantidade + ?, versao = versao + 1 WHERE id = ?"
+            params = [(delta, produto_id) for produto_id, delta in deltas]
+        else:
+            query = """
+            UPDATE produtos
+            SET quantidade = quantidade + ?, versao = versao + 1
+            WHERE id = ? AND quantidade - quantidade_reservada + ? >= ?
+            """
+            params = [(delta, produto_id, delta, min_remaining) for produto_id, delta in deltas]
+        return self.execute_many(query, params)
+
+    def get_quantities(self, product_ids) -> dict[int, int]:
+        """Retorna {produto_id: quantidade} para os ids informados (ignora os inexistentes)."""
+        ids = list(set(product_ids))
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        query = f"SELECT id, quantidade FROM produtos WHERE id IN ({placeholders})"
+        return {row[0]: row[1] for row in self.fetchall(query, tuple(ids))}
+
+    def get_available_quantities(self, product_ids) -> dict[int, int]:
+        """Retorna {produto_id: quantidade disponível (sem as reservas)} para os ids informados."""
+        ids = list(set(product_ids))
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        query = f"SELECT id, quantidade - quantidade_reservada FROM produtos WHERE id IN ({placeholders})"
+        return {row[0]: row[1] for row in self.fetchall(query, tuple(ids))}
+
+    def reserve_quantity(self, produto_id: int, quantidade: int):
+        """
+        Reserva `quantidade` do produto se houver disponível, em um único
+        UPDATE condicional. Retorna a quantidade disponível restante ou None.
+        """
+        query = """
+        UPDATE produtos
+        SET quantidade_reservada = quantidade_reservada + ?, versao = versao + 1
+        WHERE id = ? AND quantidade - quantidade_reservada >= ?
+        RETURNING quantidade - quantidade_reservada
+        """
+        row = self.execute_returning(query, (quantidade, produto_id, quantidade))
+        return row[0] if row else None
+
+    def release_reserved(self, liberacoes: list[tuple[int, int]]):
+        """Devolve ao disponível as quantidades reservadas; cada item é (produto_id, quantidade)."""
+        query = """
+        UPDATE produtos
+        SET quantidade_reservada = MAX(quantidade_reservada - ?, 0), versao = versao + 1
+        WHERE id = ?
+        """
+        return self.execute_many(query, [(quantidade, produto_id) for produto_id, quantidade in liberacoes])
+
+    def get_sale_prices(self, product_ids) -> dict[int, float]:
+        """Retorna {produto_id: valor_venda} para os ids informados (ignora os inexistentes)."""
+        ids = list(set(product_ids))
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        query = f"SELECT id, valor_venda FROM produtos WHERE id IN ({placeholders})"
+        return {row[0]: row[1] for row in self.fetchall(query, tuple(ids))}
+
     def delete(self, product_id: int):
-        query = "DELETE FROM produtos WHERE id = ?"
+        """
+        Exclusão lógica: o produto fica inativo e some das listagens, mas
+        movimentações, vendas, fiados, prejuízos, lotes e o razão continuam
+        no banco (com as chaves estrangeiras ligadas, um DELETE levaria todo
+        esse histórico junto em cascata).
+        """
+        query = "UPDATE produtos SET ativo = 0, versao = versao + 1 WHERE id = ?"
         self.execute(query, (product_id,))
     
     def get_by_id(self, product_id: int):
         query = "SELECT * FROM produtos WHERE id = ?"
-        row = self.fetchone(query, (product_id,))
-        if row:
-            return dict(row)
-        return None
+        return self.fetchone(query, (product_id,))
     
     def list_all(self, only_active: bool = True):
         query = """
@@ -58,12 +188,19 @@ class ProductRepository(BaseRepository):
             p.id,
             p.nome,
             p.quantidade,
+            p.quantidade_reservada,
+            p.quantidade - p.quantidade_reservada AS quantidade_disponivel,
             p.valor_compra,
             p.valor_venda,
             p.data_validade,
             p.ativo,
             p.estoque_minimo,
-            GROUP_CONCAT(t.nome, ', ') AS tags
+            (
+                SELECT MIN(l.data_validade)
+                FROM lotes l
+                WHERE l.produto_id = p.id AND l.quantidade > 0
+            ) AS proxima_validade,
+            COALESCE(GROUP_CONCAT(t.nome, ', '), '') AS tags
         FROM produtos p
         LEFT JOIN produto_tag pt ON pt.produto_id = p.id
         LEFT JOIN tags t ON t.id = pt.tag_id
@@ -79,22 +216,7 @@ class ProductRepository(BaseRepository):
         ORDER BY p.nome
         """
 
-        rows = self.fetchall(query, params)
-
-        return [
-            {
-                "id": row["id"],
-                "nome": row["nome"],
-                "quantidade": row["quantidade"],
-                "valor_compra": row["valor_compra"],
-                "valor_venda": row["valor_venda"],
-                "data_validade": row["data_validade"],
-                "ativo": row["ativo"],
-                "estoque_minimo": row["estoque_minimo"],
-                "tags": row["tags"] or ""
-            }
-            for row in rows
-        ]
+        return self.fetchall(query, params)
     # def list_all(self, only_active: bool = True):
     #     if only_active:
     #         query = "SELECT * FROM produtos WHERE ativo = 1 ORDER BY nome"
@@ -113,12 +235,19 @@ class ProductRepository(BaseRepository):
             p.id,
             p.nome,
             p.quantidade,
+            p.quantidade_reservada,
+            p.quantidade - p.quantidade_reservada AS quantidade_disponivel,
             p.valor_compra,
             p.valor_venda,
             p.data_validade,
             p.ativo,
             p.estoque_minimo,
-            GROUP_CONCAT(t.nome, ', ') AS tags
+            (
+                SELECT MIN(l.data_validade)
+                FROM lotes l
+                WHERE l.produto_id = p.id AND l.quantidade > 0
+            ) AS proxima_validade,
+            COALESCE(GROUP_CONCAT(t.nome, ', '), '') AS tags
         FROM produtos p
         LEFT JOIN produto_tag pt ON pt.produto_id = p.id
         LEFT JOIN tags t ON t.id = pt.tag_id
@@ -127,31 +256,25 @@ class ProductRepository(BaseRepository):
         ORDER BY p.nome
         """
 
-        rows = self.fetchall(query, (f"%{nome}%",))
-
-        return [
-            {
-                "id": row["id"],
-                "nome": row["nome"],
-                "quantidade": row["quantidade"],
-                "valor_compra": row["valor_compra"],
-                "valor_venda": row["valor_venda"],
-                "data_validade": row["data_validade"],
-                "ativo": row["ativo"],
-                "estoque_minimo": row["estoque_minimo"],
-                "tags": row["tags"] or ""
-            }
-            for row in rows
-        ]
+        return self.fetchall(query, (f"%{nome}%",))
 
     
     def products_near_expiry(self, days: int):
+        """
+        Produtos ativos com algum lote (com saldo) vencendo em até `days`
+        dias, pelo índice de validade dos lotes (CROSS JOIN: lotes primeiro,
+        veja LoteRepository.list_expiring); `proxima_validade` é a do
+        primeiro lote a vencer e `quantidade_vencendo` a soma desses lotes.
+        """
         query = """
-        SELECT * FROM produtos
-        WHERE data_validade IS NOT NULL
-        AND DATE(data_validade) <= DATE('now', ? || ' days')
-        AND ativo = 1
-        ORDER BY data_validade
+        SELECT p.*, MIN(l.data_validade) as proxima_validade, SUM(l.quantidade) as quantidade_vencendo
+        FROM lotes l
+        CROSS JOIN produtos p ON p.id = l.produto_id
+        WHERE l.quantidade > 0
+        AND l.data_validade < DATE('now', ? || ' days', '+1 day')
+        AND p.ativo = 1
+        GROUP BY p.id
+        ORDER BY proxima_validade
         """
         return self.fetchall(query, (days,))
     
@@ -175,12 +298,19 @@ class ProductRepository(BaseRepository):
             p.id,
             p.nome,
             p.quantidade,
+            p.quantidade_reservada,
+            p.quantidade - p.quantidade_reservada AS quantidade_disponivel,
             p.valor_compra,
             p.valor_venda,
             p.data_validade,
             p.ativo,
             p.estoque_minimo,
-            GROUP_CONCAT(t.nome, ', ') AS tags
+            (
+                SELECT MIN(l.data_validade)
+                FROM lotes l
+                WHERE l.produto_id = p.id AND l.quantidade > 0
+            ) AS proxima_validade,
+            COALESCE(GROUP_CONCAT(t.nome, ', '), '') AS tags
         FROM produtos p
         LEFT JOIN produto_tag pt ON pt.produto_id = p.id
         LEFT JOIN tags t ON t.id = pt.tag_id
@@ -197,20 +327,5 @@ class ProductRepository(BaseRepository):
         ORDER BY p.nome
         """
         like = f"%{termo}%"
-        rows = self.fetchall(query, (like, like))
-
-        return [
-            {
-                "id": row["id"],
-                "nome": row["nome"],
-                "quantidade": row["quantidade"],
-                "valor_compra": row["valor_compra"],
-                "valor_venda": row["valor_venda"],
-                "data_validade": row["data_validade"],
-                "ativo": row["ativo"],
-                "estoque_minimo": row["estoque_minimo"],
-                "tags": row["tags"] or ""
-            }
-            for row in rows
-        ]
+        return self.fetchall(query, (like, like))
     
@@ -9,6 +9,11 @@ class ProductTagRepository(BaseRepository):
     def add_tag_to_product(self, produto_id: int, tag_id: int):
         query = "INSERT OR IGNORE INTO produto_tag (produto_id, tag_id) VALUES (?, ?)"
         self.execute(query, (produto_id, tag_id))
+
+    def add_tags_to_products(self, pares: list[tuple[int, int]]):
+        """Associa vários pares (produto_id, tag_id) com um único executemany."""
+        query = "INSERT OR IGNORE INTO produto_tag (produto_id, tag_id) VALUES (?, ?)"
+        return self.execute_many(query, pares)
     
     def remove_tag_from_product(self, produto_id: int, tag_id: int):
         query = "DELETE FROM produto_tag WHERE produto_id = ? AND tag_id = ?"
@@ -1,21 +1,29 @@
 from repositories.base_repository import BaseRepository
+from utils.dates import day_range
 
 
 class ReportRepository(BaseRepository):
+    """Relatório de vendas por produto, lido do resumo diário (vendas_diarias)."""
 
     def get_sales_summary(self, start_date, end_date):
         query = """
         SELECT
             p.id,
             p.nome,
-            SUM(m.quantidade) AS total_vendido,
-            SUM(m.quantidade * p.valor_venda) AS faturamento,
-            SUM(m.quantidade * (p.valor_venda - p.valor_compra)) AS lucro_estimado
-        FROM movimentacoes m
+            m.total_vendido,
+            m.faturamento,
+            m.lucro_estimado
+        FROM (
+            SELECT
+                produto_id,
+                SUM(quantidade) AS total_vendido,
+                SUM(faturamento) AS faturamento,
+                SUM(lucro) AS lucro_estimado
+            FROM vendas_diarias
+            WHERE dia >= ? AND dia < ?
+            GROUP BY produto_id
+        ) m
         JOIN produtos p ON p.id = m.produto_id
-        WHERE m.tipo = 'SAIDA'
-          AND DATE(m.data_movimentacao) BETWEEN DATE(?) AND DATE(?)
-        GROUP BY p.id, p.nome
-        ORDER BY total_vendido DESC
+        ORDER BY m.total_vendido DESC
         """
-        return self.fetchall(query, (start_date, end_date))
+        return self.fetchall(query, day_range(start_date, end_date))
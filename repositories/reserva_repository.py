@@ -0,0 +1,66 @@
+from repositories.base_repository import BaseRepository
+
+
+class ReservaRepository(BaseRepository):
+    """Repositório das reservas de estoque (pedidos a retirar)"""
+
+    def create(self, produto_id: int, quantidade: int, cliente: str, observacao: str, horas: float):
+        """Grava uma reserva ATIVA que vence daqui a `horas` horas. Retorna o id."""
+        query = """
+        INSERT INTO reservas (produto_id, quantidade, cliente, observacao, expira_em)
+        VALUES (?, ?, ?, ?, DATETIME('now', ? || ' hours'))
+        """
+        return self.execute(query, (produto_id, quantidade, cliente, observacao, horas))
+
+    def get_by_id(self, reserva_id: int):
+        query = "SELECT * FROM reservas WHERE id = ?"
+        return self.fetchone(query, (reserva_id,))
+
+    def close(self, reserva_id: int, status: str) -> bool:
+        """
+        Encerra uma reserva ativa (LIBERADA, EXPIRADA ou CONVERTIDA).
+        Retorna False se ela não estava mais ativa.
+        """
+        query = """
+        UPDATE reservas
+        SET status = ?, data_baixa = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'ATIVA'
+        RETURNING id
+        """
+        return self.execute_returning(query, (status, reserva_id)) is not None
+
+    def close_venda(self, reserva_id: int, venda_id: int):
+        """Liga a reserva convertida à venda gerada."""
+        query = "UPDATE reservas SET venda_id = ? WHERE id = ?"
+        self.execute(query, (venda_id, reserva_id))
+
+    def list_active(self):
+        query = """
+        SELECT r.id, r.produto_id, p.nome as produto_nome, r.quantidade, r.cliente,
+               r.observacao, r.data_reserva, r.expira_em
+        FROM reservas r
+        JOIN produtos p ON p.id = r.produto_id
+        WHERE r.status = 'ATIVA'
+        ORDER BY r.expira_em
+        """
+        return self.fetchall(query)
+
+    def list_expired(self, limit: int):
+        """Próximas reservas ativas já vencidas, das mais antigas para as mais novas."""
+        query = """
+        SELECT id, produto_id, quantidade
+        FROM reservas
+        WHERE status = 'ATIVA' AND expira_em <= CURRENT_TIMESTAMP
+        ORDER BY expira_em
+        LIMIT ?
+        """
+        return self.fetchall(query, (limit,))
+
+    def expire_many(self, reserva_ids: list[int]):
+        """Marca as reservas como EXPIRADA (só as que ainda estão ativas); retorna quantas."""
+        query = """
+        UPDATE reservas
+        SET status = 'EXPIRADA', data_baixa = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'ATIVA'
+        """
+        return self.execute_many(query, [(reserva_id,) for reserva_id in reserva_ids])
@@ -1,29 +1,56 @@
 from repositories.base_repository import BaseRepository
+from utils.dates import day_range
 
 
 class StockRepository(BaseRepository):
 
+    # Os preços de venda e de custo do produto no momento da movimentação
+    # ficam gravados na própria linha (valor_unitario / custo_unitario),
+    # para que os totais de vendas não dependam do preço atual do produto
+    _INSERT = """
+        INSERT INTO movimentacoes (
+            produto_id,
+            tipo,
+            quantidade,
+            observacao,
+            valor_unitario,
+            custo_unitario
+        )
+        VALUES (
+            ?, ?, ?, ?,
+            COALESCE(?, (SELECT valor_venda FROM produtos WHERE id = ?)),
+            (SELECT valor_compra FROM produtos WHERE id = ?)
+        )
+    """
+
     def register(
         self,
         produto_id: int,
         tipo: str,
         quantidade: int,
         observacao: str = "",
+        valor_unitario: float | None = None
     ):
         """
         Registra uma movimentação de estoque (ENTRADA ou SAIDA).
         A data é registrada automaticamente pelo SQLite.
+        Sem valor_unitario, usa o valor de venda atual do produto.
         """
-        query = """
-            INSERT INTO movimentacoes (
-                produto_id,
-                tipo,
-                quantidade,
-                observacao
-            )
-            VALUES (?, ?, ?, ?)
+        params = (produto_id, tipo, quantidade, observacao, valor_unitario, produto_id, produto_id)
+        return self.execute(self._INSERT, params)
+
+    def register_many(self, movimentacoes: list[tuple]):
+        """
+        Registra várias movimentações de uma vez (executemany) e devolve os
+        ids criados, na ordem dos itens. Cada item é
+        (produto_id, tipo, quantidade, observacao[, valor_unitario]).
         """
-        return self.execute(query, (produto_id, tipo, quantidade, observacao))
+        params = [
+            (produto_id, tipo, quantidade, observacao, valor_unitario[0] if valor_unitario else None,
+             produto_id, produto_id)
+            for produto_id, tipo, quantidade, observacao, *valor_unitario in movimentacoes
+        ]
+        return self.insert_many(self._INSERT, params)
 
     def list_by_period(self, data_inicio: str, data_fim: str):
         """
@@ -32,8 +59,7 @@ class StockRepository(BaseRepository):
         query = """
             SELECT *
             FROM movimentacoes
-            WHERE DATE(data_movimentacao)
-                  BETWEEN DATE(?) AND DATE(?)
+            WHERE data_movimentacao >= ? AND data_movimentacao < ?
             ORDER BY data_movimentacao
         """
-        return self.fetchall(query, (data_inicio, data_fim))
+        return self.fetchall(query, day_range(data_inicio, data_fim))
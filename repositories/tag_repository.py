@@ -8,7 +8,7 @@ class TagRepository(BaseRepository):
     
     def create(self, nome: str):
         query = "INSERT INTO tags (nome) VALUES (?)"
-        self.execute(query, (nome,))
+        return self.execute(query, (nome,))
 
     def delete(self, tag_id: int):
         query = "DELETE FROM tags WHERE id = ?"
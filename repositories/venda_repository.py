@@ -0,0 +1,59 @@
+from repositories.base_repository import BaseRepository
+from utils.dates import day_range
+
+
+class VendaRepository(BaseRepository):
+    """Repositório para vendas (cabeçalho) e seus itens"""
+
+    def create(self, valor_total: float, fiado: bool = False, cliente: str | None = None, observacao: str = ""):
+        query = """
+        INSERT INTO vendas (valor_total, fiado, cliente, observacao)
+        VALUES (?, ?, ?, ?)
+        """
+        return self.execute(query, (valor_total, int(fiado), cliente, observacao))
+
+    def add_itens(self, itens: list[tuple]):
+        """
+        Grava os itens de uma venda com executemany.
+
+        Cada item é (venda_id, produto_id, quantidade, valor_unitario,
+        valor_total, movimentacao_id, fiado_id).
+        """
+        query = """
+        INSERT INTO venda_itens (
+            venda_id, produto_id, quantidade, valor_unitario,
+            valor_total, movimentacao_id, fiado_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        return self.execute_many(query, itens)
+
+    def get_by_id(self, venda_id: int):
+        query = """
+        SELECT id, valor_total, fiado, cliente, observacao, data_venda
+        FROM vendas
+        WHERE id = ?
+        """
+        return self.fetchone(query, (venda_id,))
+
+    def list_itens(self, venda_id: int):
+        query = """
+        SELECT vi.id, vi.produto_id, p.nome as produto_nome, vi.quantidade,
+               vi.valor_unitario, vi.valor_total, vi.movimentacao_id, vi.fiado_id
+        FROM venda_itens vi
+        JOIN produtos p ON p.id = vi.produto_id
+        WHERE vi.venda_id = ?
+        ORDER BY vi.id
+        """
+        return self.fetchall(query, (venda_id,))
+
+    def list_by_period(self, start_date, end_date):
+        query = """
+        SELECT v.id, v.valor_total, v.fiado, v.cliente, v.observacao, v.data_venda,
+               COUNT(vi.id) as total_itens
+        FROM vendas v
+        LEFT JOIN venda_itens vi ON vi.venda_id = v.id
+        WHERE v.data_venda >= ? AND v.data_venda < ?
+        GROUP BY v.id
+        ORDER BY v.data_venda DESC
+        """
+        return self.fetchall(query, day_range(start_date, end_date))
@@ -0,0 +1,64 @@
+from repositories.base_repository import BaseRepository
+
+
+class VendasDiariasRepository(BaseRepository):
+    """
+    Repositório do resumo diário de vendas (vendas_diarias).
+
+    O resumo é mantido pelos gatilhos de movimentacoes (migração 11); aqui
+    ficam só a reconstrução completa e a verificação contra o histórico.
+    """
+
+    # Totais por (dia, produto) recalculados direto de movimentacoes
+    _AGREGADO = """
+    SELECT
+        DATE(data_movimentacao) as dia,
+        produto_id,
+        SUM(quantidade) as quantidade,
+        COALESCE(SUM(quantidade * valor_unitario), 0) as faturamento,
+        COALESCE(SUM(quantidade * (valor_unitario - custo_unitario)), 0) as lucro,
+        COUNT(*) as vendas
+    FROM movimentacoes
+    WHERE tipo = 'SAIDA'
+    GROUP BY DATE(data_movimentacao), produto_id
+    """
+
+    def rebuild(self):
+        """Apaga e recalcula o resumo inteiro. Retorna quantas linhas foram gravadas."""
+        self.execute("DELETE FROM vendas_diarias")
+        self.execute(f"""
+        INSERT INTO vendas_diarias (dia, produto_id, quantidade, faturamento, lucro, vendas)
+        SELECT dia, produto_id, quantidade, faturamento, lucro, vendas FROM ({self._AGREGADO})
+        """)
+        return self.fetchone("SELECT COUNT(*) FROM vendas_diarias")[0]
+
+    def find_drift(self):
+        """
+        Linhas (dia, produto) em que o resumo difere de movimentacoes. Os
+        dois lados entram com sinais opostos e a soma deve zerar; valores
+        monetários são comparados com tolerância de centavo.
+        """
+        query = f"""
+        SELECT
+            d.dia,
+            d.produto_id,
+            p.nome,
+            SUM(d.quantidade) as diferenca_quantidade,
+            ROUND(SUM(d.faturamento), 2) as diferenca_faturamento,
+            SUM(d.vendas) as diferenca_vendas
+        FROM (
+            SELECT dia, produto_id, quantidade, faturamento, lucro, vendas
+            FROM vendas_diarias
+            UNION ALL
+            SELECT dia, produto_id, -quantidade, -faturamento, -lucro, -vendas
+            FROM ({self._AGREGADO})
+        ) d
+        LEFT JOIN produtos p ON p.id = d.produto_id
+        GROUP BY d.dia, d.produto_id
+        HAVING SUM(d.quantidade) <> 0
+            OR SUM(d.vendas) <> 0
+            OR ABS(SUM(d.faturamento)) >= 0.005
+            OR ABS(SUM(d.lucro)) >= 0.005
+        ORDER BY d.dia, d.produto_id
+        """
+        return self.fetchall(query)
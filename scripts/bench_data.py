@@ -0,0 +1,130 @@
+"""
+Apoio aos scripts de benchmark: banco de teste com histórico sintético.
+
+Os dados são gerados com semente fixa, então duas execuções com os mesmos
+parâmetros medem exatamente o mesmo banco.
+"""
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Permite rodar os scripts como `python scripts/<nome>.py` na raiz do projeto
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database.migrations import migrate  # noqa: E402
+
+SEED = 20240601
+
+
+def seed_database(conn, movimentacoes: int, produtos: int = 500, dias: int = 365, seed: int = SEED):
+    """
+    Aplica as migrações e grava produtos, movimentações (70% vendas), clientes,
+    fiados, prejuízos, vendas de carrinho e caixas distribuídos nos últimos `dias` dias.
+    """
+    migrate(conn)
+    rng = random.Random(seed)
+    agora = datetime.now().replace(microsecond=0)
+
+    conn.executemany(
+        "INSERT INTO produtos (nome, quantidade, valor_compra, valor_venda) VALUES (?, ?, ?, ?)",
+        [
+            (f"Produto {i:05d}", 1_000_000, round(custo, 2), round(custo * rng.uniform(1.1, 1.8), 2))
+            for i in range(1, produtos + 1)
+            for custo in [rng.uniform(1, 50)]
+        ],
+    )
+    precos = {
+        pid: (venda, compra)
+        for pid, venda, compra in conn.execute("SELECT id, valor_venda, valor_compra FROM produtos")
+    }
+
+    def momento():
+        return (agora - timedelta(seconds=rng.randrange(dias * 86400))).isoformat(" ")
+
+    def linhas():
+        for _ in range(movimentacoes):
+            pid = rng.randrange(1, produtos + 1)
+            venda, compra = precos[pid]
+            tipo = "SAIDA" if rng.random() < 0.7 else "ENTRADA"
+            yield (pid, tipo, rng.randint(1, 10), momento(), venda if tipo == "SAIDA" else compra, compra)
+
+    conn.executemany(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, data_movimentacao, valor_unitario, custo_unitario) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        linhas(),
+    )
+
+    n_extra = max(movimentacoes // 100, 10)
+    conn.executemany(
+        "INSERT INTO clientes (nome, chave) VALUES (?, ?)",
+        [(f"Cliente {i:03d}", f"cliente {i:03d}") for i in range(1, 201)],
+    )
+    conn.executemany(
+        "INSERT INTO fiados (produto_id, quantidade, valor_unitario, valor_total, cliente, cliente_id, data_fiado, pago) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (pid, q, precos[pid][0], round(q * precos[pid][0], 2), f"Cliente {cid:03d}", cid,
+             momento(), rng.random() < 0.6)
+            for _ in range(n_extra)
+            for pid in [rng.randrange(1, produtos + 1)]
+            for q in [rng.randint(1, 5)]
+            for cid in [rng.randint(1, 200)]
+        ],
+    )
+    # Saldo em aberto de cada cliente, como o StockService o mantém
+    conn.execute("""
+        UPDATE clientes
+        SET (saldo_aberto, fiados_abertos, primeiro_fiado_aberto) = (
+            SELECT COALESCE(SUM(valor_total), 0), COUNT(*), MIN(data_fiado)
+            FROM fiados
+            WHERE fiados.cliente_id = clientes.id AND pago = 0
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO prejuizos (produto_id, quantidade, valor_unitario, valor_total, motivo, data_prejuizo) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (pid, q, precos[pid][1], round(q * precos[pid][1], 2),
+             rng.choice(["Vencido", "Avariado", "Perda"]), momento())
+            for _ in range(n_extra)
+            for pid in [rng.randrange(1, produtos + 1)]
+            for q in [rng.randint(1, 5)]
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO vendas (valor_total, data_venda) VALUES (?, ?)",
+        [(round(rng.uniform(5, 300), 2), momento()) for _ in range(n_extra)],
+    )
+    conn.executemany(
+        "INSERT INTO caixa (data, valor_abertura, valor_fechamento) VALUES (?, ?, ?)",
+        [((agora - timedelta(days=d)).date().isoformat(), 100.0, 100.0 + d) for d in range(dias)],
+    )
+    conn.commit()
+
+
+def create_database(path, movimentacoes: int, **kwargs):
+    """Cria (ou recria) o banco de teste em `path` e retorna o tempo gasto (s)."""
+    path = Path(path)
+    for sufixo in ("", "-wal", "-shm", "-journal"):
+        Path(str(path) + sufixo).unlink(missing_ok=True)
+    inicio = time.perf_counter()
+    conn = sqlite3.connect(path)
+    try:
+        seed_database(conn, movimentacoes, **kwargs)
+    finally:
+        conn.close()
+    return time.perf_counter() - inicio
+
+
+def percentile(valores, p: float) -> float:
+    """Percentil por ordenação simples (p entre 0 e 100); 0.0 para lista vazia."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
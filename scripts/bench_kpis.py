@@ -0,0 +1,129 @@
+"""
+Benchmark dos cards da visão geral (AnalyticsRepository.get_kpis).
+
+Compara a consulta única com CTEs de get_kpis() com as quatro consultas
+usadas antes dela (get_total_statistics, get_stock_value,
+get_fiados_summary e get_prejuizos_summary): tempo médio e mínimo,
+número de passadas por tabela/índice no EXPLAIN QUERY PLAN e conferência
+de que os números são os mesmos.
+
+Uso (na raiz do projeto):
+    python scripts/bench_kpis.py [--rows 500000] [--products 5000] [--repeat 50]
+"""
+import argparse
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# bench_data coloca a raiz do projeto no sys.path
+from bench_data import create_database
+
+from database import connection
+from repositories.analytics_repository import AnalyticsRepository
+
+
+def capture_sql(conn, call):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def table_passes(conn, statements):
+    # Cada SCAN/SEARCH de uma tabela do banco é uma passada por ela (ou por
+    # um índice dela); linhas constantes e leituras das CTEs não contam
+    tabelas = {nome for (nome,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [
+        detail
+        for sql in statements
+        for *_, detail in conn.execute("EXPLAIN QUERY PLAN " + sql)
+        if detail.split()[0] in ("SCAN", "SEARCH") and detail.split()[1] in tabelas
+    ]
+
+
+def timings(call, repeat):
+    call()
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        call()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.mean(tempos), min(tempos)
+
+
+def check_same_numbers(kpis, total, estoque, fiados, prejuizos):
+    esperado = {
+        "total_produtos": total["total_produtos"],
+        "total_itens": total["total_itens"],
+        "total_vendas": total["total_vendas"],
+        "dias_com_vendas": total["dias_com_vendas"],
+        "valor_custo": estoque["valor_custo"],
+        "valor_venda": estoque["valor_venda"],
+        "fiados_abertos": fiados["count_open"],
+        "valor_fiados_abertos": fiados["total_open"],
+        "fiados_pagos": fiados["count_paid"],
+        "valor_fiados_pagos": fiados["total_paid"],
+        "prejuizos": prejuizos["count_total"],
+        "valor_prejuizos": prejuizos["total_valor"],
+    }
+    diferentes = {
+        campo: (kpis[campo], valor)
+        for campo, valor in esperado.items()
+        if abs(kpis[campo] - valor) > 1e-6
+    }
+    if diferentes:
+        raise SystemExit(f"get_kpis diverge das consultas antigas: {diferentes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="movimentações no banco de teste")
+    parser.add_argument("--products", type=int, default=5_000, help="produtos no banco de teste")
+    parser.add_argument("--repeat", type=int, default=50, help="execuções de cada variante")
+    args = parser.parse_args()
+
+    pasta = Path(tempfile.mkdtemp(prefix="bench_kpis_"))
+    path = pasta / "estoque.db"
+    criacao = create_database(path, args.rows, produtos=args.products)
+
+    connection.DB_PATH = path
+    connection._manager.db_path = path
+    conn = connection.get_connection()
+    repo = AnalyticsRepository()
+
+    antigas = [repo.get_total_statistics, repo.get_stock_value, repo.get_fiados_summary, repo.get_prejuizos_summary]
+
+    def variante_antiga():
+        return [consulta() for consulta in antigas]
+
+    try:
+        check_same_numbers(repo.get_kpis(), *variante_antiga())
+
+        print(
+            f"SQLite {sqlite3.sqlite_version}, {args.rows} movimentações, {args.products} produtos"
+            f" (banco criado em {criacao:.1f} s), {args.repeat} execuções"
+        )
+        for nome, call in (("4 consultas antigas", variante_antiga), ("get_kpis (CTE única)", repo.get_kpis)):
+            statements = capture_sql(conn, call)
+            passadas = table_passes(conn, statements)
+            media, minimo = timings(call, args.repeat)
+            print(
+                f"{nome:<22} {len(statements)} consulta(s), {len(passadas):>2} passadas:"
+                f" média {media:.2f} ms, mínimo {minimo:.2f} ms"
+            )
+            for detalhe in passadas:
+                print(f"    {detalhe}")
+        print("Números idênticos nas duas variantes.")
+    finally:
+        connection.close_all_connections()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
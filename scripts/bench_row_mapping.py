@@ -0,0 +1,115 @@
+"""
+Benchmark do mapeamento de linhas dos repositórios (repositories.base_repository).
+
+Compara, sobre as mesmas consultas, o formato antigo (sqlite3.Row convertido
+em um dict por linha) com os registros de map_rows()/record_type(), em
+tempo de execução e memória (tracemalloc):
+
+  - ProductRepository.list_all() com muitos produtos;
+  - StockRepository.list_by_period() sobre um ano de movimentações.
+
+O lado "registros" chama o próprio repositório; o lado "dict" executa o
+mesmo SQL (capturado da chamada do repositório) e monta os dicts como o
+código anterior fazia.
+
+Uso (na raiz do projeto):
+    python scripts/bench_row_mapping.py [--products 50000] [--rows 200000] [--repeat 5]
+"""
+import argparse
+import gc
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+# bench_data coloca a raiz do projeto no sys.path
+from bench_data import create_database
+
+from database import connection
+from repositories.product_repository import ProductRepository
+from repositories.stock_repository import StockRepository
+
+
+def capture_sql(conn, call):
+    # SQL (com parâmetros já expandidos) da última consulta feita por call()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH"))][-1]
+
+
+def as_dicts(conn, sql):
+    # Formato anterior: sqlite3.Row e um dict novo por linha
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return [dict(row) for row in cursor.execute(sql).fetchall()]
+
+
+def measure(func, repeat):
+    """(melhor tempo em ms, memória retida pelo resultado em MiB, pico em MiB)."""
+    tempos = []
+    for _ in range(repeat):
+        gc.collect()
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    resultado = func()
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return min(tempos), (retido - base) / 2**20, (pico - base) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=50_000, help="produtos no banco de teste")
+    parser.add_argument("--rows", type=int, default=200_000, help="movimentações no banco de teste")
+    parser.add_argument("--repeat", type=int, default=5, help="execuções por caso (vale a mais rápida)")
+    args = parser.parse_args()
+
+    pasta = Path(tempfile.mkdtemp(prefix="bench_rows_"))
+    path = pasta / "estoque.db"
+    create_database(path, args.rows, produtos=args.products)
+
+    # Os repositórios usam o gerenciador de conexões da aplicação
+    connection.DB_PATH = path
+    connection._manager.db_path = path
+    conn = connection.get_connection()
+
+    hoje = date.today()
+    casos = {
+        "ProductRepository.list_all": lambda: ProductRepository().list_all(),
+        "StockRepository.list_by_period (1 ano)": lambda: StockRepository().list_by_period(
+            hoje - timedelta(days=365), hoje
+        ),
+    }
+
+    print(f"SQLite {sqlite3.sqlite_version}, {args.products} produtos, {args.rows} movimentações")
+    print(f"{'consulta':<40} {'formato':<10} {'linhas':>8} {'tempo':>10} {'retido':>10} {'pico':>10}")
+    try:
+        for nome, call in casos.items():
+            sql = capture_sql(conn, call)
+            linhas = len(call())
+            for formato, func in (("dict", lambda: as_dicts(conn, sql)), ("registros", call)):
+                tempo, retido, pico = measure(func, args.repeat)
+                print(
+                    f"{nome:<40} {formato:<10} {linhas:>8} {tempo:>8.1f}ms"
+                    f" {retido:>7.1f}MiB {pico:>7.1f}MiB"
+                )
+    finally:
+        connection.close_all_connections()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
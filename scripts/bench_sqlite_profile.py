@@ -0,0 +1,195 @@
+"""
+Benchmark do perfil de desempenho do SQLite (database.connection.apply_performance_profile).
+
+Compara o perfil de config.py com os PRAGMAs padrão que a aplicação usava
+antes dele (journal DELETE, synchronous FULL, cache e mmap padrão) em:
+
+  1. latência de escrita: vendas gravadas uma por transação, como no PDV;
+  2. leitura concorrente: N threads repetindo uma consulta de análise
+     enquanto outra thread grava vendas, medindo leituras por segundo e a
+     latência das escritas durante as leituras.
+
+Uso (na raiz do projeto):
+    python scripts/bench_sqlite_profile.py [--rows 200000] [--writes 500]
+        [--readers 4] [--seconds 10] [--dir PASTA]
+"""
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# bench_data coloca a raiz do projeto no sys.path
+from bench_data import create_database, percentile
+
+import config
+from database.connection import apply_performance_profile
+
+# Consulta de leitura: faturamento por produto nos últimos 90 dias (aba de análises)
+READ_QUERY = """
+    SELECT produto_id, SUM(quantidade * valor_unitario)
+    FROM movimentacoes
+    WHERE tipo = 'SAIDA' AND data_movimentacao >= DATE('now', '-90 days')
+    GROUP BY produto_id
+"""
+
+
+def apply_baseline(conn, read_only=False):
+    # PRAGMAs anteriores ao perfil: os padrões do SQLite (o timeout de 5 s
+    # do sqlite3.connect vira o busy_timeout)
+    if not read_only:
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("PRAGMA synchronous = FULL")
+
+
+def apply_profile(conn, read_only=False):
+    apply_performance_profile(conn, read_only=read_only)
+
+
+PROFILES = {"padrão": apply_baseline, "perfil": apply_profile}
+
+
+def connect(path, apply, read_only=False):
+    if read_only and apply is apply_profile:
+        # Como o pool de leitura da aplicação: conexão mode=ro
+        conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
+    apply(conn, read_only=read_only)
+    return conn
+
+
+def record_sale(conn, produto_id):
+    # Mesma forma de uma venda do PDV: baixa de estoque + movimentação
+    conn.execute("UPDATE produtos SET quantidade = quantidade - 1 WHERE id = ?", (produto_id,))
+    conn.execute(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, valor_unitario, custo_unitario) "
+        "SELECT id, 'SAIDA', 1, valor_venda, valor_compra FROM produtos WHERE id = ?",
+        (produto_id,),
+    )
+    conn.commit()
+
+
+def bench_writes(path, apply, writes):
+    conn = connect(path, apply)
+    produtos = conn.execute("SELECT COUNT(*) FROM produtos").fetchone()[0]
+    tempos = []
+    try:
+        for i in range(writes):
+            inicio = time.perf_counter()
+            record_sale(conn, i % produtos + 1)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        conn.close()
+    return tempos
+
+
+def bench_concurrency(path, apply, readers, seconds):
+    parar = threading.Event()
+    leituras = []
+    escritas = []
+    erros = []
+    lock = threading.Lock()
+
+    def leitor():
+        conn = connect(path, apply, read_only=True)
+        tempos = []
+        try:
+            while not parar.is_set():
+                inicio = time.perf_counter()
+                try:
+                    conn.execute(READ_QUERY).fetchall()
+                except sqlite3.OperationalError as e:
+                    with lock:
+                        erros.append(str(e))
+                    continue
+                tempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            conn.close()
+        with lock:
+            leituras.extend(tempos)
+
+    def escritor():
+        conn = connect(path, apply)
+        produtos = conn.execute("SELECT COUNT(*) FROM produtos").fetchone()[0]
+        i = 0
+        try:
+            while not parar.is_set():
+                inicio = time.perf_counter()
+                try:
+                    record_sale(conn, i % produtos + 1)
+                except sqlite3.OperationalError as e:
+                    conn.rollback()
+                    with lock:
+                        erros.append(str(e))
+                    continue
+                escritas.append((time.perf_counter() - inicio) * 1000)
+                i += 1
+                # Ritmo de um caixa movimentado, não um laço de escrita contínua
+                time.sleep(0.005)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=leitor) for _ in range(readers)]
+    threads.append(threading.Thread(target=escritor))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    parar.set()
+    for t in threads:
+        t.join()
+    return leituras, escritas, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="movimentações no banco de teste")
+    parser.add_argument("--writes", type=int, default=500, help="vendas gravadas no teste de escrita")
+    parser.add_argument("--readers", type=int, default=4, help="threads de leitura no teste de concorrência")
+    parser.add_argument("--seconds", type=float, default=10, help="duração do teste de concorrência")
+    parser.add_argument("--dir", help="pasta dos bancos de teste (padrão: temporária)")
+    args = parser.parse_args()
+
+    pasta = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix="bench_sqlite_"))
+    pasta.mkdir(parents=True, exist_ok=True)
+    print(f"SQLite {sqlite3.sqlite_version}, {args.rows} movimentações, bancos em {pasta}")
+    print(
+        f"perfil: journal_mode={config.DB_JOURNAL_MODE} synchronous={config.DB_SYNCHRONOUS} "
+        f"cache_size={config.DB_CACHE_SIZE} mmap_size={config.DB_MMAP_SIZE} temp_store={config.DB_TEMP_STORE}"
+    )
+    print()
+
+    for nome, apply in PROFILES.items():
+        path = pasta / f"{'baseline' if apply is apply_baseline else 'profile'}.db"
+        criacao = create_database(path, args.rows)
+        # O modo do journal fica gravado no arquivo: aplica o perfil antes de medir
+        connect(path, apply).close()
+
+        tempos = bench_writes(path, apply, args.writes)
+        leituras, escritas, erros = bench_concurrency(path, apply, args.readers, args.seconds)
+
+        print(f"[{nome}] banco criado em {criacao:.1f} s")
+        print(
+            f"  escrita isolada ({len(tempos)} vendas): p50 {percentile(tempos, 50):.2f} ms"
+            f"  p95 {percentile(tempos, 95):.2f} ms  máx {max(tempos):.2f} ms"
+        )
+        print(
+            f"  {args.readers} leitores + 1 escritor por {args.seconds:g} s:"
+            f" {len(leituras) / args.seconds:.1f} leituras/s"
+            f" (p95 {percentile(leituras, 95):.1f} ms),"
+            f" {len(escritas)} vendas (p50 {percentile(escritas, 50):.2f} ms,"
+            f" p95 {percentile(escritas, 95):.2f} ms, máx {max(escritas, default=0):.2f} ms),"
+            f" {len(erros)} erros"
+        )
+        if erros:
+            print(f"  primeiro erro: {erros[0]}")
+        print()
+
+    if not args.dir:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
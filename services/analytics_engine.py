@@ -0,0 +1,349 @@
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import config
+from database.connection import data_generation
+from repositories.analytics_repository import AnalyticsRepository
+from repositories.base_repository import record_type
+from utils.dates import day_range, to_date
+
+try:
+    import numpy as np
+except ImportError:  # O motor é opcional; sem numpy as análises ficam no SQL
+    np = None
+
+# Número do dia: dias desde 1970-01-01 (mesma conta da carga em SQL)
+_EPOCH = date(1970, 1, 1).toordinal()
+
+# Colunas das movimentações em memória, na ordem de get_movement_columns
+_COLUNAS = ("id", "produto", "dia", "saida", "quantidade", "faturamento", "lucro")
+_TIPOS = ("i8", "i8", "i4", "?", "i8", "f8", "f8")
+
+
+def _day_key(value) -> int:
+    return to_date(value).toordinal() - _EPOCH
+
+def _day_str(key) -> str:
+    return date.fromordinal(int(key) + _EPOCH).isoformat()
+
+def _today() -> date:
+    # DATE('now') do SQLite é em UTC
+    return datetime.now(timezone.utc).date()
+
+def _months_before(day: date, months: int) -> date:
+    # Mesma conta de DATE('now', '-N months'): volta os meses e deixa o dia
+    # transbordar para o mês seguinte (31/03 menos um mês = 03/03)
+    total = day.year * 12 + day.month - 1 - months
+    year, month = divmod(total, 12)
+    return date(year, month + 1, 1) + timedelta(days=day.day - 1)
+
+def _records(columns: tuple, rows) -> list:
+    make = record_type(columns)
+    return [make(*row) for row in rows]
+
+
+class AnalyticsEngine:
+    """
+    Motor de análises em memória sobre o histórico de movimentações.
+
+    Na primeira consulta carrega as colunas de movimentacoes (produto, dia,
+    tipo, quantidade, faturamento e lucro) e de produtos em arrays NumPy;
+    depois disso cada consulta só busca as movimentações com id maior que o
+    último carregado. As movimentações ficam ordenadas por dia, então um
+    período é uma fatia encontrada com searchsorted, e os agrupamentos por
+    dia, mês ou produto são np.bincount sobre a fatia.
+
+    Os totais de venda por produto são calculados uma vez e reaproveitados
+    por top produtos, margens e curva ABC até chegarem dados novos.
+
+    Movimentações não são alteradas pela aplicação, só inseridas; remoções
+    (exclusão de produto, restauração de backup) são percebidas contando as
+    linhas já carregadas, o que é feito a cada escrita desta aplicação e no
+    máximo a cada config.ANALYTICS_ENGINE_VERIFY_SECONDS para as de outros
+    terminais. Nesse caso tudo é recarregado.
+
+    Os resultados têm o mesmo formato dos métodos de AnalyticsRepository
+    correspondentes.
+    """
+
+    def __init__(self, repository: AnalyticsRepository = None):
+        self.repository = repository or AnalyticsRepository()
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._generation = None
+        self._verified_at = 0.0
+        self._last_id = 0
+        self._size = 0
+        self._columns = {}
+        self._totals = None
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    # --- Carga -----------------------------------------------------------
+
+    def refresh(self):
+        """Traz as movimentações novas (e recarrega tudo se houve remoção)."""
+        with self._lock:
+            generation = data_generation()
+            verify = (
+                generation != self._generation
+                or time.monotonic() - self._verified_at > config.ANALYTICS_ENGINE_VERIFY_SECONDS
+            )
+            if not self._loaded or (
+                verify and self.repository.count_movements_until(self._last_id) != self._size
+            ):
+                self._load_all()
+            else:
+                novas = self.repository.get_movement_columns(self._last_id)
+                if novas:
+                    self._append(self._to_columns(novas))
+                if novas or verify:
+                    self._load_products()
+            if verify:
+                self._generation = generation
+                self._verified_at = time.monotonic()
+
+    def reset(self):
+        """Descarta os dados carregados; a próxima consulta recarrega tudo (ex.: backup restaurado)."""
+        with self._lock:
+            self._loaded = False
+            self._generation = None
+
+    def _to_columns(self, rows):
+        dados = np.array(rows, dtype=list(zip(_COLUNAS, _TIPOS)))
+        return {nome: np.ascontiguousarray(dados[nome]) for nome in _COLUNAS}
+
+    def _load_all(self):
+        self._columns = {nome: np.empty(0, dtype=tipo) for nome, tipo in zip(_COLUNAS, _TIPOS)}
+        self._size = 0
+        self._last_id = 0
+        self._append(self._to_columns(self.repository.get_movement_columns()))
+        self._load_products()
+        self._loaded = True
+
+    def _append(self, novas):
+        # Os arrays crescem com folga (dobrando) para que a chegada de poucas
+        # movimentações não copie o histórico inteiro a cada consulta
+        quantidade = len(novas["id"])
+        if not quantidade:
+            return
+        inicio, fim = self._size, self._size + quantidade
+        capacidade = len(self._columns["id"])
+        if fim > capacidade:
+            capacidade = max(fim, capacidade * 2, 1024)
+            for nome, array in self._columns.items():
+                maior = np.empty(capacidade, dtype=array.dtype)
+                maior[:inicio] = array[:inicio]
+                self._columns[nome] = maior
+
+        fora_de_ordem = inicio > 0 and novas["dia"].min() < self._columns["dia"][inicio - 1]
+        for nome, array in self._columns.items():
+            array[inicio:fim] = novas[nome]
+        self._size = fim
+        self._last_id = int(novas["id"][-1])
+
+        # Carga inicial (em ordem de id) ou movimentação com data anterior às
+        # já carregadas: reordena por dia mantendo a ordem de id nos empates
+        if inicio == 0 or fora_de_ordem or not np.all(novas["dia"][1:] >= novas["dia"][:-1]):
+            ordem = np.argsort(self._columns["dia"][:fim], kind="stable")
+            for array in self._columns.values():
+                array[:fim] = array[:fim][ordem]
+        self._totals = None
+
+    def _load_products(self):
+        rows = self.repository.get_product_columns()
+        tamanho = (rows[-1][0] + 1) if rows else 1
+        self._names = [None] * tamanho
+        self._cost = np.zeros(tamanho)
+        self._price = np.zeros(tamanho)
+        self._active = np.zeros(tamanho, dtype=bool)
+        self._exists = np.zeros(tamanho, dtype=bool)
+        for produto_id, nome, custo, venda, ativo in rows:
+            self._names[produto_id] = nome
+            self._cost[produto_id] = custo
+            self._price[produto_id] = venda
+            self._active[produto_id] = bool(ativo)
+            self._exists[produto_id] = True
+        self._totals = None
+
+    # --- Acesso às colunas ----------------------------------------------
+
+    def _column(self, nome):
+        return self._columns[nome][:self._size]
+
+    def _slice(self, inicio_dia=None, fim_dia=None):
+        # Fatia [inicio_dia, fim_dia) das colunas ordenadas por dia
+        dias = self._column("dia")
+        a = 0 if inicio_dia is None else int(np.searchsorted(dias, inicio_dia, side="left"))
+        b = self._size if fim_dia is None else int(np.searchsorted(dias, fim_dia, side="left"))
+        return {nome: self._column(nome)[a:b] for nome in _COLUNAS}
+
+    def _product_size(self, produtos):
+        return max(len(self._names), int(produtos.max()) + 1 if len(produtos) else 0)
+
+    def _product_totals(self):
+        # Vendas (SAIDA) de todo o histórico por produto: quantidade,
+        # faturamento, lucro e número de movimentações
+        if self._totals is None:
+            saida = self._column("saida")
+            produtos = self._column("produto")[saida]
+            n = self._product_size(produtos)
+            self._totals = {
+                "quantidade": np.bincount(produtos, weights=self._column("quantidade")[saida], minlength=n),
+                "faturamento": np.bincount(produtos, weights=self._column("faturamento")[saida], minlength=n),
+                "lucro": np.bincount(produtos, weights=self._column("lucro")[saida], minlength=n),
+                "vendas": np.bincount(produtos, minlength=n),
+            }
+        return self._totals
+
+    def _existing(self, ids):
+        # Só os ids que existem em produtos (equivale ao JOIN do SQL)
+        ids = ids[ids < len(self._exists)]
+        return ids[self._exists[ids]]
+
+    # --- Análises ---------------------------------------------------------
+
+    def sales_by_period(self, start_date, end_date):
+        """Vendas por dia no período (como AnalyticsRepository.get_sales_by_period)"""
+        with self._lock:
+            self.refresh()
+            inicio, fim = (_day_key(d) for d in day_range(start_date, end_date))
+            fatia = self._slice(inicio, fim)
+            saida = fatia["saida"]
+            dias = fatia["dia"][saida] - inicio
+            n = max(fim - inicio, 0)
+            vendas = np.bincount(dias, minlength=n)
+            faturamento = np.bincount(dias, weights=fatia["faturamento"][saida], minlength=n)
+            lucro = np.bincount(dias, weights=fatia["lucro"][saida], minlength=n)
+
+            com_venda = np.flatnonzero(vendas)
+            return _records(("data", "faturamento", "lucro"), zip(
+                (_day_str(inicio + k) for k in com_venda.tolist()),
+                faturamento[com_venda].tolist(),
+                lucro[com_venda].tolist(),
+            ))
+
+    def monthly_summary(self, months=12):
+        """Resumo mensal de vendas e lucro (como AnalyticsRepository.get_monthly_summary)"""
+        with self._lock:
+            self.refresh()
+            fatia = self._slice(_day_key(_months_before(_today(), months)))
+            saida = fatia["saida"]
+            meses = fatia["dia"][saida].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+            if not len(meses):
+                return []
+            primeiro = int(meses.min())
+            meses -= primeiro
+            vendas = np.bincount(meses)
+            quantidade = np.bincount(meses, weights=fatia["quantidade"][saida])
+            faturamento = np.bincount(meses, weights=fatia["faturamento"][saida])
+            lucro = np.bincount(meses, weights=fatia["lucro"][saida])
+
+            com_venda = np.flatnonzero(vendas)[::-1]
+            return _records(("mes", "qtd_vendida", "faturamento", "lucro"), zip(
+                (str(np.datetime64(primeiro + k, "M")) for k in com_venda.tolist()),
+                quantidade[com_venda].astype(np.int64).tolist(),
+                faturamento[com_venda].tolist(),
+                lucro[com_venda].tolist(),
+            ))
+
+    def top_products(self, limit=10):
+        """Produtos mais vendidos (como AnalyticsRepository.get_top_products)"""
+        with self._lock:
+            self.refresh()
+            totais = self._product_totals()
+            ids = self._existing(np.flatnonzero(totais["vendas"]))
+            quantidade = totais["quantidade"][ids]
+            # Maior quantidade primeiro; empates pelo id
+            ids = ids[np.lexsort((ids, -quantidade))][:limit]
+            return _records(("id", "nome", "quantidade", "faturamento", "lucro"), zip(
+                ids.tolist(),
+                (self._names[i] for i in ids.tolist()),
+                totais["quantidade"][ids].astype(np.int64).tolist(),
+                totais["faturamento"][ids].tolist(),
+                totais["lucro"][ids].tolist(),
+            ))
+
+    def product_turnover(self, days=30):
+        """Rotatividade dos últimos N dias (como AnalyticsRepository.get_product_turnover)"""
+        with self._lock:
+            self.refresh()
+            fatia = self._slice(_day_key(_today() - timedelta(days=days)))
+            produtos = fatia["produto"]
+            n = self._product_size(produtos)
+            quantidade = fatia["quantidade"]
+            movimentacoes = np.bincount(produtos, minlength=n)
+            saidas = np.bincount(produtos, weights=np.where(fatia["saida"], quantidade, 0), minlength=n)
+            entradas = np.bincount(produtos, weights=np.where(fatia["saida"], 0, quantidade), minlength=n)
+
+            ids = self._existing(np.flatnonzero(movimentacoes))
+            ids = ids[np.lexsort((ids, -saidas[ids]))]
+            return _records(("id", "nome", "movimentacoes", "saidas", "entradas"), zip(
+                ids.tolist(),
+                (self._names[i] for i in ids.tolist()),
+                movimentacoes[ids].tolist(),
+                saidas[ids].astype(np.int64).tolist(),
+                entradas[ids].astype(np.int64).tolist(),
+            ))
+
+    def profit_margins(self):
+        """Margem por produto ativo (como AnalyticsRepository.get_profit_margin_by_product)"""
+        with self._lock:
+            self.refresh()
+            totais = self._product_totals()
+            ids = np.flatnonzero(self._active)
+            custo = self._cost[ids]
+            venda = self._price[ids]
+            com_preco = venda != 0
+            margem = np.full(len(ids), np.nan)
+            margem[com_preco] = np.round((venda[com_preco] - custo[com_preco]) / venda[com_preco] * 100, 2)
+
+            # Maior margem primeiro; sem preço de venda (margem NULL) por último
+            ordem = np.lexsort((ids, -np.nan_to_num(margem, nan=-np.inf)))
+            ids, custo, venda, margem = ids[ordem], custo[ordem], venda[ordem], margem[ordem]
+            dentro = ids < len(totais["vendas"])
+            vendidas = np.zeros(len(ids), dtype=np.int64)
+            lucro = np.zeros(len(ids))
+            vendidas[dentro] = totais["quantidade"][ids[dentro]]
+            lucro[dentro] = totais["lucro"][ids[dentro]]
+            return _records(("id", "nome", "custo", "venda", "margem", "vendidas", "lucro_total"), zip(
+                ids.tolist(),
+                (self._names[i] for i in ids.tolist()),
+                custo.tolist(),
+                venda.tolist(),
+                (None if np.isnan(m) else m for m in margem.tolist()),
+                vendidas.tolist(),
+                lucro.tolist(),
+            ))
+
+    def abc_curve(self, limite_a, limite_b):
+        """Curva ABC pelo faturamento (como AnalyticsRepository.get_abc_curve)"""
+        with self._lock:
+            self.refresh()
+            totais = self._product_totals()
+            ids = self._existing(np.flatnonzero(totais["faturamento"] > 0))
+            faturamento = totais["faturamento"][ids]
+            ordem = np.lexsort((ids, -faturamento))
+            ids, faturamento = ids[ordem], faturamento[ordem]
+            if not len(ids):
+                return []
+
+            participacao = faturamento * 100.0 / faturamento.sum()
+            acumulado = np.cumsum(participacao)
+            anterior = acumulado - participacao
+            classe = np.where(anterior < limite_a, "A", np.where(anterior < limite_b, "B", "C"))
+            return _records(("id", "nome", "faturamento", "participacao", "acumulado", "classe"), zip(
+                ids.tolist(),
+                (self._names[i] for i in ids.tolist()),
+                faturamento.tolist(),
+                participacao.tolist(),
+                acumulado.tolist(),
+                classe.tolist(),
+            ))
+
+
+# Motor compartilhado pelas instâncias do AnalyticsService
+analytics_engine = AnalyticsEngine()
@@ -1,5 +1,18 @@
+import time
 from datetime import datetime, timedelta
+
+import config
+from database.reader_pool import reader_pool
+from models.dashboard import DashboardSnapshot
+from models.kpi import Kpis
 from repositories.analytics_repository import AnalyticsRepository
+from repositories.cliente_repository import ClienteRepository
+from services.analytics_engine import analytics_engine
+from services.result_cache import ResultCache
+
+# Resultados das análises, compartilhados por todas as instâncias do serviço:
+# reabrir o dashboard sem nenhuma escrita no meio não consulta o banco
+analytics_cache = ResultCache(config.ANALYTICS_CACHE_SIZE, config.ANALYTICS_CACHE_TTL_SECONDS)
 
 
 class AnalyticsService:
@@ -7,13 +20,28 @@ class AnalyticsService:
 
     def __init__(self):
         self.repository = AnalyticsRepository()
-
+        self.cliente_repository = ClienteRepository()
+
+    def _engine(self, metodo: str):
+        # Motor em memória, se o numpy estiver instalado e o método estiver
+        # ligado em config.ANALYTICS_ENGINE_METHODS; senão None (usa o SQL)
+        if analytics_engine.available and config.ANALYTICS_ENGINE_METHODS.get(metodo):
+            return analytics_engine
+        return None
+
+    def _sales_by_period(self, metodo: str, start_date, end_date):
+        engine = self._engine(metodo)
+        if engine:
+            return engine.sales_by_period(start_date, end_date)
+        return self.repository.get_sales_by_period(start_date, end_date)
+
+    @analytics_cache.cached
     def get_sales_chart_data(self, days=30):
         """Dados para gráfico de vendas"""
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
         
-        data = self.repository.get_sales_by_period(start_date, end_date)
+        data = self._sales_by_period("get_sales_chart_data", start_date, end_date)
         
         if not data:
             return [], []
@@ -23,12 +51,13 @@ class AnalyticsService:
         
         return dates, faturamentos
 
+    @analytics_cache.cached
     def get_profit_chart_data(self, days=30):
         """Dados para gráfico de lucro"""
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
         
-        data = self.repository.get_sales_by_period(start_date, end_date)
+        data = self._sales_by_period("get_profit_chart_data", start_date, end_date)
         
         if not data:
             return [], []
@@ -38,247 +67,182 @@ class AnalyticsService:
         
         return dates, lucros
 
+    # Os métodos abaixo retornam os registros do repositório (ou do motor em
+    # memória, no mesmo formato) diretamente: as colunas já vêm com os nomes
+    # usados pela interface e com COALESCE aplicado na própria consulta.
+
+    @analytics_cache.cached
     def get_top_products_data(self, limit=10):
         """Dados dos produtos mais vendidos"""
-        data = self.repository.get_top_products(limit)
-        return [
-            {
-                "id": row[0],
-                "nome": row[1],
-                "quantidade": row[2],
-                "faturamento": row[3] or 0,
-                "lucro": row[4] or 0
-            }
-            for row in data
-        ]
+        engine = self._engine("get_top_products_data")
+        if engine:
+            return engine.top_products(limit)
+        return self.repository.get_top_products(limit)
 
+    @analytics_cache.cached
     def get_category_performance(self):
         """Desempenho por categoria"""
-        data = self.repository.get_products_by_category()
-        return [
-            {
-                "categoria": row[0],
-                "produtos": row[1],
-                "vendidas": row[2] or 0,
-                "faturamento": row[3] or 0,
-                "lucro": row[4] or 0
-            }
-            for row in data
-        ]
+        return self.repository.get_products_by_category()
 
+    @analytics_cache.cached
     def get_stock_metrics(self):
         """Métricas de estoque"""
-        data = self.repository.get_stock_value()
-        
-        if not data:
-            return {
-                "valor_custo": 0,
-                "valor_venda": 0,
-                "total_produtos": 0,
-                "total_itens": 0
-            }
-        
-        return {
-            "valor_custo": data[0] or 0,
-            "valor_venda": data[1] or 0,
-            "total_produtos": data[2] or 0,
-            "total_itens": data[3] or 0
-        }
+        return self.repository.get_stock_value()
 
+    @analytics_cache.cached
     def get_low_stock_alert(self):
         """Produtos com estoque baixo"""
-        data = self.repository.get_low_stock_products()
-        return [
-            {
-                "id": row[0],
-                "nome": row[1],
-                "quantidade": row[2],
-                "minimo": row[3],
-                "valor": row[4]
-            }
-            for row in data
-        ]
+        return self.repository.get_low_stock_products()
 
+    @analytics_cache.cached
     def get_turnover_analysis(self, days=30):
         """Análise de rotatividade"""
-        data = self.repository.get_product_turnover(days)
-        return [
-            {
-                "id": row[0],
-                "nome": row[1],
-                "movimentacoes": row[2],
-                "saidas": row[3] or 0,
-                "entradas": row[4] or 0
-            }
-            for row in data
-        ]
+        engine = self._engine("get_turnover_analysis")
+        if engine:
+            return engine.product_turnover(days)
+        return self.repository.get_product_turnover(days)
 
+    @analytics_cache.cached
     def get_profit_margins(self):
         """Margens de lucro por produto"""
-        data = self.repository.get_profit_margin_by_product()
-        return [
-            {
-                "id": row[0],
-                "nome": row[1],
-                "custo": row[2],
-                "venda": row[3],
-                "margem": row[4],
-                "vendidas": row[5] or 0,
-                "lucro_total": row[6] or 0
-            }
-            for row in data
-        ]
+        engine = self._engine("get_profit_margins")
+        if engine:
+            return engine.profit_margins()
+        return self.repository.get_profit_margin_by_product()
 
+    @analytics_cache.cached
     def get_expiring_products(self, days=30):
         """Produtos próximos do vencimento"""
-        data = self.repository.get_expiring_products(days)
-        return [
-            {
-                "id": row[0],
-                "nome": row[1],
-                "validade": row[2],
-                "quantidade": row[3],
-                "valor": row[4],
-                "dias": row[5] or 0
-            }
-            for row in data
-        ]
+        return self.repository.get_expiring_products(days)
 
+    @analytics_cache.cached
     def get_inactive_products(self, days=60):
         """Produtos encalhados sem movimentação"""
-        data = self.repository.get_inactive_products(days)
-        return [
-            {
-                "id": row[0],
-                "nome": row[1],
-                "quantidade": row[2],
-                "data_cadastro": row[3],
-                "valor": row[4],
-                "dias_parado": row[5] or 999
-            }
-            for row in data
-        ]
+        return self.repository.get_inactive_products(days)
 
+    @analytics_cache.cached
     def get_monthly_summary(self, months=12):
         """Resumo mensal"""
-        data = self.repository.get_monthly_summary(months)
-        return [
-            {
-                "mes": row[0],
-                "qtd_vendida": row[1] or 0,
-                "faturamento": row[2] or 0,
-                "lucro": row[3] or 0
-            }
-            for row in data
-        ]
-
+        engine = self._engine("get_monthly_summary")
+        if engine:
+            return engine.monthly_summary(months)
+        return self.repository.get_monthly_summary(months)
+
+    @analytics_cache.cached
+    def get_abc_curve(self):
+        """Curva ABC dos produtos pelo faturamento"""
+        limite_a, limite_b = config.ANALYTICS_ABC_LIMITE_A, config.ANALYTICS_ABC_LIMITE_B
+        engine = self._engine("get_abc_curve")
+        if engine:
+            return engine.abc_curve(limite_a, limite_b)
+        return self.repository.get_abc_curve(limite_a, limite_b)
+
+    @analytics_cache.cached
     def get_fiados_summary(self):
-        data = self.repository.get_fiados_summary()
-        if not data:
-            return {
-                "count_open": 0,
-                "total_open": 0,
-                "count_paid": 0,
-                "total_paid": 0
-            }
-
-        return {
-            "count_open": data[0] or 0,
-            "total_open": data[1] or 0,
-            "count_paid": data[2] or 0,
-            "total_paid": data[3] or 0
-        }
+        return self.repository.get_fiados_summary()
+
+    @analytics_cache.cached
+    def get_clientes_em_aberto(self):
+        """Saldo em aberto e idade do fiado mais antigo de cada cliente"""
+        return self.cliente_repository.list_open_balances()
+
+    @analytics_cache.cached
+    def get_fiados_aging(self):
+        """Saldo em aberto por faixa de atraso"""
+        return self.cliente_repository.get_aging_summary()
 
+    @analytics_cache.cached
     def get_prejuizos_summary(self):
-        data = self.repository.get_prejuizos_summary()
-        if not data:
-            return {"count_total": 0, "total_valor": 0}
-        return {"count_total": data[0] or 0, "total_valor": data[1] or 0}
+        return self.repository.get_prejuizos_summary()
 
+    @analytics_cache.cached
     def get_prejuizos_by_motivo(self, limit=10):
-        data = self.repository.get_prejuizos_by_motivo(limit)
-        return [
-            {"motivo": row[0], "count": row[1] or 0, "total": row[2] or 0}
-            for row in data
-        ]
+        return self.repository.get_prejuizos_by_motivo(limit)
 
+    @analytics_cache.cached
     def get_prejuizos_detalhados(self, start_date=None, end_date=None):
         """Retorna lista detalhada de prejuduizos com observações"""
-        data = self.repository.get_prejuizos_detalhados(start_date, end_date)
-        return [
-            {
-                "id": row[0],
-                "produto_id": row[1],
-                "produto_nome": row[2],
-                "quantidade": row[3],
-                "valor_unitario": row[4],
-                "valor_total": row[5],
-                "motivo": row[6],
-                "observacao": row[7],
-                "data_prejuizo": row[8]
-            }
-            for row in data
-        ]
+        return self.repository.get_prejuizos_detalhados(start_date, end_date)
 
+    @analytics_cache.cached
     def get_fiados_detalhados(self, start_date=None, end_date=None):
         """Retorna lista detalhada de fiados (abertos e pagos)"""
-        data = self.repository.get_fiados_detalhados(start_date, end_date)
+        # pago vem do SQLite como 0/1; a lista sempre entregou bool
         return [
-            {
-                "id": row[0],
-                "produto_id": row[1],
-                "produto_nome": row[2],
-                "quantidade": row[3],
-                "valor_unitario": row[4],
-                "valor_total": row[5],
-                "cliente": row[6],
-                "observacao": row[7],
-                "pago": bool(row[8]),
-                "data_fiado": row[9],
-                "data_pagamento": row[10]
-            }
-            for row in data
+            row._replace(pago=bool(row.pago))
+            for row in self.repository.get_fiados_detalhados(start_date, end_date)
         ]
 
+    @analytics_cache.cached
     def get_cash_flow(self, start_date, end_date):
         """Fluxo de caixa"""
-        data = self.repository.get_cash_flow_summary(start_date, end_date)
-        return [
-            {
-                "data": row[0],
-                "abertura": row[1],
-                "fechamento": row[2],
-                "vendas": row[3] or 0
-            }
-            for row in data
-        ]
+        return self.repository.get_cash_flow_summary(start_date, end_date)
 
+    @analytics_cache.cached
     def get_total_statistics(self):
         """Estatísticas gerais"""
-        data = self.repository.get_total_statistics()
-        
-        if not data:
-            return {
-                "total_produtos": 0,
-                "total_itens": 0,
-                "total_vendas": 0,
-                "dias_com_vendas": 0
-            }
-        
-        return {
-            "total_produtos": data[0] or 0,
-            "total_itens": data[1] or 0,
-            "total_vendas": data[2] or 0,
-            "dias_com_vendas": data[3] or 0
-        }
+        return self.repository.get_total_statistics()
+
+    @analytics_cache.cached
+    def get_kpis(self) -> Kpis:
+        """Números dos cards da visão geral, em uma única consulta"""
+        return Kpis(**dict(self.repository.get_kpis()))
+
+    @analytics_cache.cached
+    def get_vendas_summary(self, days=30):
+        """Número de vendas (carrinho), total e ticket médio nos últimos N dias"""
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        return self.repository.get_vendas_summary(start_date, end_date)
+
+    def _run_parallel(self, consultas: dict):
+        # Consultas independentes no pool de leitura, dentro do orçamento do dashboard
+        return reader_pool.run(
+            consultas,
+            budget=config.DASHBOARD_TIME_BUDGET_SECONDS,
+            timeout=config.DASHBOARD_QUERY_TIMEOUT_SECONDS,
+        )
 
     def get_dashboard_data(self):
         """Agregação de todos os dados do dashboard"""
-        return {
-            "estatisticas": self.get_total_statistics(),
-            "estoque": self.get_stock_metrics(),
-            "produtos_top": self.get_top_products_data(5),
-            "categorias": self.get_category_performance(),
-            "alertas_estoque": self.get_low_stock_alert(),
-            "produtos_prox_vencer": self.get_expiring_products(30),
+        dados, erros = self._run_parallel({
+            "estatisticas": self.get_total_statistics,
+            "estoque": self.get_stock_metrics,
+            "produtos_top": lambda: self.get_top_products_data(5),
+            "categorias": self.get_category_performance,
+            "alertas_estoque": self.get_low_stock_alert,
+            "produtos_prox_vencer": lambda: self.get_expiring_products(30),
+        })
+        if erros:
+            raise next(iter(erros.values()))
+        return dados
+
+    def get_dashboard_snapshot(self) -> DashboardSnapshot:
+        """
+        Todas as consultas da janela de análises em paralelo. O tempo total
+        fica próximo ao da consulta mais lenta; falhas e consultas que
+        estouram o tempo ficam em `erros` sem impedir o restante.
+        """
+        consultas = {
+            "kpis": self.get_kpis,
+            "vendas_grafico": lambda: self.get_sales_chart_data(30),
+            "vendas_resumo": lambda: self.get_vendas_summary(30),
+            "categorias": self.get_category_performance,
+            "produtos_top": lambda: self.get_top_products_data(5),
+            "prejuizos_motivo": lambda: self.get_prejuizos_by_motivo(10),
+            "prejuizos_detalhados": self.get_prejuizos_detalhados,
+            "margens": self.get_profit_margins,
+            "curva_abc": self.get_abc_curve,
+            "rotatividade": lambda: self.get_turnover_analysis(30),
+            "fiados_aging": self.get_fiados_aging,
+            "clientes_em_aberto": self.get_clientes_em_aberto,
+            "fiados_detalhados": self.get_fiados_detalhados,
         }
+
+        inicio = time.perf_counter()
+        dados, erros = self._run_parallel(consultas)
+        return DashboardSnapshot(
+            **dados,
+            erros={nome: str(erro) for nome, erro in erros.items()},
+            duracao_ms=(time.perf_counter() - inicio) * 1000,
+        )
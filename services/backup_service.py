@@ -1,7 +1,10 @@
 import shutil
 from pathlib import Path
 from datetime import datetime
-from database.connection import DB_PATH, get_connection
+from database.connection import (
+    DB_PATH, get_connection, close_all_connections, bump_data_generation, initialize_database
+)
+from services.analytics_engine import analytics_engine
 import sqlite3
 
 
@@ -35,8 +38,13 @@ class BackupService:
             if not DB_PATH.exists():
                 raise FileNotFoundError(f"Banco de dados não encontrado em {DB_PATH}")
             
-            # Copia o arquivo do banco de dados
-            shutil.copy2(DB_PATH, export_file)
+            # Copia o banco pela API de backup do SQLite: em modo WAL o
+            # arquivo .db sozinho pode não conter as últimas gravações
+            dest = sqlite3.connect(export_file)
+            try:
+                get_connection().backup(dest)
+            finally:
+                dest.close()
             
             return export_file
             
@@ -70,22 +78,73 @@ class BackupService:
             except sqlite3.DatabaseError:
                 raise ValueError("Arquivo selecionado não é um banco de dados válido")
             
+            # Fecha as conexões abertas antes de substituir o arquivo. Se
+            # outra instância do programa ainda estiver com o banco aberto,
+            # a troca do arquivo perderia o que ela gravou: recusa a restauração
+            close_all_connections()
+            if not BackupService._checkpoint_wal(DB_PATH):
+                raise ValueError(
+                    "O banco de dados está aberto em outra janela ou computador. "
+                    "Feche o programa nos outros terminais e tente novamente."
+                )
+
             # Cria backup do banco atual antes de sobrescrever
             current_backup = BackupService._create_safety_backup(DB_PATH)
             
             try:
                 # Copia o arquivo de importação para o local do banco de dados
                 shutil.copy2(import_file, DB_PATH)
+
+                # Um backup feito por uma versão anterior do programa recebe
+                # as migrações pendentes antes de ser usado
+                initialize_database()
                 
             except Exception as e:
                 # Se falhar, restaura o backup de segurança
+                close_all_connections()
+                BackupService._checkpoint_wal(DB_PATH)
                 if current_backup.exists():
                     shutil.copy2(current_backup, DB_PATH)
                 raise Exception(f"Erro ao restaurar banco de dados: {e}")
+            finally:
+                # Os caches de consultas e o motor de análises guardam dados
+                # do arquivo anterior. close_all_connections() já incrementou
+                # a geração, mas uma leitura feita antes da cópia terminar
+                # poderia ter guardado os dados antigos na geração nova
+                bump_data_generation()
+                analytics_engine.reset()
             
         except Exception as e:
             raise Exception(f"Erro ao importar banco de dados: {e}")
 
+    @staticmethod
+    def _checkpoint_wal(db_file: Path) -> bool:
+        """
+        Grava no arquivo principal o conteúdo do -wal (modo WAL)
+        
+        Com wal_checkpoint(TRUNCATE) todas as páginas do -wal vão para o
+        arquivo .db; ao fechar a última conexão o SQLite apaga o -wal e o
+        -shm. Se eles continuarem no disco, outra conexão (outra instância
+        do programa) ainda está com o banco aberto.
+        
+        Args:
+            db_file: Caminho do arquivo do banco de dados
+            
+        Returns:
+            bool: True se o banco ficou só no arquivo .db, sem uso por outra conexão
+        """
+        if not db_file.exists():
+            return True
+
+        conn = sqlite3.connect(db_file)
+        try:
+            ocupado = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+        finally:
+            conn.close()
+
+        wal = db_file.with_name(db_file.name + "-wal")
+        return not ocupado and not wal.exists()
+
     @staticmethod
     def _create_safety_backup(db_file: Path) -> Path:
         """
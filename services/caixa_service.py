@@ -1,7 +1,9 @@
 from datetime import date
+from database.connection import unit_of_work
 from repositories.caixa_repository import CaixaRepository
 from repositories.caixa_movimentacao_repository import CaixaMovimentacaoRepository
 from models.caixa import Caixa
+from utils.dates import day_range
 
 
 class CaixaService:
@@ -13,45 +15,46 @@ class CaixaService:
     def abrir_caixa(self, valor_abertura: float) -> dict:
         """Abre um novo caixa para o dia."""
         try:
-            # Verifica se já existe caixa aberto
-            caixa_aberto = self.repository.find_open_caixa()
-            if caixa_aberto:
-                return {
-                    "success": False,
-                    "error": "Já existe um caixa aberto"
-                }
-
-            # Verifica se já existe caixa para hoje
-            today = date.today().isoformat()
-            caixa_hoje = self.repository.find_by_date(today)
-            if caixa_hoje:
-                return {
-                    "success": False,
-                    "error": "Caixa já foi aberto hoje"
-                }
-
-            # Valida valor de abertura
-            if valor_abertura < 0:
-                return {
-                    "success": False,
-                    "error": "Valor de abertura não pode ser negativo"
-                }
-
-            # Cria novo caixa
-            caixa = Caixa(
-                id=None,
-                data=today,
-                valor_abertura=valor_abertura,
-                status="ABERTO"
-            )
+            with unit_of_work():
+                # Verifica se já existe caixa aberto
+                caixa_aberto = self.repository.find_open_caixa()
+                if caixa_aberto:
+                    return {
+                        "success": False,
+                        "error": "Já existe um caixa aberto"
+                    }
+
+                # Verifica se já existe caixa para hoje
+                today = date.today().isoformat()
+                caixa_hoje = self.repository.find_by_date(today)
+                if caixa_hoje:
+                    return {
+                        "success": False,
+                        "error": "Caixa já foi aberto hoje"
+                    }
+
+                # Valida valor de abertura
+                if valor_abertura < 0:
+                    return {
+                        "success": False,
+                        "error": "Valor de abertura não pode ser negativo"
+                    }
+
+                # Cria novo caixa
+                caixa = Caixa(
+                    id=None,
+                    data=today,
+                    valor_abertura=valor_abertura,
+                    status="ABERTO"
+                )
             
-            caixa_id = self.repository.create(caixa)
+                caixa_id = self.repository.create(caixa)
             
-            return {
-                "success": True,
-                "caixa_id": caixa_id,
-                "message": "Caixa aberto com sucesso"
-            }
+                return {
+                    "success": True,
+                    "caixa_id": caixa_id,
+                    "message": "Caixa aberto com sucesso"
+                }
 
         except Exception as e:
             return {
@@ -59,45 +62,54 @@ class CaixaService:
                 "error": str(e)
             }
 
-    def fechar_caixa(self, caixa_id: int, valor_fechamento: float) -> dict:
-        """Fecha o caixa do dia."""
+    def fechar_caixa(self, caixa_id: int, valor_fechamento: float, versao: int | None = None) -> dict:
+        """
+        Fecha o caixa do dia. Com `versao` (lida junto com o caixa), o
+        fechamento é recusado se outro terminal alterou o caixa nesse meio tempo.
+        """
         try:
-            # Busca caixa
-            caixa = self.repository.find_by_id(caixa_id)
-            if not caixa:
-                return {
-                    "success": False,
-                    "error": "Caixa não encontrado"
-                }
-
-            # Verifica se já está fechado
-            if caixa["status"] == "FECHADO":
-                return {
-                    "success": False,
-                    "error": "Este caixa já foi fechado"
-                }
+            with unit_of_work():
+                # Busca caixa
+                caixa = self.repository.find_by_id(caixa_id)
+                if not caixa:
+                    return {
+                        "success": False,
+                        "error": "Caixa não encontrado"
+                    }
+
+                # Verifica se já está fechado
+                if caixa["status"] == "FECHADO":
+                    return {
+                        "success": False,
+                        "error": "Este caixa já foi fechado"
+                    }
+
+                # Valida valor de fechamento
+                if valor_fechamento < 0:
+                    return {
+                        "success": False,
+                        "error": "Valor de fechamento não pode ser negativo"
+                    }
+
+                # Fecha o caixa (UPDATE condicional à versão lida)
+                if not self.repository.update_close(caixa_id, valor_fechamento, versao):
+                    return {
+                        "success": False,
+                        "error": "O caixa foi alterado em outro terminal. Atualize a tela e tente novamente.",
+                        "conflito": True
+                    }
+
+                # Calcula diferença
+                diferenca = valor_fechamento - caixa["valor_abertura"]
 
-            # Valida valor de fechamento
-            if valor_fechamento < 0:
                 return {
-                    "success": False,
-                    "error": "Valor de fechamento não pode ser negativo"
+                    "success": True,
+                    "message": "Caixa fechado com sucesso",
+                    "valor_abertura": caixa["valor_abertura"],
+                    "valor_fechamento": valor_fechamento,
+                    "diferenca": diferenca
                 }
 
-            # Fecha o caixa
-            self.repository.update_close(caixa_id, valor_fechamento)
-
-            # Calcula diferença
-            diferenca = valor_fechamento - caixa["valor_abertura"]
-
-            return {
-                "success": True,
-                "message": "Caixa fechado com sucesso",
-                "valor_abertura": caixa["valor_abertura"],
-                "valor_fechamento": valor_fechamento,
-                "diferenca": diferenca
-            }
-
         except Exception as e:
             return {
                 "success": False,
@@ -115,12 +127,12 @@ class CaixaService:
 
         # Soma de vendas (movimentacoes tipo SAIDA ligadas a produtos)
         query_sales = """
-            SELECT IFNULL(SUM(m.quantidade * p.valor_venda), 0)
-            FROM movimentacoes m
-            JOIN produtos p ON p.id = m.produto_id
-            WHERE m.tipo = 'SAIDA' AND DATE(m.data_movimentacao) = DATE(?)
+            SELECT IFNULL(SUM(quantidade * valor_unitario), 0)
+            FROM movimentacoes
+            WHERE tipo = 'SAIDA'
+              AND data_movimentacao >= ? AND data_movimentacao < ?
         """
-        sales_total = self.repository.fetchone(query_sales, (hoje,))[0]
+        sales_total = self.repository.fetchone(query_sales, day_range(hoje))[0]
 
         # Movimentações avulsas de caixa (entradas/saidas)
         entradas_avulsas = self.mov_repository.sum_by_date(hoje, "ENTRADA") or 0
@@ -130,6 +142,8 @@ class CaixaService:
         saldo_esperado = caixa["valor_abertura"] + sales_total + entradas_avulsas - saidas_avulsas
 
         # Retorna caixa enriquecido com informações financeiras
+        # (o registro do repositório é imutável: copia para um dict)
+        caixa = dict(caixa)
         caixa["faturamento_vendas"] = sales_total
         caixa["entradas_avulsas"] = entradas_avulsas
         caixa["saidas_avulsas"] = saidas_avulsas
@@ -0,0 +1,5 @@
+class VersionConflictError(ValueError):
+    """
+    O registro foi alterado por outra escrita (ex.: outro terminal) depois de
+    lido. Quem chamou deve recarregar os dados e tentar de novo.
+    """
@@ -0,0 +1,74 @@
+from database.connection import unit_of_work
+from repositories.price_repository import PriceRepository
+
+
+MODOS = ("PERCENTUAL", "FIXO", "MARGEM")
+
+
+class PriceService:
+    """
+    Reajuste de preços de venda em lote (por tag, busca por nome ou seleção).
+
+    Cada reajuste grava o preço anterior de cada produto em historico_precos
+    na mesma transação do UPDATE, o que permite desfazê-lo depois.
+    """
+
+    def __init__(self):
+        self.price_repo = PriceRepository()
+
+    def _validar(self, modo: str, valor: float, tag_id, termo, produto_ids):
+        if modo not in MODOS:
+            raise ValueError("Modo de reajuste inválido.")
+
+        if tag_id is None and not termo and produto_ids is None:
+            raise ValueError("Escolha uma tag, um filtro por nome ou selecione os produtos.")
+
+        if produto_ids is not None and not produto_ids:
+            raise ValueError("Nenhum produto selecionado.")
+
+        if modo == "PERCENTUAL" and valor <= -100:
+            raise ValueError("O percentual de redução deve ser menor que 100%.")
+
+        if modo == "MARGEM" and not 0 <= valor < 100:
+            raise ValueError("A margem deve estar entre 0% e 100%.")
+
+        if modo != "MARGEM" and valor == 0:
+            raise ValueError("Informe o valor do reajuste.")
+
+    def preview(self, modo: str, valor: float, tag_id=None, termo=None, produto_ids=None):
+        """Produtos que seriam alterados, com o preço atual e o novo."""
+        self._validar(modo, valor, tag_id, termo, produto_ids)
+        return self.price_repo.preview(modo, valor, tag_id, termo, produto_ids)
+
+    def apply(self, modo: str, valor: float, descricao: str = "", tag_id=None, termo=None, produto_ids=None):
+        """Aplica o reajuste; retorna {"reajuste_id", "produtos"}."""
+        self._validar(modo, valor, tag_id, termo, produto_ids)
+
+        with unit_of_work():
+            reajuste_id = self.price_repo.create_reajuste(descricao, modo, valor)
+            self.price_repo.record_history(reajuste_id, modo, valor, tag_id, termo, produto_ids)
+            alterados = self.price_repo.apply_history(reajuste_id)
+
+            if not alterados:
+                raise ValueError("Nenhum produto teria o preço alterado com este reajuste.")
+
+        return {"reajuste_id": reajuste_id, "produtos": alterados}
+
+    def undo(self, reajuste_id: int):
+        """
+        Desfaz um reajuste. Produtos com preço alterado depois dele mantêm o
+        preço atual; retorna {"revertidos", "mantidos"}.
+        """
+        with unit_of_work():
+            reajuste = self.price_repo.get_reajuste(reajuste_id)
+            if not reajuste:
+                raise ValueError("Reajuste não encontrado.")
+            if reajuste["desfeito"]:
+                raise ValueError("Este reajuste já foi desfeito.")
+
+            revertidos = self.price_repo.revert_history(reajuste_id)
+
+        return {"revertidos": revertidos, "mantidos": reajuste["produtos"] - revertidos}
+
+    def list_reajustes(self, limit: int = 50):
+        return self.price_repo.list_reajustes(limit)
@@ -0,0 +1,288 @@
+import csv
+import math
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+
+import config
+from database.connection import unit_of_work
+from repositories.product_repository import ProductRepository
+from repositories.product_tag_repository import ProductTagRepository
+from repositories.tag_repository import TagRepository
+from repositories.ledger_repository import LedgerRepository
+from repositories.lote_repository import LoteRepository
+
+try:
+    import openpyxl
+except ImportError:  # XLSX é opcional; CSV funciona sem dependências extras
+    openpyxl = None
+
+
+# Nomes aceitos no cabeçalho da planilha para cada campo
+COLUNAS = {
+    "nome": "nome",
+    "produto": "nome",
+    "quantidade": "quantidade",
+    "qtd": "quantidade",
+    "valor_compra": "valor_compra",
+    "valor compra": "valor_compra",
+    "custo": "valor_compra",
+    "valor_venda": "valor_venda",
+    "valor venda": "valor_venda",
+    "preco": "valor_venda",
+    "preço": "valor_venda",
+    "data_validade": "data_validade",
+    "validade": "data_validade",
+    "estoque_minimo": "estoque_minimo",
+    "estoque mínimo": "estoque_minimo",
+    "estoque minimo": "estoque_minimo",
+    "tags": "tags",
+}
+
+OBRIGATORIAS = ("nome", "valor_compra", "valor_venda")
+
+
+class ProductImportService:
+    """
+    Importação de produtos em lote a partir de CSV ou XLSX.
+
+    As linhas são lidas em fluxo e gravadas em blocos de IMPORT_CHUNK_SIZE,
+    cada bloco em uma transação com executemany (produtos, tags e razão), de
+    modo que o uso de memória não depende do tamanho do arquivo. Linhas
+    inválidas não interrompem a importação: vão para o relatório de erros.
+    """
+
+    def __init__(self):
+        self.product_repo = ProductRepository()
+        self.tag_repo = TagRepository()
+        self.product_tag_repo = ProductTagRepository()
+        self.ledger_repo = LedgerRepository()
+        self.lote_repo = LoteRepository()
+        self._tag_ids = None
+
+    def import_file(self, path, chunk_size: int = config.IMPORT_CHUNK_SIZE):
+        """
+        Importa os produtos do arquivo.
+
+        Retorna {"importados": int, "erros": [(linha, mensagem), ...]}, com a
+        linha numerada como na planilha (o cabeçalho é a linha 1).
+        """
+        path = Path(path)
+        rows = self._read_rows(path)
+        self._tag_ids = None
+
+        importados = 0
+        erros = []
+        while True:
+            bloco = list(islice(rows, chunk_size))
+            if not bloco:
+                break
+
+            validos = []
+            for linha, row in bloco:
+                try:
+                    validos.append(self._parse_row(row))
+                except ValueError as e:
+                    erros.append((linha, str(e)))
+
+            if validos:
+                self._gravar_bloco(validos)
+                importados += len(validos)
+
+        return {"importados": importados, "erros": erros}
+
+    @staticmethod
+    def write_error_report(erros, path):
+        """Grava o relatório de erros da importação em CSV (linha; erro)."""
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["linha", "erro"])
+            writer.writerows(erros)
+
+    # ---------------------------------------------------------------
+    # Gravação
+    # ---------------------------------------------------------------
+
+    def _gravar_bloco(self, produtos):
+        try:
+            with unit_of_work():
+                ids = self.product_repo.create_many([p[:6] for p in produtos])
+
+                pares = []
+                for produto_id, produto in zip(ids, produtos):
+                    for tag in produto[6]:
+                        pares.append((produto_id, self._tag_id(tag)))
+                if pares:
+                    self.product_tag_repo.add_tags_to_products(pares)
+
+                self.ledger_repo.record_many([
+                    (produto_id, produto[1], "SALDO_INICIAL", None)
+                    for produto_id, produto in zip(ids, produtos)
+                ])
+                self.lote_repo.create_many([
+                    (produto_id, produto[1], produto[4], None)
+                    for produto_id, produto in zip(ids, produtos)
+                    if produto[1] > 0
+                ])
+        except BaseException:
+            # As tags criadas no bloco foram desfeitas junto com ele
+            self._tag_ids = None
+            raise
+
+    def _tag_id(self, nome: str) -> int:
+        """Resolve o id da tag pelo cache, criando a tag na primeira vez que aparece."""
+        if self._tag_ids is None:
+            self._tag_ids = {tag["nome"].casefold(): tag["id"] for tag in self.tag_repo.list_all()}
+
+        chave = nome.casefold()
+        tag_id = self._tag_ids.get(chave)
+        if tag_id is None:
+            tag_id = self.tag_repo.create(nome)
+            self._tag_ids[chave] = tag_id
+        return tag_id
+
+    # ---------------------------------------------------------------
+    # Leitura
+    # ---------------------------------------------------------------
+
+    def _read_rows(self, path: Path):
+        """Gera (número da linha, dict campo -> valor) sem carregar o arquivo inteiro."""
+        sufixo = path.suffix.lower()
+        if sufixo == ".csv":
+            raw = self._read_csv(path)
+        elif sufixo in (".xlsx", ".xlsm"):
+            raw = self._read_xlsx(path)
+        else:
+            raise ValueError("Formato não suportado. Use um arquivo .csv ou .xlsx.")
+
+        cabecalho = next(raw, None)
+        if cabecalho is None:
+            raise ValueError("O arquivo está vazio.")
+
+        campos = [COLUNAS.get(str(c or "").strip().lower()) for c in cabecalho]
+        faltando = [c for c in OBRIGATORIAS if c not in campos]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}.")
+
+        return self._map_rows(raw, campos)
+
+    @staticmethod
+    def _map_rows(raw, campos):
+        for linha, valores in enumerate(raw, start=2):
+            if not any(v not in (None, "") for v in valores):
+                continue
+            yield linha, {
+                campo: valor
+                for campo, valor in zip(campos, valores)
+                if campo is not None
+            }
+
+    @staticmethod
+    def _read_csv(path: Path):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            amostra = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(amostra, delimiters=";,\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(f, dialect)
+
+    @staticmethod
+    def _read_xlsx(path: Path):
+        if openpyxl is None:
+            raise ValueError("Importação de XLSX requer o pacote openpyxl. Salve a planilha como CSV.")
+
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    # ---------------------------------------------------------------
+    # Validação
+    # ---------------------------------------------------------------
+
+    def _parse_row(self, row: dict) -> tuple:
+        """
+        Converte e valida uma linha com as mesmas regras de
+        ProductService.create_product.
+        """
+        nome = str(row.get("nome") or "").strip()
+        if not nome:
+            raise ValueError("O nome do produto é obrigatório.")
+
+        quantidade = self._to_int(row.get("quantidade"), "quantidade", padrao=0)
+        valor_compra = self._to_float(row.get("valor_compra"), "valor_compra")
+        valor_venda = self._to_float(row.get("valor_venda"), "valor_venda")
+        estoque_minimo = self._to_int(row.get("estoque_minimo"), "estoque_minimo", padrao=5)
+        data_validade = self._to_date(row.get("data_validade"))
+
+        if quantidade < 0:
+            raise ValueError("A quantidade do produto não pode ser negativa.")
+        if valor_compra < 0 or valor_venda < 0:
+            raise ValueError("Os valores de compra e venda não podem ser negativos.")
+        if estoque_minimo < 0:
+            raise ValueError("O estoque mínimo não pode ser negativo.")
+
+        tags = []
+        for tag in str(row.get("tags") or "").replace("|", ",").split(","):
+            tag = tag.strip()
+            if tag and tag.casefold() not in (t.casefold() for t in tags):
+                tags.append(tag)
+
+        return (nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo, tags)
+
+    @staticmethod
+    def _to_float(valor, campo: str) -> float:
+        if valor is None or valor == "":
+            raise ValueError(f"O campo {campo} é obrigatório.")
+        if isinstance(valor, (int, float)):
+            numero = float(valor)
+        else:
+            texto = str(valor).strip().replace("R$", "").strip()
+            # Aceita "1.234,56" (planilhas em pt-BR) e "1234.56"
+            if "," in texto:
+                texto = texto.replace(".", "").replace(",", ".")
+            try:
+                numero = float(texto)
+            except ValueError:
+                raise ValueError(f"Valor inválido em {campo}: {valor!r}.")
+        # float() aceita "nan", "inf" e "1e400" (infinito)
+        if not math.isfinite(numero):
+            raise ValueError(f"Valor inválido em {campo}: {valor!r}.")
+        return numero
+
+    @staticmethod
+    def _to_int(valor, campo: str, padrao: int) -> int:
+        if valor is None or valor == "":
+            return padrao
+        numero = valor
+        if not isinstance(valor, (int, float)):
+            try:
+                numero = float(str(valor).strip().replace(",", "."))
+            except ValueError:
+                raise ValueError(f"Valor inválido em {campo}: {valor!r}.")
+        # int() de nan ou infinito lança ValueError/OverflowError fora da validação
+        if isinstance(numero, float) and not math.isfinite(numero):
+            raise ValueError(f"Valor inválido em {campo}: {valor!r}.")
+        if numero != int(numero):
+            raise ValueError(f"O campo {campo} deve ser um número inteiro.")
+        return int(numero)
+
+    @staticmethod
+    def _to_date(valor):
+        if valor is None or valor == "":
+            return None
+        if isinstance(valor, datetime):
+            return valor.date().isoformat()
+        if isinstance(valor, date):
+            return valor.isoformat()
+
+        texto = str(valor).strip()
+        for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+            try:
+                return datetime.strptime(texto, fmt).date().isoformat()
+            except ValueError:
+                continue
+        raise ValueError(f"Data de validade inválida: {valor!r}.")
@@ -1,7 +1,11 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Optional
+from database.connection import unit_of_work
 from repositories.product_repository import ProductRepository
 from repositories.product_tag_repository import ProductTagRepository
+from repositories.ledger_repository import LedgerRepository
+from repositories.lote_repository import LoteRepository
+from services.exceptions import VersionConflictError
 
 class ProductService:
 
@@ -12,6 +16,8 @@ class ProductService:
     def __init__(self):
         self.product_repo = ProductRepository()
         self.product_tag_repo = ProductTagRepository()
+        self.ledger_repo = LedgerRepository()
+        self.lote_repo = LoteRepository()
 
     def create_product(
             self,
@@ -36,11 +42,16 @@ class ProductService:
         if estoque_minimo < 0:
             raise ValueError("O estoque mínimo não pode ser negativo.")
         
-        self.product_repo.create(nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo)
-        produto = self.product_repo.search_by_name(nome)[-1]  # Pega o último produto inserido com esse nome
+        with unit_of_work():
+            produto_id = self.product_repo.create(nome, quantidade, valor_compra, valor_venda, data_validade, estoque_minimo)
+            self.ledger_repo.record(produto_id, quantidade, "SALDO_INICIAL")
+            if quantidade > 0:
+                self.lote_repo.create(produto_id, quantidade, data_validade)
 
-        for tag_id in tag_ids:
-            self.product_tag_repo.add_tag_to_product(produto["id"], tag_id)
+            for tag_id in tag_ids:
+                self.product_tag_repo.add_tag_to_product(produto_id, tag_id)
+
+        return produto_id
     
     def update_product(
             self,
@@ -52,16 +63,62 @@ class ProductService:
             data_validade: Optional[date],
             ativo: bool,
             tag_ids: list[int],
-            estoque_minimo: int = 5
+            estoque_minimo: int = 5,
+            versao: Optional[int] = None
     ):
-        self.product_repo.update(produto_id, nome, quantidade, valor_compra, valor_venda, data_validade, ativo, estoque_minimo)
-        existing_tags = self.product_tag_repo.get_tags_by_product(produto_id)
+        """
+        Atualiza o produto e suas tags. `versao` é a versão lida junto com o
+        produto; se outra escrita (uma venda em outro terminal, por exemplo)
+        alterou o produto depois disso, nada é gravado e VersionConflictError
+        é lançado.
+        """
+        # Produto e tags são gravados em uma única transação
+        with unit_of_work():
+            produto = self.product_repo.get_by_id(produto_id)
+            if produto is None:
+                raise ValueError("Produto não encontrado.")
+            anterior = produto["quantidade"]
+
+            if quantidade < produto["quantidade_reservada"]:
+                raise ValueError(
+                    f"A quantidade não pode ficar abaixo do total reservado ({produto['quantidade_reservada']})."
+                )
+
+            nova_versao = self.product_repo.update(
+                produto_id, nome, quantidade, valor_compra, valor_venda, data_validade, ativo, estoque_minimo, versao
+            )
+            if nova_versao is None:
+                raise VersionConflictError(
+                    "O produto foi alterado em outro terminal depois de aberto. "
+                    "Recarregue os dados e tente novamente."
+                )
 
-        for tag_id in existing_tags:
-            self.product_tag_repo.remove_tag_from_product(produto_id, tag_id["id"])
+            # A validade do cadastro vale para os lotes que ainda estavam com a antiga
+            if data_validade != produto["data_validade"]:
+                self.lote_repo.update_validade(produto_id, produto["data_validade"], data_validade)
 
-        for tag_id in tag_ids:
-            self.product_tag_repo.add_tag_to_product(produto_id, tag_id)
+            # Quantidade editada manualmente no formulário entra no razão como
+            # ajuste; um aumento vira lote novo e uma redução baixa em FEFO
+            if quantidade != anterior:
+                self.ledger_repo.record(produto_id, quantidade - anterior, "AJUSTE")
+                if quantidade > anterior:
+                    self.lote_repo.create(produto_id, quantidade - anterior)
+                else:
+                    self.lote_repo.consume(produto_id, anterior - quantidade, "AJUSTE")
+
+            # Só as tags que mudaram são removidas/inseridas
+            existing_tags = {tag["id"] for tag in self.product_tag_repo.get_tags_by_product(produto_id)}
+
+            for tag_id in existing_tags - set(tag_ids):
+                self.product_tag_repo.remove_tag_from_product(produto_id, tag_id)
+
+            for tag_id in set(tag_ids) - existing_tags:
+                self.product_tag_repo.add_tag_to_product(produto_id, tag_id)
+
+        return nova_versao
+
+    def get_product(self, produto_id: int):
+        return self.product_repo.get_by_id(produto_id)
 
     def list_products(self):
         return self.product_repo.list_all()
@@ -72,6 +129,11 @@ class ProductService:
     def get_products_near_expiration(self, days: int):
         return self.product_repo.products_near_expiry(days)
     
+    def get_expiring_lots(self, days: int):
+        """Lotes com saldo vencidos ou que vencem em até `days` dias."""
+        ate = (date.today() + timedelta(days=days + 1)).isoformat()
+        return self.lote_repo.list_expiring(ate)
+
     def search_products_by_name_or_tag(self, termo: str):
         if not termo:
             return self.product_repo.list_all()
@@ -91,8 +153,8 @@ class ProductService:
         if quantidade < estoque_minimo:
             alertas.append("Estoque baixo")
         
-        # Verificar validade
-        validade = product.get("data_validade")
+        # Verificar validade (lote com saldo que vence primeiro, se houver)
+        validade = product.get("proxima_validade") or product.get("data_validade")
         if validade:
             validade_date = datetime.strptime(validade, "%Y-%m-%d").date()
             today = date.today()
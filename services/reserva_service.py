@@ -0,0 +1,133 @@
+import threading
+
+import config
+from database.connection import unit_of_work, close_connection
+from repositories.product_repository import ProductRepository
+from repositories.reserva_repository import ReservaRepository
+from services.stock_service import StockService
+
+
+class ReservaService:
+    """
+    Reservas de estoque para pedidos ainda não retirados.
+
+    A reserva não altera `produtos.quantidade` (o estoque físico, que é o que
+    o razão acompanha); ela só soma em `quantidade_reservada`, e toda saída
+    passa a validar contra quantidade - quantidade_reservada.
+    """
+
+    def __init__(self):
+        self.product_repo = ProductRepository()
+        self.reserva_repo = ReservaRepository()
+        self.stock_service = StockService()
+
+    def reservar(
+            self,
+            produto_id: int,
+            quantidade: int,
+            cliente: str,
+            horas: float = config.RESERVA_VALIDADE_HORAS,
+            observacao: str = ""
+    ):
+        """Reserva a quantidade por `horas` horas. Retorna o id da reserva."""
+        if quantidade <= 0:
+            raise ValueError("A quantidade deve ser maior que zero.")
+        if not cliente or not cliente.strip():
+            raise ValueError("Nome do cliente é obrigatório para a reserva.")
+        if horas <= 0:
+            raise ValueError("A validade da reserva deve ser maior que zero.")
+
+        with unit_of_work():
+            disponivel = self.product_repo.reserve_quantity(produto_id, quantidade)
+            if disponivel is None:
+                produto = self.product_repo.get_by_id(produto_id)
+                if produto is None:
+                    raise ValueError("Produto não encontrado.")
+                raise ValueError(
+                    f"Estoque disponível insuficiente para reservar. "
+                    f"Disponível: {produto['quantidade'] - produto['quantidade_reservada']}"
+                )
+            return self.reserva_repo.create(produto_id, quantidade, cliente.strip(), observacao, horas)
+
+    def liberar(self, reserva_id: int):
+        """Cancela a reserva e devolve a quantidade ao disponível."""
+        with unit_of_work():
+            reserva = self._encerrar(reserva_id, "LIBERADA")
+            self.product_repo.release_reserved([(reserva["produto_id"], reserva["quantidade"])])
+
+    def converter_em_venda(self, reserva_id: int, fiado: bool = False):
+        """
+        Transforma a reserva em venda para o mesmo cliente, em uma única
+        transação: a quantidade sai da reserva e do estoque juntas.
+        Retorna {"venda_id": ..., "total": ...}.
+        """
+        with unit_of_work():
+            reserva = self._encerrar(reserva_id, "CONVERTIDA")
+            self.product_repo.release_reserved([(reserva["produto_id"], reserva["quantidade"])])
+            venda = self.stock_service.registrar_venda(
+                [(reserva["produto_id"], reserva["quantidade"])],
+                fiado=fiado,
+                cliente=reserva["cliente"],
+                observacao=f"Reserva #{reserva_id}"
+            )
+            self.reserva_repo.close_venda(reserva_id, venda["venda_id"])
+        return venda
+
+    def _encerrar(self, reserva_id: int, status: str):
+        reserva = self.reserva_repo.get_by_id(reserva_id)
+        if reserva is None:
+            raise ValueError("Reserva não encontrada.")
+        if not self.reserva_repo.close(reserva_id, status):
+            raise ValueError("A reserva não está mais ativa.")
+        return reserva
+
+    def expirar_vencidas(self, limite: int = config.RESERVA_SWEEP_BATCH) -> int:
+        """
+        Expira as reservas vencidas em lotes de `limite`, cada lote em sua
+        própria transação curta para não segurar o banco. Retorna quantas
+        foram expiradas.
+        """
+        total = 0
+        while True:
+            with unit_of_work():
+                vencidas = self.reserva_repo.list_expired(limite)
+                if not vencidas:
+                    break
+                self.reserva_repo.expire_many([r["id"] for r in vencidas])
+                self.product_repo.release_reserved([(r["produto_id"], r["quantidade"]) for r in vencidas])
+            total += len(vencidas)
+            if len(vencidas) < limite:
+                break
+        return total
+
+    def list_reservas_ativas(self):
+        return self.reserva_repo.list_active()
+
+
+class ReservationSweeper(threading.Thread):
+    """
+    Thread em segundo plano que expira as reservas vencidas a cada
+    config.RESERVA_SWEEP_INTERVAL_SECONDS segundos.
+    """
+
+    def __init__(self, interval: float = config.RESERVA_SWEEP_INTERVAL_SECONDS):
+        super().__init__(name="reservation-sweeper", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        service = ReservaService()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    service.expirar_vencidas()
+                except Exception as e:
+                    print(f"Erro ao expirar reservas: {e}")
+                self._stop_event.wait(self.interval)
+        finally:
+            # Conexão própria desta thread
+            close_connection()
+
+    def stop(self, timeout: float | None = 5):
+        self._stop_event.set()
+        self.join(timeout)
@@ -0,0 +1,119 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+from database.connection import data_generation
+
+
+class ResultCache:
+    """
+    Cache LRU de resultados de consultas, com validade (TTL) e invalidação
+    pela geração dos dados.
+
+    Cada resultado é guardado pela chave (método, argumentos). Qualquer
+    escrita feita pelos repositórios incrementa a geração dos dados
+    (database.connection.data_generation); na próxima leitura o cache
+    percebe a mudança e descarta tudo. O TTL cobre o que a geração não vê:
+    escritas de outro terminal no mesmo arquivo e consultas que dependem
+    da data atual.
+
+    Os resultados são compartilhados entre os chamadores e devem ser
+    tratados como somente leitura.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._generation = data_generation()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key):
+        """Retorna (True, valor) se houver resultado válido para a chave, senão (False, None)."""
+        with self._lock:
+            self._check_generation()
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, generation: int):
+        """
+        Guarda o valor calculado na geração `generation` (lida antes da
+        consulta); se os dados mudaram nesse meio tempo, o valor é descartado.
+        """
+        with self._lock:
+            self._check_generation()
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _check_generation(self):
+        generation = data_generation()
+        if generation != self._generation:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._generation = generation
+
+    def cached(self, func):
+        """
+        Decorador para métodos: a chave é o nome do método e os argumentos
+        (sem self), já com os valores padrão, para que f(), f(10) e
+        f(limit=10) caiam na mesma entrada.
+        """
+        name = func.__qualname__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(obj, *args, **kwargs):
+            bound = signature.bind(obj, *args, **kwargs)
+            bound.apply_defaults()
+            key = (name, bound.args[1:], tuple(sorted(bound.kwargs.items())))
+            found, value = self.get(key)
+            if found:
+                return value
+            generation = data_generation()
+            value = func(obj, *args, **kwargs)
+            self.put(key, value, generation)
+            return value
+
+        return wrapper
+
+    def stats(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "acertos": self.hits,
+                "falhas": self.misses,
+                "taxa_acerto": self.hits / consultas if consultas else 0.0,
+                "invalidacoes": self.invalidations,
+                "expirados": self.expirations,
+                "descartados": self.evictions,
+                "entradas": len(self._entries),
+            }
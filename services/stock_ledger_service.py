@@ -0,0 +1,48 @@
+import config
+from database.connection import unit_of_work
+from repositories.ledger_repository import LedgerRepository
+
+
+class StockLedgerService:
+    """
+    Consultas e manutenção do razão de estoque.
+
+    As linhas do razão são gravadas pelos próprios serviços que alteram a
+    quantidade dos produtos (StockService, ProductService), na mesma
+    transação da alteração.
+    """
+
+    def __init__(self):
+        self.ledger_repo = LedgerRepository()
+
+    def create_snapshot(self):
+        """Grava snapshots dos produtos com linhas novas no razão."""
+        with unit_of_work():
+            self.ledger_repo.create_snapshots()
+
+    def snapshot_if_due(self) -> bool:
+        """Grava um snapshot se o último estiver antigo ou houver muitas linhas depois dele."""
+        status = self.ledger_repo.snapshot_status()
+        if not status["linhas_pendentes"]:
+            return False
+
+        vencido = True
+        if status["dias_desde_snapshot"] is not None:
+            vencido = status["dias_desde_snapshot"] >= config.STOCK_SNAPSHOT_INTERVAL_DAYS
+
+        if vencido or status["linhas_pendentes"] >= config.STOCK_SNAPSHOT_MAX_PENDING:
+            self.create_snapshot()
+            return True
+        return False
+
+    def quantity_at(self, produto_id: int, data):
+        """Quantidade do produto ao final do dia informado (None antes do início do razão)."""
+        return self.ledger_repo.quantity_at(produto_id, data)
+
+    def stock_at(self, data):
+        """Quantidade de cada produto ao final do dia informado."""
+        return self.ledger_repo.quantities_at(data)
+
+    def verify(self):
+        """Lista os produtos cuja quantidade atual diverge do razão."""
+        return self.ledger_repo.find_drift()
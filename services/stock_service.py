@@ -1,7 +1,12 @@
+from database.connection import unit_of_work
 from repositories.product_repository import ProductRepository
 from repositories.stock_repository import StockRepository
 from repositories.fiado_repository import FiadoRepository
 from repositories.prejuizo_repository import PrejuizoRepository
+from repositories.venda_repository import VendaRepository
+from repositories.ledger_repository import LedgerRepository
+from repositories.cliente_repository import ClienteRepository
+from repositories.lote_repository import LoteRepository
 
 
 class StockService:
@@ -14,40 +19,37 @@ class StockService:
         self.stock_repo = StockRepository()
         self.fiado_repo = FiadoRepository()
         self.prejuizo_repo = PrejuizoRepository()
+        self.venda_repo = VendaRepository()
+        self.ledger_repo = LedgerRepository()
+        self.cliente_repo = ClienteRepository()
+        self.lote_repo = LoteRepository()
 
     def entrada_produto(
         self,
         produto_id: int,
         quantidade: int,
-        observacao: str = ""
+        observacao: str = "",
+        data_validade=None
     ):
+        """Entrada de mercadoria: gera um lote com `data_validade` (ou a validade do cadastro)."""
         if quantidade <= 0:
             raise ValueError("A quantidade de entrada deve ser maior que zero.")
 
-        produto = self.product_repo.get_by_id(produto_id)
-        if not produto:
-            raise ValueError("Produto não encontrado.")
+        with unit_of_work():
+            # Atualiza o estoque do produto direto no banco
+            produto = self.product_repo.adjust_quantity(produto_id, quantidade, min_remaining=None)
+            if not produto:
+                raise ValueError("Produto não encontrado.")
 
-        nova_quantidade = produto["quantidade"] + quantidade
-
-        # Atualiza o estoque do produto
-        self.product_repo.update(
-            produto_id,
-            produto["nome"],
-            nova_quantidade,
-            produto["valor_compra"],
-            produto["valor_venda"],
-            produto["data_validade"],
-            bool(produto["ativo"])
-        )
-
-        # Registra movimentação (SEM valor_unitario)
-        self.stock_repo.register(
-            produto_id,
-            "ENTRADA",
-            quantidade,
-            observacao
-        )
+            # Registra movimentação (o repositório grava os preços atuais do produto)
+            movimentacao_id = self.stock_repo.register(
+                produto_id,
+                "ENTRADA",
+                quantidade,
+                observacao
+            )
+            self.ledger_repo.record(produto_id, quantidade, "ENTRADA", movimentacao_id)
+            self.lote_repo.create(produto_id, quantidade, data_validade, movimentacao_id)
 
     def saida_produto(
         self,
@@ -60,50 +62,239 @@ class StockService:
         if quantidade <= 0:
             raise ValueError("A quantidade de saída deve ser maior que zero.")
 
-        produto = self.product_repo.get_by_id(produto_id)
-        if not produto:
+        # Se for fiado, o cliente é obrigatório
+        if fiado and (not cliente or not cliente.strip()):
+            raise ValueError("Nome do cliente é obrigatório para fiado.")
+
+        with unit_of_work():
+            # Baixa o estoque só se houver quantidade suficiente
+            produto = self.product_repo.adjust_quantity(produto_id, -quantidade)
+            if not produto:
+                self._raise_adjust_error(produto_id, "Quantidade insuficiente em estoque para a saída.")
+
+            # Se for fiado, cria registro em fiados e não registra movimentação ainda
+            if fiado:
+                valor_unitario = produto["valor_venda"]
+                valor_total = round(valor_unitario * quantidade, 2)
+                cliente_id = self.cliente_repo.get_or_create(cliente)
+
+                fiado_id = self.fiado_repo.create(
+                    produto_id=produto_id,
+                    quantidade=quantidade,
+                    valor_unitario=valor_unitario,
+                    valor_total=valor_total,
+                    cliente=cliente.strip(),
+                    observacao=observacao,
+                    cliente_id=cliente_id
+                )
+                self.ledger_repo.record(produto_id, -quantidade, "FIADO", fiado_id)
+                self.lote_repo.consume(produto_id, quantidade, "FIADO", fiado_id)
+                self.cliente_repo.refresh_balances([cliente_id])
+            else:
+                # Registra movimentação (o repositório grava os preços atuais do produto)
+                movimentacao_id = self.stock_repo.register(
+                    produto_id,
+                    "SAIDA",
+                    quantidade,
+                    observacao
+                )
+                self.ledger_repo.record(produto_id, -quantidade, "SAIDA", movimentacao_id)
+                self.lote_repo.consume(produto_id, quantidade, "SAIDA", movimentacao_id)
+
+    def _raise_adjust_error(self, produto_id: int, mensagem_insuficiente: str):
+        """Explica por que adjust_quantity não atualizou o produto."""
+        if not self.product_repo.get_by_id(produto_id):
             raise ValueError("Produto não encontrado.")
+        raise ValueError(mensagem_insuficiente)
 
-        if produto["quantidade"] < quantidade:
-            raise ValueError("Quantidade insuficiente em estoque para a saída.")
+    def _repor_lotes(self, produto_id: int, quantidade: int, origem: str, referencia_id: int):
+        """
+        Estorno: devolve a quantidade aos lotes de onde ela saiu. O que não
+        tiver consumo registrado (saídas anteriores aos lotes) vira um lote novo.
+        """
+        devolvido = self.lote_repo.restore(origem, referencia_id)
+        if devolvido < quantidade:
+            self.lote_repo.create(produto_id, quantidade - devolvido)
 
-        nova_quantidade = produto["quantidade"] - quantidade
+    def entrada_lote(self, itens: list[tuple[int, int, str]]):
+        """
+        Registra a entrada de vários produtos (ex.: recebimento de um fornecedor).
+
+        Cada item é (produto_id, quantidade, observacao[, data_validade]); cada
+        linha gera um lote com a validade informada ou a do cadastro. Todas as
+        linhas são validadas antes de qualquer gravação; se alguma for inválida, nada é
+        gravado e o ValueError lista os erros por linha. Caso contrário, o
+        estoque e as movimentações são gravados com executemany em uma única
+        transação.
+        """
+        return self._aplicar_lote(itens, "ENTRADA")
 
-        # Atualiza o estoque do produto
-        self.product_repo.update(
-            produto_id,
-            produto["nome"],
-            nova_quantidade,
-            produto["valor_compra"],
-            produto["valor_venda"],
-            produto["data_validade"],
-            bool(produto["ativo"])
-        )
+    def saida_lote(self, itens: list[tuple[int, int, str]]):
+        """
+        Registra a saída de vários produtos de uma vez.
 
-        # Se for fiado, cria registro em fiados e não registra movimentação ainda
-        if fiado:
-            if not cliente or not cliente.strip():
-                raise ValueError("Nome do cliente é obrigatório para fiado.")
+        Mesmo formato e mesmas regras de entrada_lote; o estoque de cada
+        produto é verificado considerando todas as linhas do lote.
+        """
+        return self._aplicar_lote(itens, "SAIDA")
+
+    def _aplicar_lote(self, itens, tipo: str):
+        if not itens:
+            raise ValueError("Nenhum item informado.")
+
+        linhas = []
+        validades = []
+        for item in itens:
+            produto_id, quantidade, *resto = item
+            linhas.append((produto_id, quantidade, resto[0] if resto else ""))
+            validades.append(resto[1] if len(resto) > 1 else None)
+
+        with unit_of_work():
+            erros = self._validar_lote(linhas, tipo)
+            if erros:
+                raise ValueError("\n".join(erros))
+
+            sinal = 1 if tipo == "ENTRADA" else -1
+            deltas = [(produto_id, sinal * quantidade) for produto_id, quantidade, _ in linhas]
+            atualizados = self.product_repo.adjust_quantities(
+                deltas,
+                min_remaining=None if tipo == "ENTRADA" else 0
+            )
+            if atualizados != len(linhas):
+                raise ValueError("O estoque foi alterado durante a operação. Tente novamente.")
+
+            movimentacao_ids = self.stock_repo.register_many([
+                (produto_id, tipo, quantidade, observacao)
+                for produto_id, quantidade, observacao in linhas
+            ])
+            self.ledger_repo.record_many([
+                (produto_id, delta, tipo, movimentacao_id)
+                for (produto_id, delta), movimentacao_id in zip(deltas, movimentacao_ids)
+            ])
+
+            if tipo == "ENTRADA":
+                self.lote_repo.create_many([
+                    (produto_id, quantidade, data_validade, movimentacao_id)
+                    for (produto_id, quantidade, _), data_validade, movimentacao_id
+                    in zip(linhas, validades, movimentacao_ids)
+                ])
+            else:
+                for (produto_id, quantidade, _), movimentacao_id in zip(linhas, movimentacao_ids):
+                    self.lote_repo.consume(produto_id, quantidade, "SAIDA", movimentacao_id)
+
+        return len(linhas)
+
+    def _validar_lote(self, linhas, tipo: str) -> list[str]:
+        """Valida as linhas de um lote e retorna as mensagens de erro (uma por linha)."""
+        estoque = self.product_repo.get_available_quantities(produto_id for produto_id, _, _ in linhas)
+        restante = dict(estoque)
+        erros = []
+
+        for numero, (produto_id, quantidade, _) in enumerate(linhas, start=1):
+            if quantidade <= 0:
+                erros.append(f"Linha {numero}: a quantidade deve ser maior que zero.")
+            elif produto_id not in estoque:
+                erros.append(f"Linha {numero}: produto {produto_id} não encontrado.")
+            elif tipo == "SAIDA":
+                if restante[produto_id] < quantidade:
+                    erros.append(
+                        f"Linha {numero}: quantidade insuficiente em estoque "
+                        f"(disponível: {restante[produto_id]})."
+                    )
+                else:
+                    restante[produto_id] -= quantidade
+
+        return erros
+
+    def registrar_venda(
+        self,
+        itens: list[tuple[int, int]],
+        fiado: bool = False,
+        cliente: str | None = None,
+        observacao: str = ""
+    ):
+        """
+        Registra uma venda com vários itens (carrinho) em uma única transação.
 
-            valor_unitario = produto["valor_venda"]
-            valor_total = round(valor_unitario * quantidade, 2)
+        Cada item é (produto_id, quantidade). Todas as linhas são validadas
+        antes de gravar (mesmas regras de saida_lote). Grava o cabeçalho em
+        vendas e um item por linha, ligado à movimentação de SAIDA ou, se a
+        venda for fiado, ao registro de fiado. Os preços são os valores de
+        venda atuais dos produtos.
 
-            self.fiado_repo.create(
-                produto_id=produto_id,
-                quantidade=quantidade,
-                valor_unitario=valor_unitario,
-                valor_total=valor_total,
-                cliente=cliente.strip(),
-                observacao=observacao
-            )
-        else:
-            # Registra movimentação (SEM valor_unitario)
-            self.stock_repo.register(
-                produto_id,
-                "SAIDA",
-                quantidade,
-                observacao
+        Retorna {"venda_id": ..., "total": ...}.
+        """
+        if not itens:
+            raise ValueError("Nenhum item informado.")
+
+        if fiado and (not cliente or not cliente.strip()):
+            raise ValueError("Nome do cliente é obrigatório para fiado.")
+        cliente = cliente.strip() if fiado else None
+
+        linhas = [(produto_id, quantidade, "") for produto_id, quantidade in itens]
+
+        with unit_of_work():
+            erros = self._validar_lote(linhas, "SAIDA")
+            if erros:
+                raise ValueError("\n".join(erros))
+
+            precos = self.product_repo.get_sale_prices(produto_id for produto_id, _, _ in linhas)
+
+            atualizados = self.product_repo.adjust_quantities(
+                [(produto_id, -quantidade) for produto_id, quantidade, _ in linhas]
             )
+            if atualizados != len(linhas):
+                raise ValueError("O estoque foi alterado durante a operação. Tente novamente.")
+
+            valores = [round(precos[produto_id] * quantidade, 2) for produto_id, quantidade, _ in linhas]
+            total = round(sum(valores), 2)
+            venda_id = self.venda_repo.create(total, fiado, cliente, observacao)
+            cliente_id = self.cliente_repo.get_or_create(cliente) if fiado else None
+
+            itens_venda = []
+            for (produto_id, quantidade, _), valor_total in zip(linhas, valores):
+                valor_unitario = precos[produto_id]
+                movimentacao_id = fiado_id = None
+                if fiado:
+                    fiado_id = self.fiado_repo.create(
+                        produto_id=produto_id,
+                        quantidade=quantidade,
+                        valor_unitario=valor_unitario,
+                        valor_total=valor_total,
+                        cliente=cliente,
+                        observacao=observacao or f"Venda #{venda_id}",
+                        cliente_id=cliente_id
+                    )
+                else:
+                    movimentacao_id = self.stock_repo.register(
+                        produto_id,
+                        "SAIDA",
+                        quantidade,
+                        observacao or f"Venda #{venda_id}",
+                        valor_unitario=valor_unitario
+                    )
+                self.ledger_repo.record(
+                    produto_id,
+                    -quantidade,
+                    "FIADO" if fiado else "SAIDA",
+                    fiado_id if fiado else movimentacao_id
+                )
+                self.lote_repo.consume(
+                    produto_id,
+                    quantidade,
+                    "FIADO" if fiado else "SAIDA",
+                    fiado_id if fiado else movimentacao_id
+                )
+                itens_venda.append((
+                    venda_id, produto_id, quantidade, valor_unitario,
+                    valor_total, movimentacao_id, fiado_id
+                ))
+
+            self.venda_repo.add_itens(itens_venda)
+            if fiado:
+                self.cliente_repo.refresh_balances([cliente_id])
+
+        return {"venda_id": venda_id, "total": total}
 
     def list_open_fiados(self):
         """Retorna lista de fiados em aberto."""
@@ -114,37 +305,25 @@ class StockService:
         if quantidade <= 0:
             raise ValueError("Quantidade deve ser maior que zero.")
 
-        produto = self.product_repo.get_by_id(produto_id)
-        if not produto:
-            raise ValueError("Produto não encontrado.")
+        with unit_of_work():
+            # Baixa o estoque só se houver quantidade suficiente
+            produto = self.product_repo.adjust_quantity(produto_id, -quantidade)
+            if not produto:
+                self._raise_adjust_error(produto_id, "Quantidade insuficiente em estoque para registrar prejuízo.")
+
+            valor_unitario = produto["valor_venda"]
+            valor_total = round(valor_unitario * quantidade, 2)
 
-        if produto["quantidade"] < quantidade:
-            raise ValueError("Quantidade insuficiente em estoque para registrar prejuízo.")
-
-        nova_quantidade = produto["quantidade"] - quantidade
-
-        # Atualiza estoque
-        self.product_repo.update(
-            produto_id,
-            produto["nome"],
-            nova_quantidade,
-            produto["valor_compra"],
-            produto["valor_venda"],
-            produto["data_validade"],
-            bool(produto["ativo"])
-        )
-
-        valor_unitario = produto["valor_venda"]
-        valor_total = round(valor_unitario * quantidade, 2)
-
-        prej_id = self.prejuizo_repo.create(
-            produto_id=produto_id,
-            quantidade=quantidade,
-            valor_unitario=valor_unitario,
-            valor_total=valor_total,
-            motivo=motivo,
-            observacao=observacao
-        )
+            prej_id = self.prejuizo_repo.create(
+                produto_id=produto_id,
+                quantidade=quantidade,
+                valor_unitario=valor_unitario,
+                valor_total=valor_total,
+                motivo=motivo,
+                observacao=observacao
+            )
+            self.ledger_repo.record(produto_id, -quantidade, "PREJUIZO", prej_id)
+            self.lote_repo.consume(produto_id, quantidade, "PREJUIZO", prej_id)
 
         return prej_id
 
@@ -154,86 +333,107 @@ class StockService:
         A exclusão apenas é permitida se o prejuízo existir. O estoque é ajustado
         adicionando-se novamente a quantidade perdida.
         """
-        # Busca registro existente
-        prej = self.prejuizo_repo.get_by_id(prejuizo_id)
-        if not prej:
-            raise ValueError("Prejuízo não encontrado.")
-
-        produto_id = prej[1]  # tuple: (id, produto_id, quantidade, ...)
-        quantidade = prej[2]
-
-        # Atualiza estoque adicionando a quantidade do prejuízo
-        produto = self.product_repo.get_by_id(produto_id)
-        if not produto:
-            raise ValueError("Produto associado ao prejuízo não encontrado.")
-
-        nova_quantidade = produto["quantidade"] + quantidade
-        self.product_repo.update(
-            produto_id,
-            produto["nome"],
-            nova_quantidade,
-            produto["valor_compra"],
-            produto["valor_venda"],
-            produto["data_validade"],
-            bool(produto["ativo"])
-        )
-
-        # por fim, exclui o registro de prejuízo
-        self.prejuizo_repo.delete(prejuizo_id)
+        with unit_of_work():
+            # Busca registro existente
+            prej = self.prejuizo_repo.get_by_id(prejuizo_id)
+            if not prej:
+                raise ValueError("Prejuízo não encontrado.")
+
+            produto_id = prej[1]  # tuple: (id, produto_id, quantidade, ...)
+            quantidade = prej[2]
+
+            # Atualiza estoque adicionando a quantidade do prejuízo
+            if not self.product_repo.adjust_quantity(produto_id, quantidade, min_remaining=None):
+                raise ValueError("Produto associado ao prejuízo não encontrado.")
+            self.ledger_repo.record(produto_id, quantidade, "ESTORNO", prejuizo_id)
+            self._repor_lotes(produto_id, quantidade, "PREJUIZO", prejuizo_id)
+
+            # por fim, exclui o registro de prejuízo
+            self.prejuizo_repo.delete(prejuizo_id)
 
     def pay_fiado(self, fiado_id: int):
         """Marca fiado como pago: cria movimentação SAIDA (para contabilizar nas vendas) e atualiza registro de fiado."""
-        # Busca fiado
-        # (repository.list_open() returns rows mas precisamos dos dados para criar movimentacao)
-        open_fiados = self.fiado_repo.list_open()
-        target = None
-        for f in open_fiados:
-            if f[0] == fiado_id:
-                target = f
-                break
-
-        if not target:
-            raise ValueError("Fiado não encontrado ou já pago")
+        with unit_of_work():
+            # Busca o fiado em aberto pela chave
+            target = self.fiado_repo.get_open_by_id(fiado_id)
+            if not target:
+                raise ValueError("Fiado não encontrado ou já pago")
+
+            # target: (id, produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, data_fiado)
+            produto_id = target[1]
+            quantidade = target[2]
+            observacao = f"Pagamento fiado: {target[5]}"
+
+            # Cria movimentação de SAIDA para contabilizar a venda
+            movimentacao_id = self.stock_repo.register(
+                produto_id, "SAIDA", quantidade, observacao, valor_unitario=target[3]
+            )
 
-        # target: (id, produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, data_fiado)
-        produto_id = target[1]
-        quantidade = target[2]
-        observacao = f"Pagamento fiado: {target[5]}"
+            # Marca fiado como pago e vincula a movimentação
+            self.fiado_repo.mark_paid(fiado_id, movimentacao_id)
 
-        # Cria movimentação de SAIDA para contabilizar a venda
-        movimentacao_id = self.stock_repo.register(produto_id, "SAIDA", quantidade, observacao)
+    def pagar_fiados_cliente(self, cliente: str, ids: list[int] | None = None):
+        """
+        Paga de uma vez os fiados em aberto do cliente (todos ou apenas `ids`),
+        em uma única transação: as movimentações SAIDA são gravadas com
+        executemany e cada fiado é vinculado à sua movimentação. O cliente é
+        localizado pela chave normalizada do nome (acentos e maiúsculas não
+        importam).
 
-        # Marca fiado como pago e vincula a movimentação
-        self.fiado_repo.mark_paid(fiado_id, movimentacao_id)
+        Retorna {"pagos": quantidade de fiados, "total": valor pago}.
+        """
+        cliente = (cliente or "").strip()
+        if not cliente:
+            raise ValueError("Informe o cliente.")
+        if ids is not None and not ids:
+            raise ValueError("Nenhum fiado selecionado.")
+
+        with unit_of_work():
+            registro = self.cliente_repo.find_by_name(cliente)
+            if not registro:
+                raise ValueError("Cliente não encontrado.")
+
+            fiados = self.fiado_repo.list_open_by_cliente(registro["id"], ids)
+            if not fiados:
+                raise ValueError("Nenhum fiado em aberto para este cliente.")
+            if ids is not None and len(fiados) != len(set(ids)):
+                raise ValueError("Algum fiado selecionado não é deste cliente ou já foi pago.")
+
+            observacao = f"Pagamento fiado: {registro['nome']}"
+            movimentacao_ids = self.stock_repo.register_many([
+                (f["produto_id"], "SAIDA", f["quantidade"], observacao, f["valor_unitario"])
+                for f in fiados
+            ])
+            self.fiado_repo.mark_paid_many([
+                (movimentacao_id, f["id"])
+                for movimentacao_id, f in zip(movimentacao_ids, fiados)
+            ])
+
+        return {"pagos": len(fiados), "total": sum(f["valor_total"] for f in fiados)}
+
+    def list_fiado_clientes(self):
+        """Clientes com fiados em aberto, com saldo e idade do fiado mais antigo."""
+        return self.cliente_repo.list_open_balances()
 
     def remove_fiado(self, fiado_id: int):
         """Exclui um fiado em aberto e repõe o estoque."""
-        fiado = self.fiado_repo.get_by_id(fiado_id)
-        if not fiado:
-            raise ValueError("Fiado não encontrado.")
-
-        pago = fiado[8]  # coluna 'pago'
-        if pago == 1:
-            raise ValueError("Não é possível excluir um fiado já pago.")
-
-        produto_id = fiado[1]
-        quantidade = fiado[2]
-
-        # Ajusta estoque devolvendo quantidade vendida
-        produto = self.product_repo.get_by_id(produto_id)
-        if not produto:
-            raise ValueError("Produto associado ao fiado não encontrado.")
-
-        nova_quantidade = produto["quantidade"] + quantidade
-        self.product_repo.update(
-            produto_id,
-            produto["nome"],
-            nova_quantidade,
-            produto["valor_compra"],
-            produto["valor_venda"],
-            produto["data_validade"],
-            bool(produto["ativo"])
-        )
-
-        # Exclui o registro do fiado
-        self.fiado_repo.delete(fiado_id)
+        with unit_of_work():
+            fiado = self.fiado_repo.get_by_id(fiado_id)
+            if not fiado:
+                raise ValueError("Fiado não encontrado.")
+
+            pago = fiado[8]  # coluna 'pago'
+            if pago == 1:
+                raise ValueError("Não é possível excluir um fiado já pago.")
+
+            produto_id = fiado[1]
+            quantidade = fiado[2]
+
+            # Ajusta estoque devolvendo quantidade vendida
+            if not self.product_repo.adjust_quantity(produto_id, quantidade, min_remaining=None):
+                raise ValueError("Produto associado ao fiado não encontrado.")
+            self.ledger_repo.record(produto_id, quantidade, "ESTORNO", fiado_id)
+            self._repor_lotes(produto_id, quantidade, "FIADO", fiado_id)
+
+            # Exclui o registro do fiado
+            self.fiado_repo.delete(fiado_id)
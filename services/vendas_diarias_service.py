@@ -0,0 +1,22 @@
+from database.connection import unit_of_work
+from repositories.vendas_diarias_repository import VendasDiariasRepository
+
+
+class VendasDiariasService:
+    """
+    Manutenção do resumo diário de vendas usado pelos relatórios e pelo
+    dashboard. No uso normal o resumo se mantém sozinho (gatilhos); a
+    reconstrução serve para corrigir uma divergência apontada por verify().
+    """
+
+    def __init__(self):
+        self.repo = VendasDiariasRepository()
+
+    def rebuild(self) -> int:
+        """Recalcula o resumo a partir de todas as movimentações."""
+        with unit_of_work():
+            return self.repo.rebuild()
+
+    def verify(self):
+        """Lista os dias/produtos em que o resumo diverge das movimentações."""
+        return self.repo.find_drift()
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from database import connection
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Banco novo em um arquivo temporário, com todas as migrações aplicadas."""
+    path = tmp_path / "estoque.db"
+    connection.close_all_connections()
+    monkeypatch.setattr(connection, "DB_PATH", path)
+    monkeypatch.setattr(connection._manager, "db_path", path)
+    connection.initialize_database()
+    yield connection.get_connection()
+    connection.close_all_connections()
+
+
+@pytest.fixture
+def history(db):
+    """120 produtos e 5000 movimentações aleatórias (semente fixa) em até 800 dias."""
+    rng = random.Random(7)
+    db.executemany(
+        "INSERT INTO produtos (nome, quantidade, valor_compra, valor_venda, ativo) VALUES (?, 100, ?, ?, ?)",
+        [
+            (f"Produto {i}", round(rng.uniform(1, 5), 2), round(rng.uniform(2, 9), 2), int(i % 9 != 0))
+            for i in range(1, 121)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, valor_unitario, custo_unitario, data_movimentacao) "
+        "VALUES (?, ?, ?, ?, ?, datetime('now', ?, ?))",
+        [
+            (
+                rng.randint(1, 120),
+                rng.choice(["SAIDA", "SAIDA", "ENTRADA"]),
+                rng.randint(1, 5),
+                None if i % 50 == 0 else round(rng.uniform(1, 9), 2),
+                round(rng.uniform(0.5, 3), 2),
+                f"-{rng.randint(0, 800)} days",
+                f"-{rng.randint(0, 86399)} seconds",
+            )
+            for i in range(5000)
+        ],
+    )
+    db.commit()
+    return db
+
@@ -0,0 +1,66 @@
+"""
+Motor de análises em memória (services.analytics_engine): os resultados
+devem ser os mesmos das consultas SQL de AnalyticsRepository.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+import config
+from database.connection import bump_data_generation
+from repositories.analytics_repository import AnalyticsRepository
+
+pytest.importorskip("numpy")
+
+from services.analytics_engine import AnalyticsEngine  # noqa: E402
+
+
+def normalize(rows):
+    # Linhas como tuplas, com floats arredondados (SQL x motor em memória)
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows]
+
+
+def assert_same_results(engine, repo):
+    hoje = date.today()
+    for dias in (7, 30, 400):
+        inicio = hoje - timedelta(days=dias)
+        assert normalize(engine.sales_by_period(inicio, hoje)) == normalize(repo.get_sales_by_period(inicio, hoje))
+    for meses in (1, 12, 30):
+        assert normalize(engine.monthly_summary(meses)) == normalize(repo.get_monthly_summary(meses))
+    # Todos os produtos: a ordem dos empates no top N não é definida no SQL
+    assert normalize(engine.top_products(1000)) == normalize(repo.get_top_products(1000))
+    for dias in (7, 30):
+        assert sorted(normalize(engine.product_turnover(dias))) == sorted(normalize(repo.get_product_turnover(dias)))
+    assert sorted(normalize(engine.profit_margins())) == sorted(normalize(repo.get_profit_margin_by_product()))
+    limites = (config.ANALYTICS_ABC_LIMITE_A, config.ANALYTICS_ABC_LIMITE_B)
+    assert normalize(engine.abc_curve(*limites)) == normalize(repo.get_abc_curve(*limites))
+
+
+def test_engine_matches_sql(history):
+    assert_same_results(AnalyticsEngine(), AnalyticsRepository())
+
+
+def test_engine_follows_new_and_removed_movements(history):
+    engine = AnalyticsEngine()
+    repo = AnalyticsRepository()
+    assert_same_results(engine, repo)
+
+    # Inserção fora de ordem de data e exclusão em cascata, feitas fora dos
+    # repositórios; a geração nova faz o motor conferir o que já carregou
+    history.execute(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, valor_unitario, custo_unitario, data_movimentacao) "
+        "VALUES (5, 'SAIDA', 4, 2, 1, datetime('now', '-100 days'))"
+    )
+    history.execute("DELETE FROM produtos WHERE id = 7")
+    history.commit()
+    bump_data_generation()
+    assert_same_results(engine, repo)
+
+
+def test_abc_curve_classes(history):
+    curva = AnalyticsEngine().abc_curve(config.ANALYTICS_ABC_LIMITE_A, config.ANALYTICS_ABC_LIMITE_B)
+
+    assert curva[0]["classe"] == "A"
+    assert curva[-1]["acumulado"] == pytest.approx(100.0)
+    classes = [item["classe"] for item in curva]
+    assert classes == sorted(classes)
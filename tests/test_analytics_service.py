@@ -0,0 +1,62 @@
+"""
+AnalyticsService: escolha entre o motor em memória e o SQL, e o snapshot
+do dashboard.
+"""
+import config
+from repositories.analytics_repository import AnalyticsRepository
+from services.analytics_service import AnalyticsService, analytics_cache
+
+
+def normalize(rows):
+    # Linhas como tuplas, com floats arredondados (SQL x motor em memória)
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows]
+
+
+def test_service_falls_back_to_sql_when_method_is_off(history, monkeypatch):
+    monkeypatch.setitem(config.ANALYTICS_ENGINE_METHODS, "get_abc_curve", False)
+    analytics_cache.clear()
+    service = AnalyticsService()
+
+    assert service._engine("get_abc_curve") is None
+    limites = (config.ANALYTICS_ABC_LIMITE_A, config.ANALYTICS_ABC_LIMITE_B)
+    assert normalize(service.get_abc_curve()) == normalize(AnalyticsRepository().get_abc_curve(*limites))
+
+
+def test_dashboard_snapshot_includes_abc_curve(history):
+    analytics_cache.clear()
+    snapshot = AnalyticsService().get_dashboard_snapshot()
+
+    assert snapshot.erros == {}
+    assert snapshot.curva_abc
+    assert {item["classe"] for item in snapshot.curva_abc} <= {"A", "B", "C"}
+
+
+def test_dashboard_snapshot_includes_cart_sales_summary(db):
+    db.executemany(
+        "INSERT INTO vendas (valor_total, data_venda) VALUES (?, datetime('now', ?))",
+        [(10.0, "-1 days"), (30.0, "-5 days"), (500.0, "-90 days")],
+    )
+    db.commit()
+    analytics_cache.clear()
+
+    resumo = AnalyticsService().get_dashboard_snapshot().vendas_resumo
+
+    assert resumo["num_vendas"] == 2
+    assert resumo["total"] == 40.0
+    assert resumo["ticket_medio"] == 20.0
+
+
+def test_fiados_detalhados_reports_pago_as_bool(db):
+    db.execute("INSERT INTO produtos (nome, valor_compra, valor_venda) VALUES ('Arroz', 1, 2)")
+    db.executemany(
+        "INSERT INTO fiados (produto_id, quantidade, valor_unitario, valor_total, cliente, pago) VALUES (1, 1, 2, 2, ?, ?)",
+        [("Ana", 0), ("Bruno", 1)],
+    )
+    db.commit()
+    analytics_cache.clear()
+
+    fiados = AnalyticsService().get_fiados_detalhados()
+
+    assert sorted((f["cliente"], f["pago"]) for f in fiados) == [("Ana", False), ("Bruno", True)]
+    assert all(type(f["pago"]) is bool for f in fiados)
+    assert fiados[0].produto_nome == "Arroz"
@@ -0,0 +1,158 @@
+"""
+Restauração de backup (BackupService.import_database).
+"""
+import shutil
+import sqlite3
+
+import pytest
+
+from database import connection
+from database.migrations import MIGRATIONS, SCHEMA_VERSION, get_schema_version
+from services import backup_service
+from services.analytics_service import AnalyticsService
+from services.backup_service import BackupService
+
+
+@pytest.fixture
+def db_path(db, monkeypatch):
+    # backup_service guarda o caminho do banco na importação do módulo
+    monkeypatch.setattr(backup_service, "DB_PATH", connection.DB_PATH)
+    return connection.DB_PATH
+
+
+def add_product(nome):
+    conn = connection.get_connection()
+    conn.execute(
+        "INSERT INTO produtos (nome, quantidade, valor_compra, valor_venda) VALUES (?, 1, 1, 2)",
+        (nome,),
+    )
+    conn.commit()
+
+
+def test_import_invalidates_cached_results(db_path, tmp_path, monkeypatch):
+    add_product("Arroz")
+    backup = BackupService.export_database(tmp_path / "backups")
+    add_product("Feijão")
+
+    service = AnalyticsService()
+    assert service.get_stock_metrics()["total_produtos"] == 2
+
+    # Uma leitura que chega depois de as conexões serem fechadas e antes de
+    # o arquivo ser trocado guarda em cache os dados antigos
+    copy2 = shutil.copy2
+
+    def copy_with_read(src, dst, *args, **kwargs):
+        if src == backup:
+            service.get_stock_metrics()
+        return copy2(src, dst, *args, **kwargs)
+
+    monkeypatch.setattr(backup_service.shutil, "copy2", copy_with_read)
+    BackupService.import_database(backup)
+
+    assert service.get_stock_metrics()["total_produtos"] == 1
+
+
+def test_import_reloads_analytics_engine(db_path, tmp_path):
+    pytest.importorskip("numpy")
+    from services.analytics_engine import analytics_engine
+
+    add_product("Arroz")
+    add_product("Feijão")
+    conn = connection.get_connection()
+    conn.execute(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, valor_unitario, custo_unitario) "
+        "VALUES (1, 'SAIDA', 5, 2, 1)"
+    )
+    conn.commit()
+    backup = BackupService.export_database(tmp_path / "backups")
+
+    # Depois do backup a venda muda de produto: mesmo número de linhas, então
+    # só a contagem feita pelo motor não percebe a troca do arquivo
+    conn.execute("DELETE FROM movimentacoes")
+    conn.execute(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, valor_unitario, custo_unitario) "
+        "VALUES (2, 'SAIDA', 5, 2, 1)"
+    )
+    conn.commit()
+    analytics_engine.reset()
+    assert [r["nome"] for r in analytics_engine.top_products()] == ["Feijão"]
+
+    BackupService.import_database(backup)
+
+    assert [r["nome"] for r in analytics_engine.top_products()] == ["Arroz"]
+
+
+def old_version_backup(path, version):
+    # Backup gravado por uma versão do programa com o schema até `version`
+    conn = sqlite3.connect(path)
+    for numero, step in MIGRATIONS[:version]:
+        step(conn)
+        conn.execute(f"PRAGMA user_version = {numero}")
+    conn.execute("INSERT INTO produtos (nome, valor_compra, valor_venda) VALUES ('Antigo', 1, 2)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_import_migrates_old_backup(db_path, tmp_path):
+    backup = old_version_backup(tmp_path / "antigo.db", 3)
+
+    BackupService.import_database(backup)
+
+    conn = connection.get_connection()
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert [r[0] for r in conn.execute("SELECT nome FROM produtos")] == ["Antigo"]
+    # Tabelas das migrações posteriores já existem
+    conn.execute("SELECT COUNT(*) FROM vendas_diarias").fetchone()
+
+
+def test_failed_migration_restores_previous_database(db_path, tmp_path, monkeypatch):
+    add_product("Atual")
+    backup = old_version_backup(tmp_path / "antigo.db", 3)
+
+    def falha():
+        raise Exception("migração falhou")
+
+    monkeypatch.setattr(backup_service, "initialize_database", falha)
+    with pytest.raises(Exception, match="migração falhou"):
+        BackupService.import_database(backup)
+
+    conn = connection.get_connection()
+    assert [r[0] for r in conn.execute("SELECT nome FROM produtos")] == ["Atual"]
+
+
+def test_import_refused_while_another_instance_has_the_database_open(db_path, tmp_path):
+    add_product("Arroz")
+    backup = BackupService.export_database(tmp_path / "backups")
+
+    # Outra instância do programa grava e continua com o banco aberto; a
+    # gravação fica no -wal até um checkpoint
+    outra = sqlite3.connect(db_path)
+    try:
+        outra.execute("INSERT INTO produtos (nome, valor_compra, valor_venda) VALUES ('Feijão', 1, 2)")
+        outra.commit()
+
+        with pytest.raises(Exception, match="aberto em outra janela"):
+            BackupService.import_database(backup)
+    finally:
+        outra.close()
+
+    conn = connection.get_connection()
+    assert [r[0] for r in conn.execute("SELECT nome FROM produtos ORDER BY id")] == ["Arroz", "Feijão"]
+
+
+def test_import_keeps_writes_still_in_the_wal(db_path, tmp_path):
+    add_product("Antigo")
+    backup = BackupService.export_database(tmp_path / "backups")
+    add_product("Recente")
+
+    BackupService.import_database(backup)
+
+    # O banco substituído foi guardado inteiro no backup de segurança
+    seguranca = sqlite3.connect(db_path.parent / f".{db_path.stem}_safety_backup.db")
+    try:
+        assert [r[0] for r in seguranca.execute("SELECT nome FROM produtos ORDER BY id")] == ["Antigo", "Recente"]
+    finally:
+        seguranca.close()
+    conn = connection.get_connection()
+    assert [r[0] for r in conn.execute("SELECT nome FROM produtos")] == ["Antigo"]
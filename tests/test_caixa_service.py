@@ -0,0 +1,38 @@
+"""
+Abertura e fechamento do caixa (CaixaService).
+"""
+from database.connection import get_connection
+from services.caixa_service import CaixaService
+
+
+def abrir(valor=100):
+    service = CaixaService()
+    caixa_id = service.abrir_caixa(valor)["caixa_id"]
+    return service, caixa_id, service.repository.find_by_id(caixa_id)["versao"]
+
+
+def test_close_with_stale_version_is_refused(db):
+    service, caixa_id, lida = abrir()
+
+    # Outro terminal alterou o caixa depois que a tela foi carregada
+    conn = get_connection()
+    conn.execute("UPDATE caixa SET versao = versao + 1 WHERE id = ?", (caixa_id,))
+    conn.commit()
+
+    resultado = service.fechar_caixa(caixa_id, 150, lida)
+    assert resultado["success"] is False and resultado["conflito"] is True
+    assert service.repository.find_by_id(caixa_id)["status"] == "ABERTO"
+
+    resultado = service.fechar_caixa(caixa_id, 150, lida + 1)
+    assert resultado["success"] is True and resultado["diferenca"] == 50
+    assert service.repository.find_by_id(caixa_id)["status"] == "FECHADO"
+
+
+def test_closed_register_cannot_be_closed_again(db):
+    service, caixa_id, lida = abrir()
+
+    assert service.fechar_caixa(caixa_id, 120)["success"] is True
+    resultado = service.fechar_caixa(caixa_id, 130, lida)
+
+    assert resultado == {"success": False, "error": "Este caixa já foi fechado"}
+    assert service.repository.find_by_id(caixa_id)["valor_fechamento"] == 120
@@ -0,0 +1,48 @@
+"""
+Saldo de fiados em aberto dos clientes (clientes.saldo_aberto,
+fiados_abertos e primeiro_fiado_aberto).
+"""
+from database.connection import get_connection
+from repositories.cliente_repository import ClienteRepository
+from services.product_service import ProductService
+from services.stock_service import StockService
+
+
+def add_product(nome, valor_venda):
+    return ProductService().create_product(nome, 10, 1, valor_venda, None)
+
+
+def saldo(nome):
+    cliente = ClienteRepository().find_by_name(nome)
+    return cliente["saldo_aberto"], cliente["fiados_abertos"]
+
+
+def test_cascade_delete_of_product_updates_balance(db):
+    arroz = add_product("Arroz", 10)
+    feijao = add_product("Feijão", 7.5)
+    stock = StockService()
+    stock.saida_produto(arroz, 1, fiado=True, cliente="José")
+    stock.saida_produto(feijao, 2, fiado=True, cliente="jose")
+    assert saldo("José") == (25.0, 2)
+
+    # Exclusão direta no banco: os fiados do produto saem em cascata
+    conn = get_connection()
+    conn.execute("DELETE FROM produtos WHERE id = ?", (feijao,))
+    conn.commit()
+
+    assert saldo("José") == (10.0, 1)
+
+
+def test_pay_and_remove_fiado_update_balance(db):
+    arroz = add_product("Arroz", 10)
+    stock = StockService()
+    stock.saida_produto(arroz, 1, fiado=True, cliente="Maria")
+    stock.saida_produto(arroz, 2, fiado=True, cliente="Maria")
+    primeiro, segundo = [f["id"] for f in get_connection().execute("SELECT id FROM fiados ORDER BY id")]
+
+    stock.pay_fiado(primeiro)
+    assert saldo("Maria") == (20.0, 1)
+
+    stock.remove_fiado(segundo)
+    assert saldo("Maria") == (0, 0)
+    assert ClienteRepository().find_by_name("Maria")["primeiro_fiado_aberto"] is None
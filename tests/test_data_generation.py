@@ -0,0 +1,61 @@
+"""
+Geração dos dados (database.connection): invalida os caches de consultas
+quando uma escrita é gravada ou desfeita, e só nesses casos.
+"""
+import sqlite3
+
+import pytest
+
+from database.connection import data_generation, unit_of_work
+from repositories.base_repository import BaseRepository
+
+INSERT_TAG = "INSERT INTO tags (nome) VALUES (?)"
+
+
+def test_successful_writes_bump_generation(db):
+    repo = BaseRepository()
+
+    antes = data_generation()
+    repo.execute(INSERT_TAG, ("a",))
+    assert data_generation() == antes + 1
+
+    antes = data_generation()
+    repo.execute_many(INSERT_TAG, [("b",), ("c",)])
+    assert data_generation() == antes + 1
+
+    antes = data_generation()
+    repo.insert_many(INSERT_TAG, [("d",), ("e",)])
+    assert data_generation() == antes + 1
+
+    antes = data_generation()
+    repo.execute_returning("INSERT INTO tags (nome) VALUES (?) RETURNING id", ("f",))
+    assert data_generation() == antes + 1
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda repo: repo.execute("INSERT INTO tabela_inexistente VALUES (1)"),
+        lambda repo: repo.execute_many("INSERT INTO tabela_inexistente VALUES (?)", [(1,)]),
+        lambda repo: repo.insert_many("INSERT INTO tabela_inexistente VALUES (?)", [(1,)]),
+        lambda repo: repo.execute_returning("INSERT INTO tabela_inexistente VALUES (1) RETURNING 1"),
+    ],
+)
+def test_failed_write_keeps_generation(db, write):
+    antes = data_generation()
+    with pytest.raises(sqlite3.Error):
+        write(BaseRepository())
+    assert data_generation() == antes
+
+
+def test_rolled_back_unit_of_work_bumps_generation(db):
+    repo = BaseRepository()
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            repo.execute(INSERT_TAG, ("a",))
+            dentro = data_generation()
+            raise RuntimeError("falha no meio da operação")
+
+    # Leituras feitas dentro do bloco viram a tag que foi desfeita
+    assert data_generation() > dentro
+    assert repo.fetchone("SELECT COUNT(*) FROM tags")[0] == 0
@@ -0,0 +1,116 @@
+"""
+Faixas semiabertas de utils.dates.day_range e sua equivalência com os
+filtros antigos por DATE(col) / strftime, que impediam o uso dos índices.
+"""
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from repositories.stock_repository import StockRepository
+from utils.dates import day_range, to_date
+
+# Horários nas bordas de cada dia, nos formatos que a aplicação grava
+TIMESTAMPS = [
+    f"{day} {hora}"
+    for day in ("2026-01-30", "2026-01-31", "2026-02-01", "2026-02-28", "2026-03-01")
+    for hora in ("00:00:00", "12:00:00", "23:59:59")
+] + [
+    "2026-01-31",
+    "2026-01-31T23:59:59",
+    "2026-01-31 23:59:59.999999",
+    "2026-02-01T00:00:00",
+    "2026-03-01 00:00:00.000001",
+]
+
+PERIODS = [
+    ("2026-01-31", "2026-01-31"),
+    ("2026-01-31", "2026-02-01"),
+    ("2026-02-01", "2026-02-28"),
+    ("2026-02-28", "2026-03-01"),
+    ("2026-01-01", "2026-12-31"),
+    ("2026-02-02", "2026-02-27"),
+]
+
+
+def test_day_range_defaults_to_single_day():
+    assert day_range("2026-01-31") == ("2026-01-31", "2026-02-01")
+    assert day_range(date(2026, 1, 31)) == ("2026-01-31", "2026-02-01")
+
+
+def test_day_range_accepts_datetimes_and_timestamps():
+    assert day_range(datetime(2026, 1, 1, 23, 59, 59), datetime(2026, 1, 2, 0, 0)) == (
+        "2026-01-01",
+        "2026-01-03",
+    )
+    assert day_range("2026-01-01 23:59:59", "2026-01-02T08:00:00") == (
+        "2026-01-01",
+        "2026-01-03",
+    )
+    assert to_date(" 2026-01-05 10:00:00 ") == date(2026, 1, 5)
+
+
+def test_day_range_crosses_month_and_year_boundaries():
+    assert day_range("2026-02-01", "2026-02-28") == ("2026-02-01", "2026-03-01")
+    assert day_range("2024-02-29") == ("2024-02-29", "2024-03-01")
+    assert day_range("2026-12-31") == ("2026-12-31", "2027-01-01")
+
+
+@pytest.fixture
+def timestamps():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, data TEXT)")
+    conn.executemany("INSERT INTO t (data) VALUES (?)", [(ts,) for ts in TIMESTAMPS])
+    yield conn
+    conn.close()
+
+
+def _ids(conn, where, params):
+    return [row[0] for row in conn.execute(f"SELECT id FROM t WHERE {where} ORDER BY id", params)]
+
+
+@pytest.mark.parametrize("start, end", PERIODS)
+def test_half_open_range_matches_date_between(timestamps, start, end):
+    antigo = _ids(timestamps, "DATE(data) BETWEEN DATE(?) AND DATE(?)", (start, end))
+    novo = _ids(timestamps, "data >= ? AND data < ?", day_range(start, end))
+    assert novo == antigo
+
+
+@pytest.mark.parametrize("day", ["2026-01-30", "2026-01-31", "2026-02-01", "2026-03-01"])
+def test_half_open_range_matches_single_day_predicates(timestamps, day):
+    novo = _ids(timestamps, "data >= ? AND data < ?", day_range(day))
+    assert novo == _ids(timestamps, "DATE(data) = DATE(?)", (day,))
+    assert novo == _ids(timestamps, "strftime('%Y-%m-%d', data) = ?", (day,))
+
+
+@pytest.mark.parametrize("start, end", PERIODS)
+def test_half_open_range_matches_with_datetime_bounds(timestamps, start, end):
+    inicio = datetime.fromisoformat(f"{start} 23:59:59")
+    fim = datetime.fromisoformat(f"{end} 00:00:00")
+    antigo = _ids(timestamps, "DATE(data) BETWEEN DATE(?) AND DATE(?)", (str(inicio), str(fim)))
+    assert _ids(timestamps, "data >= ? AND data < ?", day_range(inicio, fim)) == antigo
+
+
+def test_list_by_period_matches_old_predicate(db):
+    produto_id = db.execute(
+        "INSERT INTO produtos (nome, valor_compra, valor_venda) VALUES ('Teste', 1, 2)"
+    ).lastrowid
+    db.executemany(
+        "INSERT INTO movimentacoes (produto_id, tipo, quantidade, data_movimentacao) "
+        "VALUES (?, 'ENTRADA', 1, ?)",
+        [(produto_id, ts) for ts in TIMESTAMPS],
+    )
+    db.commit()
+
+    for start, end in PERIODS:
+        antigo = [
+            row[0]
+            for row in db.execute(
+                "SELECT id FROM movimentacoes "
+                "WHERE DATE(data_movimentacao) BETWEEN DATE(?) AND DATE(?) "
+                "ORDER BY data_movimentacao",
+                (start, end),
+            )
+        ]
+        novo = [row["id"] for row in StockRepository().list_by_period(start, end)]
+        assert sorted(novo) == sorted(antigo), (start, end)
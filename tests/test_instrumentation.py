@@ -0,0 +1,46 @@
+"""
+Instrumentação de SQL (database.instrumentation).
+"""
+import pytest
+
+import config
+from database import instrumentation
+from database.instrumentation import SqlInstrumentation
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, "LOG_PATH", tmp_path / "sql_profile.log")
+    monkeypatch.setattr(config, "SQL_STATS_SAMPLES", 5)
+    profiler = SqlInstrumentation()
+    profiler.slow_query_ms = 10_000
+    yield profiler
+    if profiler._logger is not None:
+        for handler in list(profiler._logger.handlers):
+            profiler._logger.removeHandler(handler)
+            handler.close()
+
+
+def test_totals_cover_calls_beyond_the_sample_window(db, profiler):
+    # 100 ms na primeira chamada e 1 ms nas outras 19: só 5 amostras ficam guardadas
+    duracoes = [100.0] + [1.0] * 19
+    for duracao in duracoes:
+        profiler.record(db, "SELECT * FROM produtos WHERE id = 1", (), "teste", duracao, 1)
+
+    (item,) = profiler.stats()
+    assert item["chamadas"] == 20
+    assert item["linhas"] == 20
+    assert item["total_ms"] == pytest.approx(sum(duracoes))
+    assert item["max_ms"] == 100.0
+    # Percentis pelas amostras recentes
+    assert item["p50_ms"] == 1.0
+
+
+def test_stats_sorted_by_total_time(db, profiler):
+    for _ in range(10):
+        profiler.record(db, "SELECT * FROM tags", (), "a", 1.0, 1)
+    profiler.record(db, "SELECT * FROM produtos", (), "b", 5.0, 1)
+
+    stats = profiler.stats()
+    assert [item["sql"] for item in stats] == ["SELECT * FROM tags", "SELECT * FROM produtos"]
+    assert [item["total_ms"] for item in stats] == [10.0, 5.0]
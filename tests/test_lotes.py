@@ -0,0 +1,71 @@
+"""
+Lotes de estoque com baixa FEFO (LoteRepository e StockService).
+"""
+from datetime import date, timedelta
+
+from database.connection import get_connection
+from repositories.lote_repository import LoteRepository
+from services.product_service import ProductService
+from services.stock_service import StockService
+
+
+def add_product(nome):
+    return ProductService().create_product(nome, 0, 1, 2, None)
+
+
+def lotes(produto_id):
+    # (validade, saldo) dos lotes com saldo, na ordem de consumo
+    return [(l["data_validade"], l["quantidade"]) for l in LoteRepository().list_by_product(produto_id)]
+
+
+def receber(produto_id, *entradas):
+    stock = StockService()
+    for quantidade, validade in entradas:
+        stock.entrada_produto(produto_id, quantidade, data_validade=validade)
+
+
+def test_exits_consume_first_expiring_lot_first(db):
+    arroz = add_product("Arroz")
+    receber(arroz, (5, "2030-03-01"), (4, None), (5, "2030-01-01"), (3, "2030-03-01"))
+    stock = StockService()
+
+    stock.saida_produto(arroz, 7)
+    # Janeiro inteiro, depois o primeiro lote de março; sem validade por último
+    assert lotes(arroz) == [("2030-03-01", 3), ("2030-03-01", 3), (None, 4)]
+
+    stock.saida_lote([(arroz, 5, "")])
+    assert lotes(arroz) == [("2030-03-01", 1), (None, 4)]
+
+
+def test_reversal_returns_quantity_to_the_original_lots(db):
+    arroz = add_product("Arroz")
+    receber(arroz, (2, "2030-01-01"), (5, "2030-02-01"))
+    stock = StockService()
+
+    stock.saida_produto(arroz, 4, fiado=True, cliente="Ana")
+    fiado_id = get_connection().execute("SELECT id FROM fiados").fetchone()[0]
+    assert lotes(arroz) == [("2030-02-01", 3)]
+
+    stock.remove_fiado(fiado_id)
+
+    # Nenhum lote novo: o saldo volta para os lotes de onde saiu
+    assert lotes(arroz) == [("2030-01-01", 2), ("2030-02-01", 5)]
+    assert get_connection().execute("SELECT COUNT(*) FROM lotes").fetchone()[0] == 2
+    assert get_connection().execute("SELECT COUNT(*) FROM lote_consumos").fetchone()[0] == 0
+
+
+def test_expiring_lots_of_active_products(db):
+    arroz = add_product("Arroz")
+    feijao = add_product("Feijão")
+    hoje = date.today()
+    receber(arroz, (1, (hoje - timedelta(days=1)).isoformat()), (1, (hoje + timedelta(days=30)).isoformat()))
+    receber(feijao, (1, (hoje + timedelta(days=3)).isoformat()), (1, None))
+
+    vencendo = ProductService().get_expiring_lots(7)
+    assert [(l["nome"], l["data_validade"]) for l in vencendo] == [
+        ("Arroz", (hoje - timedelta(days=1)).isoformat()),
+        ("Feijão", (hoje + timedelta(days=3)).isoformat()),
+    ]
+
+    ProductService().product_repo.delete(feijao)
+    assert [l["nome"] for l in ProductService().get_expiring_lots(7)] == ["Arroz"]
@@ -0,0 +1,71 @@
+"""
+Reajuste de preços em lote (PriceService).
+"""
+import pytest
+
+from repositories.product_repository import ProductRepository
+from services.price_service import PriceService
+from services.product_service import ProductService
+from services.tag_service import TagService
+
+
+def add_product(nome, valor_compra, valor_venda, tag_ids=()):
+    return ProductService().create_product(nome, 1, valor_compra, valor_venda, None, list(tag_ids))
+
+
+def preco(produto_id):
+    return ProductRepository().get_by_id(produto_id)["valor_venda"]
+
+
+def test_apply_and_undo_by_tag(db):
+    TagService().create_tag("Bebidas")
+    bebidas = TagService().list_tags()[0]["id"]
+    suco = add_product("Suco", 2, 4, [bebidas])
+    agua = add_product("Água", 1, 2, [bebidas])
+    arroz = add_product("Arroz", 3, 5)
+    service = PriceService()
+
+    assert [(p["nome"], p["valor_venda_novo"]) for p in service.preview("PERCENTUAL", 10, tag_id=bebidas)] == [
+        ("Suco", 4.4), ("Água", 2.2)
+    ]
+    reajuste = service.apply("PERCENTUAL", 10, "Bebidas +10%", tag_id=bebidas)
+
+    assert reajuste["produtos"] == 2
+    assert (preco(suco), preco(agua), preco(arroz)) == (4.4, 2.2, 5)
+    assert service.list_reajustes()[0]["produtos"] == 2
+
+    # Preço alterado depois do reajuste é mantido ao desfazer
+    ProductService().update_product(agua, "Água", 1, 1, 3, None, True, [bebidas])
+
+    assert service.undo(reajuste["reajuste_id"]) == {"revertidos": 1, "mantidos": 1}
+    assert (preco(suco), preco(agua), preco(arroz)) == (4, 3, 5)
+    with pytest.raises(ValueError, match="já foi desfeito"):
+        service.undo(reajuste["reajuste_id"])
+
+
+def test_margin_on_selected_products(db):
+    suco = add_product("Suco", 3, 4)
+    agua = add_product("Água", 1, 2)
+    add_product("Arroz", 3, 5)
+    service = PriceService()
+
+    reajuste = service.apply("MARGEM", 50, produto_ids=[suco, agua])
+
+    # Água já tinha margem de 50%: só o suco muda
+    assert reajuste["produtos"] == 1
+    assert (preco(suco), preco(agua)) == (6, 2)
+    with pytest.raises(ValueError, match="Nenhum produto"):
+        service.apply("MARGEM", 50, produto_ids=[suco, agua])
+    assert len(service.list_reajustes()) == 1
+
+
+def test_invalid_repricing_is_rejected(db):
+    service = PriceService()
+    with pytest.raises(ValueError, match="Modo"):
+        service.apply("DOBRO", 2, termo="a")
+    with pytest.raises(ValueError, match="Escolha"):
+        service.apply("PERCENTUAL", 10)
+    with pytest.raises(ValueError, match="menor que 100%"):
+        service.apply("PERCENTUAL", -100, termo="a")
+    with pytest.raises(ValueError, match="não encontrado"):
+        service.undo(999)
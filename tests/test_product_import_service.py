@@ -0,0 +1,58 @@
+"""
+Importação de produtos em lote (ProductImportService).
+"""
+import pytest
+
+from database.connection import get_connection
+from services.product_import_service import ProductImportService
+
+
+def write_csv(path, *linhas):
+    path.write_text("\n".join(("nome;quantidade;valor_compra;valor_venda;tags",) + linhas), encoding="utf-8")
+    return path
+
+
+def test_non_finite_numbers_are_row_errors(db, tmp_path):
+    arquivo = write_csv(
+        tmp_path / "produtos.csv",
+        "Arroz;1e400;1;2;",
+        "Feijão;inf;1;2;",
+        "Milho;nan;1;2;",
+        "Trigo;1;nan;2;",
+        "Aveia;1;1;-inf;",
+        "Soja;1;1;1e400;",
+        "Café;3;1;2;",
+    )
+
+    resultado = ProductImportService().import_file(arquivo)
+
+    assert resultado["importados"] == 1
+    assert [linha for linha, _ in resultado["erros"]] == [2, 3, 4, 5, 6, 7]
+    assert all(erro.startswith("Valor inválido em") for _, erro in resultado["erros"])
+    assert [r[0] for r in get_connection().execute("SELECT nome FROM produtos")] == ["Café"]
+
+
+def parsed(service, nome, tags):
+    return service._parse_row({"nome": nome, "quantidade": 1, "valor_compra": 1, "valor_venda": 2, "tags": tags})
+
+
+def test_failed_chunk_does_not_keep_its_tags_cached(db, monkeypatch):
+    service = ProductImportService()
+
+    def falha(linhas):
+        raise RuntimeError("falha no meio do bloco")
+
+    with monkeypatch.context() as m:
+        m.setattr(service.lote_repo, "create_many", falha)
+        with pytest.raises(RuntimeError):
+            service._gravar_bloco([parsed(service, "Arroz", "Grãos")])
+
+    # O bloco seguinte usa a tag criada (e desfeita) no bloco que falhou
+    service._gravar_bloco([parsed(service, "Feijão", "grãos")])
+
+    assert [tuple(r) for r in get_connection().execute("""
+        SELECT p.nome, t.nome
+        FROM produto_tag pt
+        JOIN produtos p ON p.id = pt.produto_id
+        JOIN tags t ON t.id = pt.tag_id
+    """)] == [("Feijão", "grãos")]
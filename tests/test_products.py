@@ -0,0 +1,73 @@
+"""
+Cadastro de produtos (ProductService / ProductRepository).
+"""
+import pytest
+
+from controllers.product_controller import ProductController
+from database.connection import get_connection
+from repositories.cliente_repository import ClienteRepository
+from repositories.product_repository import ProductRepository
+from services.exceptions import VersionConflictError
+from services.product_service import ProductService
+from services.stock_service import StockService
+
+
+def add_product(nome, quantidade=10, valor_venda=2):
+    return ProductService().create_product(nome, quantidade, 1, valor_venda, None)
+
+
+def count(tabela, produto_id):
+    return get_connection().execute(
+        f"SELECT COUNT(*) FROM {tabela} WHERE produto_id = ?", (produto_id,)
+    ).fetchone()[0]
+
+
+def test_delete_keeps_product_history(db):
+    arroz = add_product("Arroz")
+    stock = StockService()
+    stock.saida_produto(arroz, 2)
+    stock.saida_produto(arroz, 1, fiado=True, cliente="Ana")
+    stock.registrar_venda([(arroz, 1)])
+    tabelas = ("movimentacoes", "fiados", "venda_itens", "lotes", "estoque_ledger", "vendas_diarias")
+    antes = {tabela: count(tabela, arroz) for tabela in tabelas}
+
+    ProductRepository().delete(arroz)
+
+    assert {tabela: count(tabela, arroz) for tabela in tabelas} == antes
+    assert ProductRepository().get_by_id(arroz)["ativo"] == 0
+    assert [p["id"] for p in ProductService().list_products()] == []
+    assert ClienteRepository().find_by_name("Ana")["saldo_aberto"] == 2
+
+
+def update(produto_id, quantidade, versao, valor_venda=2):
+    return ProductService().update_product(produto_id, "Arroz", quantidade, 1, valor_venda, None, True, [], 5, versao)
+
+
+def test_update_with_stale_version_is_refused(db):
+    arroz = add_product("Arroz")
+    lida = ProductService().get_product(arroz)["versao"]
+
+    # Outro terminal vende o produto depois que o formulário foi aberto
+    StockService().saida_produto(arroz, 3)
+
+    with pytest.raises(VersionConflictError):
+        update(arroz, 10, lida, valor_venda=9)
+    produto = ProductService().get_product(arroz)
+    assert (produto["quantidade"], produto["valor_venda"]) == (7, 2)
+    assert count("estoque_ledger", arroz) == 2
+
+    resultado = ProductController().update_product(arroz, "Arroz", 10, 1, 9, None, True, [], 5, lida)
+    assert resultado["success"] is False and resultado["conflito"] is True
+
+
+def test_update_with_current_version_returns_the_next_one(db):
+    arroz = add_product("Arroz")
+    lida = ProductService().get_product(arroz)["versao"]
+
+    nova = update(arroz, 12, lida, valor_venda=3)
+
+    produto = ProductService().get_product(arroz)
+    assert nova == produto["versao"] == lida + 1
+    assert (produto["quantidade"], produto["valor_venda"]) == (12, 3)
+    # Sem versão (chamadas antigas) não há verificação
+    assert update(arroz, 12, None) == nova + 1
@@ -0,0 +1,92 @@
+"""
+Planos das consultas dos caminhos quentes: cada uma deve usar o índice
+criado para ela (schema.sql / migrações) em vez de percorrer a tabela.
+"""
+import pytest
+
+from repositories.analytics_repository import AnalyticsRepository
+from repositories.caixa_movimentacao_repository import CaixaMovimentacaoRepository
+from repositories.fiado_repository import FiadoRepository
+from repositories.product_repository import ProductRepository
+from repositories.stock_repository import StockRepository
+
+
+def query_plans(conn, call):
+    """Executa `call` e devolve o EXPLAIN QUERY PLAN de cada SELECT que ela fez."""
+    statements = []
+    # O trace recebe o SQL já com os parâmetros expandidos
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+
+    plans = []
+    for sql in statements:
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            plans.append([row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)])
+    return plans
+
+
+# (consulta, tabela/alias no plano, índice esperado)
+CASES = [
+    (
+        lambda: StockRepository().list_by_period("2026-01-01", "2026-01-31"),
+        "movimentacoes", "idx_movimentacoes_data",
+    ),
+    (lambda: FiadoRepository().list_open(), "f", "idx_fiados_pago_data"),
+    (
+        lambda: CaixaMovimentacaoRepository().sum_by_date("2026-01-01"),
+        "caixa_movimentacoes", "idx_caixa_movimentacoes_data_tipo",
+    ),
+    (
+        lambda: CaixaMovimentacaoRepository().sum_by_date("2026-01-01", "ENTRADA"),
+        "caixa_movimentacoes", "idx_caixa_movimentacoes_data_tipo",
+    ),
+    (lambda: ProductRepository().list_all(), "p", "idx_produtos_ativo_nome"),
+    (
+        lambda: AnalyticsRepository().get_sales_by_period("2026-01-01", "2026-01-31"),
+        "vendas_diarias", "idx_vendas_diarias_dia_vendas",
+    ),
+    (
+        lambda: AnalyticsRepository().get_vendas_summary("2026-01-01", "2026-01-31"),
+        "vendas", "idx_vendas_data",
+    ),
+    (lambda: AnalyticsRepository().get_product_turnover(30), "m", "idx_movimentacoes_data"),
+    (
+        lambda: AnalyticsRepository().get_monthly_summary(12),
+        "vendas_diarias", "idx_vendas_diarias_dia_vendas",
+    ),
+    (
+        lambda: AnalyticsRepository().get_cash_flow_summary("2026-01-01", "2026-01-31"),
+        "v", "idx_vendas_diarias_dia_vendas",
+    ),
+    (
+        lambda: AnalyticsRepository().get_prejuizos_detalhados("2026-01-01", "2026-01-31"),
+        "pr", "idx_prejuizos_data",
+    ),
+    (
+        lambda: AnalyticsRepository().get_fiados_detalhados("2026-01-01", "2026-01-31"),
+        "f", "idx_fiados_data",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "call, table, index",
+    CASES,
+    ids=[f"{table}-{index}" for _, table, index in CASES],
+)
+def test_hot_query_uses_index(db, call, table, index):
+    plans = query_plans(db, call)
+    assert plans, "a consulta não foi executada"
+
+    details = [detail for plan in plans for detail in plan]
+    assert any(
+        detail.startswith(f"SEARCH {table} USING ") and f"INDEX {index} " in detail + " "
+        for detail in details
+    ), details
+    assert not any(
+        detail == f"SCAN {table}" or detail.startswith(f"SCAN {table} ")
+        for detail in details
+    ), details
@@ -0,0 +1,86 @@
+"""
+Reservas de estoque para pedidos a retirar (ReservaService).
+"""
+import pytest
+
+from database.connection import get_connection
+from repositories.product_repository import ProductRepository
+from services.product_service import ProductService
+from services.reserva_service import ReservaService
+from services.stock_service import StockService
+
+
+def add_product(nome, quantidade=10):
+    return ProductService().create_product(nome, quantidade, 1, 2, None)
+
+
+def estoque(produto_id):
+    produto = ProductRepository().get_by_id(produto_id)
+    return produto["quantidade"], produto["quantidade_reservada"]
+
+
+def status(reserva_id):
+    return get_connection().execute("SELECT status FROM reservas WHERE id = ?", (reserva_id,)).fetchone()[0]
+
+
+def vencer(*reserva_ids):
+    conn = get_connection()
+    conn.executemany(
+        "UPDATE reservas SET expira_em = DATETIME('now', '-1 hour') WHERE id = ?",
+        [(reserva_id,) for reserva_id in reserva_ids]
+    )
+    conn.commit()
+
+
+def test_reserved_stock_cannot_be_sold_or_reserved_again(db):
+    arroz = add_product("Arroz", 10)
+    service = ReservaService()
+
+    reserva = service.reservar(arroz, 7, "Ana")
+    assert estoque(arroz) == (10, 7)
+
+    with pytest.raises(ValueError, match="Disponível: 3"):
+        service.reservar(arroz, 4, "Bruno")
+    with pytest.raises(ValueError, match="insuficiente"):
+        StockService().saida_produto(arroz, 4)
+    StockService().saida_produto(arroz, 3)
+    assert estoque(arroz) == (7, 7)
+
+    service.liberar(reserva)
+    assert estoque(arroz) == (7, 0)
+    assert status(reserva) == "LIBERADA"
+    with pytest.raises(ValueError, match="não está mais ativa"):
+        service.liberar(reserva)
+
+
+def test_convert_reservation_into_sale(db):
+    arroz = add_product("Arroz", 5)
+    service = ReservaService()
+    reserva = service.reservar(arroz, 5, "Ana")
+
+    venda = service.converter_em_venda(reserva)
+
+    assert venda["total"] == 10
+    assert estoque(arroz) == (0, 0)
+    assert status(reserva) == "CONVERTIDA"
+    venda_id = get_connection().execute("SELECT venda_id FROM reservas WHERE id = ?", (reserva,)).fetchone()[0]
+    assert venda_id == venda["venda_id"]
+    with pytest.raises(ValueError, match="não está mais ativa"):
+        service.converter_em_venda(reserva)
+
+
+def test_sweep_expires_only_overdue_reservations_in_batches(db):
+    arroz = add_product("Arroz", 10)
+    feijao = add_product("Feijão", 10)
+    service = ReservaService()
+    vencidas = [service.reservar(produto, 2, "Ana") for produto in (arroz, arroz, arroz, feijao, feijao)]
+    ativa = service.reservar(feijao, 1, "Bruno")
+    vencer(*vencidas)
+
+    assert service.expirar_vencidas(limite=2) == 5
+
+    assert [status(r) for r in vencidas] == ["EXPIRADA"] * 5
+    assert status(ativa) == "ATIVA"
+    assert (estoque(arroz), estoque(feijao)) == ((10, 0), (10, 1))
+    assert [r["id"] for r in service.list_reservas_ativas()] == [ativa]
+    assert service.expirar_vencidas() == 0
@@ -0,0 +1,68 @@
+"""
+Snapshots do razão de estoque (StockLedgerService.snapshot_if_due).
+"""
+import time
+
+import pytest
+
+import config
+from services.stock_ledger_service import StockLedgerService
+
+
+@pytest.fixture
+def ledger(db, monkeypatch):
+    # Fuso bem longe de UTC: as datas do razão são CURRENT_TIMESTAMP (UTC),
+    # e a idade do snapshot não pode depender do fuso da máquina
+    monkeypatch.setenv("TZ", "Etc/GMT-14")
+    time.tzset()
+    monkeypatch.setattr(config, "STOCK_SNAPSHOT_INTERVAL_DAYS", 7)
+
+    db.execute("INSERT INTO produtos (nome, valor_compra, valor_venda) VALUES ('Arroz', 1, 2)")
+    db.execute(
+        "INSERT INTO estoque_ledger (produto_id, delta, origem, data) "
+        "VALUES (1, 10, 'ENTRADA', datetime('now', '-30 days'))"
+    )
+    db.commit()
+    yield db
+    monkeypatch.undo()
+    time.tzset()
+
+
+def add_snapshot_and_pending_line(db, idade):
+    # Snapshot com a idade informada e uma linha do razão depois dele
+    db.execute(
+        "INSERT INTO estoque_snapshots (produto_id, ledger_id, data, quantidade) "
+        "VALUES (1, 1, datetime('now', ?), 10)",
+        (idade,),
+    )
+    db.execute("INSERT INTO estoque_ledger (produto_id, delta, origem) VALUES (1, -1, 'SAIDA')")
+    db.commit()
+
+
+def snapshots(db):
+    return db.execute("SELECT COUNT(*) FROM estoque_snapshots").fetchone()[0]
+
+
+def test_first_snapshot_is_always_due(ledger):
+    assert StockLedgerService().snapshot_if_due() is True
+    assert snapshots(ledger) == 1
+
+
+def test_recent_snapshot_is_not_due(ledger):
+    add_snapshot_and_pending_line(ledger, "-167 hours")
+
+    assert StockLedgerService().snapshot_if_due() is False
+    assert snapshots(ledger) == 1
+
+
+def test_old_snapshot_is_due(ledger):
+    add_snapshot_and_pending_line(ledger, "-169 hours")
+
+    assert StockLedgerService().snapshot_if_due() is True
+    assert snapshots(ledger) == 2
+
+
+def test_nothing_pending_is_not_due(ledger):
+    StockLedgerService().create_snapshot()
+
+    assert StockLedgerService().snapshot_if_due() is False
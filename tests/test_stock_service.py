@@ -0,0 +1,199 @@
+"""
+Movimentação de estoque (StockService e ProductRepository.adjust_quantity).
+"""
+import pytest
+
+from database.connection import get_connection
+from repositories.product_repository import ProductRepository
+from services.product_service import ProductService
+from services.stock_service import StockService
+
+
+def add_product(nome, quantidade=10, valor_venda=2):
+    return ProductService().create_product(nome, quantidade, 1, valor_venda, None)
+
+
+def quantidade(produto_id):
+    return ProductRepository().get_by_id(produto_id)["quantidade"]
+
+
+def reservar(produto_id, quantidade):
+    conn = get_connection()
+    conn.execute("UPDATE produtos SET quantidade_reservada = ? WHERE id = ?", (quantidade, produto_id))
+    conn.commit()
+
+
+def count(tabela):
+    return get_connection().execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+
+
+def fiado(produto_id, quantidade, cliente):
+    StockService().saida_produto(produto_id, quantidade, fiado=True, cliente=cliente)
+    return get_connection().execute("SELECT MAX(id) FROM fiados").fetchone()[0]
+
+
+def test_adjust_quantity_rejects_insufficient_stock(db):
+    arroz = add_product("Arroz", 5)
+    repo = ProductRepository()
+
+    assert repo.adjust_quantity(arroz, -6) is None
+    assert quantidade(arroz) == 5
+
+    linha = repo.adjust_quantity(arroz, -5)
+    assert linha["quantidade"] == 0
+    # Entradas e estornos não verificam o saldo
+    assert repo.adjust_quantity(arroz, -1, min_remaining=None)["quantidade"] == -1
+    assert repo.adjust_quantity(999, 1, min_remaining=None) is None
+
+
+def test_adjust_quantity_keeps_reserved_stock(db):
+    arroz = add_product("Arroz", 5)
+    reservar(arroz, 3)
+    repo = ProductRepository()
+
+    assert repo.adjust_quantity(arroz, -3) is None
+    assert repo.adjust_quantity(arroz, -2)["quantidade"] == 3
+    assert repo.adjust_quantities([(arroz, -1)]) == 0
+    assert quantidade(arroz) == 3
+
+
+def test_saida_explains_why_stock_was_not_changed(db):
+    arroz = add_product("Arroz", 5)
+    reservar(arroz, 4)
+    stock = StockService()
+
+    with pytest.raises(ValueError, match="insuficiente"):
+        stock.saida_produto(arroz, 2)
+    with pytest.raises(ValueError, match="não encontrado"):
+        stock.saida_produto(999, 1)
+    assert quantidade(arroz) == 5
+    assert get_connection().execute("SELECT COUNT(*) FROM movimentacoes").fetchone()[0] == 0
+
+
+def test_batch_reports_every_invalid_row_and_writes_nothing(db):
+    arroz = add_product("Arroz", 5)
+    feijao = add_product("Feijão", 2)
+    stock = StockService()
+
+    with pytest.raises(ValueError) as erro:
+        stock.saida_lote([
+            (arroz, 3, ""),
+            (feijao, 0, ""),
+            (999, 1, ""),
+            (arroz, 3, ""),  # soma com a linha 1 passa do disponível
+            (feijao, 2, ""),
+        ])
+
+    assert str(erro.value).splitlines() == [
+        "Linha 2: a quantidade deve ser maior que zero.",
+        "Linha 3: produto 999 não encontrado.",
+        "Linha 4: quantidade insuficiente em estoque (disponível: 2).",
+    ]
+    assert (quantidade(arroz), quantidade(feijao)) == (5, 2)
+    assert get_connection().execute("SELECT COUNT(*) FROM movimentacoes").fetchone()[0] == 0
+
+
+def test_batch_entry_and_exit(db):
+    arroz = add_product("Arroz", 5)
+    feijao = add_product("Feijão", 2)
+    stock = StockService()
+
+    assert stock.entrada_lote([(arroz, 10, "Fornecedor"), (feijao, 4, "Fornecedor", "2030-01-31")]) == 2
+    assert stock.saida_lote([(arroz, 15, ""), (feijao, 1, "")]) == 2
+
+    assert (quantidade(arroz), quantidade(feijao)) == (0, 5)
+    movimentos = get_connection().execute(
+        "SELECT produto_id, tipo, quantidade FROM movimentacoes ORDER BY id"
+    ).fetchall()
+    assert [tuple(m) for m in movimentos] == [
+        (arroz, "ENTRADA", 10), (feijao, "ENTRADA", 4), (arroz, "SAIDA", 15), (feijao, "SAIDA", 1)
+    ]
+
+
+def test_cart_is_validated_before_anything_is_written(db):
+    arroz = add_product("Arroz", 5)
+    stock = StockService()
+
+    with pytest.raises(ValueError, match="Nenhum item"):
+        stock.registrar_venda([])
+    with pytest.raises(ValueError, match="cliente é obrigatório"):
+        stock.registrar_venda([(arroz, 1)], fiado=True, cliente="  ")
+    with pytest.raises(ValueError) as erro:
+        stock.registrar_venda([(arroz, 4), (arroz, 2), (999, 1)])
+    assert str(erro.value).splitlines() == [
+        "Linha 2: quantidade insuficiente em estoque (disponível: 1).",
+        "Linha 3: produto 999 não encontrado.",
+    ]
+
+    assert quantidade(arroz) == 5
+    assert [count(t) for t in ("vendas", "venda_itens", "movimentacoes", "fiados")] == [0, 0, 0, 0]
+
+
+def test_cart_sale_records_header_and_items(db):
+    arroz = add_product("Arroz", 5, valor_venda=2.5)
+    feijao = add_product("Feijão", 5, valor_venda=7)
+    stock = StockService()
+
+    venda = stock.registrar_venda([(arroz, 2), (feijao, 1)])
+    assert venda["total"] == 12.0
+
+    itens = get_connection().execute("""
+        SELECT vi.produto_id, vi.quantidade, vi.valor_total, m.tipo, vi.fiado_id
+        FROM venda_itens vi JOIN movimentacoes m ON m.id = vi.movimentacao_id
+        WHERE vi.venda_id = ? ORDER BY vi.id
+    """, (venda["venda_id"],)).fetchall()
+    assert [tuple(i) for i in itens] == [(arroz, 2, 5.0, "SAIDA", None), (feijao, 1, 7.0, "SAIDA", None)]
+    assert (quantidade(arroz), quantidade(feijao)) == (3, 4)
+
+    fiado = stock.registrar_venda([(arroz, 1), (feijao, 1)], fiado=True, cliente="Ana")
+    assert count("fiados") == 2
+    assert get_connection().execute(
+        "SELECT COUNT(*) FROM venda_itens WHERE venda_id = ? AND fiado_id IS NOT NULL AND movimentacao_id IS NULL",
+        (fiado["venda_id"],)
+    ).fetchone()[0] == 2
+    assert get_connection().execute(
+        "SELECT saldo_aberto FROM clientes WHERE chave = 'ana'"
+    ).fetchone()[0] == fiado["total"] == 9.5
+
+
+def test_pay_customer_tab(db):
+    arroz = add_product("Arroz", 10, valor_venda=2)
+    feijao = add_product("Feijão", 10, valor_venda=5)
+    primeiro = fiado(arroz, 2, "José")
+    segundo = fiado(feijao, 1, "jose ")
+    outro = fiado(arroz, 1, "Maria")
+    # O pagamento usa o preço da data do fiado, não o atual
+    ProductService().update_product(arroz, "Arroz", 7, 1, 3, None, True, [])
+    stock = StockService()
+
+    assert stock.pagar_fiados_cliente("JOSÉ") == {"pagos": 2, "total": 9.0}
+
+    pagos = get_connection().execute("""
+        SELECT f.id, m.tipo, m.quantidade, m.valor_unitario
+        FROM fiados f JOIN movimentacoes m ON m.id = f.movimentacao_id
+        WHERE f.pago = 1 ORDER BY f.id
+    """).fetchall()
+    assert [tuple(p) for p in pagos] == [(primeiro, "SAIDA", 2, 2.0), (segundo, "SAIDA", 1, 5.0)]
+    assert get_connection().execute("SELECT pago FROM fiados WHERE id = ?", (outro,)).fetchone()[0] == 0
+    with pytest.raises(ValueError, match="Nenhum fiado em aberto"):
+        stock.pagar_fiados_cliente("José")
+
+
+def test_pay_selected_fiados_of_customer(db):
+    arroz = add_product("Arroz", 10, valor_venda=2)
+    primeiro = fiado(arroz, 1, "Ana")
+    segundo = fiado(arroz, 2, "Ana")
+    outro = fiado(arroz, 1, "Maria")
+    stock = StockService()
+
+    with pytest.raises(ValueError, match="não é deste cliente"):
+        stock.pagar_fiados_cliente("Ana", [segundo, outro])
+    with pytest.raises(ValueError, match="Cliente não encontrado"):
+        stock.pagar_fiados_cliente("Pedro")
+    with pytest.raises(ValueError, match="Nenhum fiado selecionado"):
+        stock.pagar_fiados_cliente("Ana", [])
+    assert count("movimentacoes") == 0
+
+    assert stock.pagar_fiados_cliente("Ana", [segundo]) == {"pagos": 1, "total": 4.0}
+    abertos = get_connection().execute("SELECT id FROM fiados WHERE pago = 0 ORDER BY id").fetchall()
+    assert [f[0] for f in abertos] == [primeiro, outro]
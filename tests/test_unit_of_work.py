@@ -0,0 +1,68 @@
+"""
+Transações com várias chamadas de repositório (database.connection.unit_of_work).
+"""
+import sqlite3
+
+import pytest
+
+from database import connection
+from database.connection import in_unit_of_work, unit_of_work
+from repositories.base_repository import BaseRepository
+
+INSERT_TAG = "INSERT INTO tags (nome) VALUES (?)"
+
+
+def tags(repo):
+    return [r[0] for r in repo.fetchall("SELECT nome FROM tags ORDER BY id")]
+
+
+def test_commits_once_at_the_end(db):
+    repo = BaseRepository()
+    outra = sqlite3.connect(connection.DB_PATH)
+    try:
+        with unit_of_work():
+            repo.execute(INSERT_TAG, ("a",))
+            repo.execute_many(INSERT_TAG, [("b",), ("c",)])
+            # Nada foi confirmado ainda: outra conexão não vê as escritas
+            assert outra.execute("SELECT COUNT(*) FROM tags").fetchone()[0] == 0
+        assert outra.execute("SELECT COUNT(*) FROM tags").fetchone()[0] == 3
+    finally:
+        outra.close()
+    assert not in_unit_of_work()
+
+
+def test_exception_rolls_back_every_write(db):
+    repo = BaseRepository()
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            repo.execute(INSERT_TAG, ("a",))
+            repo.insert_many(INSERT_TAG, [("b",)])
+            raise ValueError("falha no meio da operação")
+
+    assert tags(repo) == []
+    assert not in_unit_of_work()
+
+
+def test_failed_nested_block_undoes_only_its_part(db):
+    repo = BaseRepository()
+    with unit_of_work():
+        repo.execute(INSERT_TAG, ("externa",))
+        with pytest.raises(ValueError):
+            with unit_of_work():
+                repo.execute(INSERT_TAG, ("interna",))
+                raise ValueError("falha interna")
+        assert in_unit_of_work()
+        repo.execute(INSERT_TAG, ("depois",))
+
+    assert tags(repo) == ["externa", "depois"]
+
+
+def test_outer_failure_undoes_committed_nested_block(db):
+    repo = BaseRepository()
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            with unit_of_work():
+                repo.execute(INSERT_TAG, ("interna",))
+            raise ValueError("falha externa")
+
+    assert tags(repo) == []
@@ -1,9 +1,8 @@
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
-    QTableWidgetItem, QPushButton, QMessageBox
+    QTableWidgetItem, QPushButton, QMessageBox, QComboBox, QAbstractItemView
 )
 from controllers.stock_controller import StockController
-from controllers.product_controller import ProductController
 from utils.dates import format_date
 
 
@@ -15,34 +14,69 @@ class FiadoManagerDialog(QDialog):
         self.resize(850, 400)
 
         self.controller = StockController()
-        self.product_controller = ProductController()
+        self._clientes = {}
+        self._fiado_clientes = {}
 
         self._build_ui()
+        self._load_clientes()
         self._load_fiados()
 
     def _build_ui(self):
         layout = QVBoxLayout(self)
 
-        label = QLabel("Fiados em aberto")
-        layout.addWidget(label)
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(QLabel("Fiados em aberto"))
+        top_layout.addStretch()
+        top_layout.addWidget(QLabel("Cliente:"))
+        self.cliente_combo = QComboBox()
+        self.cliente_combo.setMinimumWidth(250)
+        self.cliente_combo.currentIndexChanged.connect(self._load_fiados)
+        top_layout.addWidget(self.cliente_combo)
+        layout.addLayout(top_layout)
 
         self.table = QTableWidget(0, 7)
         self.table.setHorizontalHeaderLabels(["ID", "Cliente", "Produto", "Qtd", "Valor", "Observação", "Data"])                
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         layout.addWidget(self.table)
 
         btn_layout = QHBoxLayout()
-        self.btn_pay = QPushButton("Marcar como Pago")
+        self.btn_pay = QPushButton("Pagar Selecionados")
         self.btn_pay.clicked.connect(self._pay_selected)
+        self.btn_pay_all = QPushButton("Pagar Tudo do Cliente")
+        self.btn_pay_all.clicked.connect(self._pay_cliente)
         self.btn_delete = QPushButton("Excluir Fiado")
         self.btn_delete.clicked.connect(self._delete_selected)
         self.btn_close = QPushButton("Fechar")
         self.btn_close.clicked.connect(self.close)
 
         btn_layout.addWidget(self.btn_pay)
+        btn_layout.addWidget(self.btn_pay_all)
         btn_layout.addWidget(self.btn_delete)
         btn_layout.addWidget(self.btn_close)
         layout.addLayout(btn_layout)
 
+    def _load_clientes(self):
+        """Preenche o filtro de clientes com o saldo em aberto e a idade do fiado mais antigo"""
+        resp = self.controller.list_fiado_clientes()
+        atual = self.cliente_combo.currentData()
+        clientes = resp.get("clientes", [])
+        self._clientes = {c["id"]: c["nome"] for c in clientes}
+
+        self.cliente_combo.blockSignals(True)
+        self.cliente_combo.clear()
+        self.cliente_combo.addItem("Todos os clientes", None)
+        for c in clientes:
+            self.cliente_combo.addItem(
+                f"{c['nome']} - R$ {c['saldo_aberto']:,.2f} "
+                f"({c['fiados_abertos']} fiados, há {c['dias_em_aberto']} dias)",
+                c["id"]
+            )
+        index = self.cliente_combo.findData(atual)
+        self.cliente_combo.setCurrentIndex(max(index, 0))
+        self.cliente_combo.blockSignals(False)
+
     def _load_fiados(self):
         self.table.setRowCount(0)
         resp = self.controller.list_open_fiados()
@@ -51,41 +85,89 @@ class FiadoManagerDialog(QDialog):
             return
 
         fiados = resp.get("fiados", [])
+        cliente_id = self.cliente_combo.currentData()
+        self._fiado_clientes = {}
 
-        # fiado rows: (id, produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, data_fiado)
-        products = {p['id']: p for p in self.product_controller.list_products()}
-
+        # fiado rows: (id, produto_id, quantidade, valor_unitario, valor_total, cliente, observacao, data_fiado,
+        #              produto_nome, cliente_id)
         for f in fiados:
+            if cliente_id is not None and f[9] != cliente_id:
+                continue
+            self._fiado_clientes[f[0]] = f[9]
+
             row = self.table.rowCount()
             self.table.insertRow(row)
-            produto = products.get(f[1], {"nome": "-"})
 
             self.table.setItem(row, 0, QTableWidgetItem(str(f[0])))
             self.table.setItem(row, 1, QTableWidgetItem(str(f[5])))
-            self.table.setItem(row, 2, QTableWidgetItem(str(produto.get('nome', '-'))))
+            self.table.setItem(row, 2, QTableWidgetItem(str(f[8] or '-')))
             self.table.setItem(row, 3, QTableWidgetItem(str(f[2])))
             self.table.setItem(row, 4, QTableWidgetItem(f"R$ {f[4]:,.2f}"))
             self.table.setItem(row, 5, QTableWidgetItem(str(f[6] if f[6] else "-")))
             self.table.setItem(row, 6, QTableWidgetItem(format_date(str(f[7]))))
 
+    def _reload(self):
+        self._load_clientes()
+        self._load_fiados()
+
     def _pay_selected(self):
-        row = self.table.currentRow()
-        if row < 0:
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        if not rows:
             QMessageBox.information(self, "Info", "Selecione um fiado para marcar como pago.")
             return
 
-        fiado_id = int(self.table.item(row, 0).text())
+        if len(rows) == 1:
+            fiado_id = int(self.table.item(rows[0], 0).text())
+
+            confirm = QMessageBox.question(self, "Confirmar", "Marcar fiado como pago? Esta ação irá contabilizar a venda no sistema.")
+            if confirm != QMessageBox.StandardButton.Yes:
+                return
+
+            resp = self.controller.pay_fiado(fiado_id)
+            if resp.get("success"):
+                QMessageBox.information(self, "Sucesso", "Fiado marcado como pago e contabilizado.")
+                self._reload()
+            else:
+                QMessageBox.warning(self, "Erro", resp.get("error", "Erro ao pagar fiado"))
+            return
+
+        # Vários fiados: pagos juntos, em uma única transação, se forem do mesmo cliente
+        ids = [int(self.table.item(row, 0).text()) for row in rows]
+        clientes = {self._fiado_clientes.get(fiado_id) for fiado_id in ids}
+        if len(clientes) > 1:
+            QMessageBox.information(self, "Info", "Selecione fiados de um único cliente para pagar juntos.")
+            return
+
+        cliente_id = clientes.pop()
+        self._pagar_cliente(self._clientes.get(cliente_id, self.table.item(rows[0], 1).text()), ids)
+
+    def _pay_cliente(self):
+        cliente_id = self.cliente_combo.currentData()
+        if cliente_id is None:
+            QMessageBox.information(self, "Info", "Escolha um cliente no filtro para pagar todos os fiados dele.")
+            return
+        self._pagar_cliente(self._clientes[cliente_id], None)
 
-        confirm = QMessageBox.question(self, "Confirmar", "Marcar fiado como pago? Esta ação irá contabilizar a venda no sistema.")
+    def _pagar_cliente(self, cliente: str, ids: list[int] | None):
+        quantidade = "todos os fiados" if ids is None else f"{len(ids)} fiados"
+        confirm = QMessageBox.question(
+            self,
+            "Confirmar",
+            f"Pagar {quantidade} de {cliente}? Esta ação irá contabilizar as vendas no sistema."
+        )
         if confirm != QMessageBox.StandardButton.Yes:
             return
 
-        resp = self.controller.pay_fiado(fiado_id)
+        resp = self.controller.pagar_fiados_cliente(cliente, ids)
         if resp.get("success"):
-            QMessageBox.information(self, "Sucesso", "Fiado marcado como pago e contabilizado.")
-            self._load_fiados()
+            QMessageBox.information(
+                self,
+                "Sucesso",
+                f"{resp['pagos']} fiados pagos (R$ {resp['total']:,.2f}) e contabilizados."
+            )
+            self._reload()
         else:
-            QMessageBox.warning(self, "Erro", resp.get("error", "Erro ao pagar fiado"))
+            QMessageBox.warning(self, "Erro", resp.get("error", "Erro ao pagar fiados"))
 
     def _delete_selected(self):
         row = self.table.currentRow()
@@ -106,6 +188,6 @@ class FiadoManagerDialog(QDialog):
         resp = self.controller.delete_fiado(fiado_id)
         if resp.get("success"):
             QMessageBox.information(self, "Sucesso", "Fiado excluído e estoque ajustado.")
-            self._load_fiados()
+            self._reload()
         else:
             QMessageBox.warning(self, "Erro", resp.get("error", "Erro ao excluir fiado"))
@@ -0,0 +1,295 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QCheckBox,
+    QMessageBox, QFileDialog, QTabWidget, QWidget, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QDateEdit
+)
+from PySide6.QtCore import Qt, QDate
+from datetime import datetime
+from pathlib import Path
+
+from database.instrumentation import instrumentation, LOG_PATH
+from services.analytics_service import analytics_cache
+from services.stock_ledger_service import StockLedgerService
+from services.vendas_diarias_service import VendasDiariasService
+
+
+class MaintenanceDialog(QDialog):
+    """Diálogo de manutenção do banco de dados (desempenho das consultas)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ledger_service = StockLedgerService()
+        self.vendas_diarias_service = VendasDiariasService()
+        self.setWindowTitle("Manutenção do Banco de Dados")
+        self.setMinimumWidth(900)
+        self.setMinimumHeight(500)
+
+        self._create_ui()
+        self._load_stats()
+
+    def _create_ui(self):
+        """Cria a interface do usuário"""
+        main_layout = QVBoxLayout()
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self._create_sql_tab(), "Desempenho SQL")
+        self.tabs.addTab(self._create_ledger_tab(), "Razão de Estoque")
+        self.tabs.addTab(self._create_rollup_tab(), "Resumo de Vendas")
+
+        main_layout.addWidget(self.tabs)
+        self.setLayout(main_layout)
+
+    def _create_sql_tab(self) -> QWidget:
+        """Cria a aba com as estatísticas das consultas"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        description = QLabel(
+            "Tempo de cada consulta feita ao banco desde que a instrumentação foi ligada.\n"
+            f"Consultas acima de {instrumentation.slow_query_ms} ms têm o plano registrado em:\n"
+            f"{LOG_PATH}"
+        )
+        description.setWordWrap(True)
+        layout.addWidget(description)
+
+        self.chk_enabled = QCheckBox("Registrar tempo das consultas")
+        self.chk_enabled.setChecked(instrumentation.enabled)
+        self.chk_enabled.toggled.connect(instrumentation.enable)
+        layout.addWidget(self.chk_enabled)
+
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(7)
+        self.table.setHorizontalHeaderLabels([
+            "Consulta", "Local", "Chamadas", "Linhas", "p50 (ms)", "p95 (ms)", "Máx (ms)"
+        ])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for col in range(1, 7):
+            header.setSectionResizeMode(col, QHeaderView.ResizeToContents)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        btn_refresh = QPushButton("Atualizar")
+        btn_refresh.clicked.connect(self._load_stats)
+        btn_export = QPushButton("Exportar")
+        btn_export.clicked.connect(self._export_stats)
+        btn_clear = QPushButton("Limpar")
+        btn_clear.clicked.connect(self._clear_stats)
+        buttons.addWidget(btn_refresh)
+        buttons.addWidget(btn_export)
+        buttons.addStretch()
+        buttons.addWidget(btn_clear)
+        layout.addLayout(buttons)
+
+        widget.setLayout(layout)
+        return widget
+
+    def _load_stats(self):
+        """Preenche a tabela com as estatísticas atuais"""
+        cache = analytics_cache.stats()
+        self.cache_label.setText(
+            f"Cache de análises: {cache['acertos']} acertos, {cache['falhas']} falhas "
+            f"({cache['taxa_acerto']:.0%}), {cache['invalidacoes']} invalidações, "
+            f"{cache['entradas']} resultados guardados"
+        )
+
+        stats = instrumentation.stats()
+        self.table.setRowCount(len(stats))
+
+        for row, item in enumerate(stats):
+            sql_item = QTableWidgetItem(item["sql"])
+            sql_item.setToolTip(item["plano"] or item["sql"])
+            self.table.setItem(row, 0, sql_item)
+            self.table.setItem(row, 1, QTableWidgetItem(item["locais"]))
+
+            values = [
+                str(item["chamadas"]),
+                str(item["linhas"]),
+                f"{item['p50_ms']:.2f}",
+                f"{item['p95_ms']:.2f}",
+                f"{item['max_ms']:.2f}",
+            ]
+            for offset, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, offset + 2, cell)
+
+    def _export_stats(self):
+        """Exporta as estatísticas para um arquivo texto"""
+        default_name = f"sql_stats_{datetime.now().strftime('%d-%m-%Y_%H-%M-%S')}.txt"
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar estatísticas",
+            str(Path.home() / default_name),
+            "Texto (*.txt)"
+        )
+        if not file_path:
+            return
+
+        try:
+            instrumentation.dump(file_path)
+            QMessageBox.information(self, "Sucesso", f"Estatísticas exportadas para:\n{file_path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao exportar estatísticas:\n\n{str(e)}")
+
+    def _clear_stats(self):
+        """Descarta as estatísticas coletadas"""
+        instrumentation.reset()
+        analytics_cache.reset_stats()
+        self._load_stats()
+
+    def _create_ledger_tab(self) -> QWidget:
+        """Cria a aba de verificação e consulta do razão de estoque"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        description = QLabel(
+            "Toda alteração de estoque (entradas, vendas, fiados, prejuízos e estornos) "
+            "é registrada no razão. Use \"Verificar\" para encontrar produtos cuja "
+            "quantidade atual diverge do razão, ou consulte o estoque em uma data."
+        )
+        description.setWordWrap(True)
+        layout.addWidget(description)
+
+        controls = QHBoxLayout()
+        btn_verify = QPushButton("Verificar")
+        btn_verify.clicked.connect(self._verify_ledger)
+        btn_snapshot = QPushButton("Gerar Snapshot")
+        btn_snapshot.clicked.connect(self._create_snapshot)
+        self.ledger_date = QDateEdit(QDate.currentDate())
+        self.ledger_date.setCalendarPopup(True)
+        self.ledger_date.setDisplayFormat("dd-MM-yyyy")
+        btn_stock_at = QPushButton("Estoque na Data")
+        btn_stock_at.clicked.connect(self._load_stock_at)
+        controls.addWidget(btn_verify)
+        controls.addWidget(btn_snapshot)
+        controls.addStretch()
+        controls.addWidget(self.ledger_date)
+        controls.addWidget(btn_stock_at)
+        layout.addLayout(controls)
+
+        self.ledger_table = QTableWidget()
+        self.ledger_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.ledger_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        layout.addWidget(self.ledger_table)
+
+        widget.setLayout(layout)
+        return widget
+
+    def _fill_ledger_table(self, headers, rows):
+        self.ledger_table.clear()
+        self.ledger_table.setColumnCount(len(headers))
+        self.ledger_table.setHorizontalHeaderLabels(headers)
+        self.ledger_table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                self.ledger_table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.ledger_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+
+    def _verify_ledger(self):
+        """Lista os produtos com divergência entre o estoque e o razão"""
+        try:
+            divergentes = self.ledger_service.verify()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao verificar o razão:\n\n{str(e)}")
+            return
+
+        self._fill_ledger_table(
+            ["ID", "Produto", "Quantidade", "Razão", "Diferença"],
+            [
+                (d["produto_id"], d["nome"], d["quantidade"], d["quantidade_razao"],
+                 d["quantidade"] - d["quantidade_razao"])
+                for d in divergentes
+            ]
+        )
+        if not divergentes:
+            QMessageBox.information(self, "Razão de Estoque", "Nenhuma divergência encontrada.")
+
+    def _create_snapshot(self):
+        try:
+            self.ledger_service.create_snapshot()
+            QMessageBox.information(self, "Sucesso", "Snapshot do estoque gravado.")
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao gravar snapshot:\n\n{str(e)}")
+
+    def _load_stock_at(self):
+        """Mostra o estoque de cada produto ao final da data escolhida"""
+        data = self.ledger_date.date().toString("yyyy-MM-dd")
+        try:
+            saldos = self.ledger_service.stock_at(data)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao consultar o razão:\n\n{str(e)}")
+            return
+
+        self._fill_ledger_table(
+            ["ID", "Produto", "Quantidade"],
+            [(s["produto_id"], s["nome"], s["quantidade"]) for s in saldos]
+        )
+
+    def _create_rollup_tab(self) -> QWidget:
+        """Cria a aba de verificação do resumo diário de vendas"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        description = QLabel(
+            "Relatórios e dashboard leem as vendas do resumo diário por produto, "
+            "atualizado a cada movimentação. \"Verificar\" compara o resumo com "
+            "as movimentações; \"Reconstruir\" recalcula o resumo inteiro."
+        )
+        description.setWordWrap(True)
+        layout.addWidget(description)
+
+        controls = QHBoxLayout()
+        btn_verify = QPushButton("Verificar")
+        btn_verify.clicked.connect(self._verify_rollup)
+        btn_rebuild = QPushButton("Reconstruir")
+        btn_rebuild.clicked.connect(self._rebuild_rollup)
+        controls.addWidget(btn_verify)
+        controls.addStretch()
+        controls.addWidget(btn_rebuild)
+        layout.addLayout(controls)
+
+        self.rollup_table = QTableWidget()
+        self.rollup_table.setColumnCount(5)
+        self.rollup_table.setHorizontalHeaderLabels([
+            "Dia", "Produto", "Dif. Quantidade", "Dif. Faturamento", "Dif. Vendas"
+        ])
+        self.rollup_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.rollup_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(self.rollup_table)
+
+        widget.setLayout(layout)
+        return widget
+
+    def _verify_rollup(self):
+        """Lista os dias/produtos em que o resumo diverge das movimentações"""
+        try:
+            divergentes = self.vendas_diarias_service.verify()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao verificar o resumo:\n\n{str(e)}")
+            return
+
+        self.rollup_table.setRowCount(len(divergentes))
+        for row, d in enumerate(divergentes):
+            values = [
+                d["dia"], d["nome"] or str(d["produto_id"]), d["diferenca_quantidade"],
+                f"{d['diferenca_faturamento']:.2f}", d["diferenca_vendas"]
+            ]
+            for col, value in enumerate(values):
+                self.rollup_table.setItem(row, col, QTableWidgetItem(str(value)))
+        if not divergentes:
+            QMessageBox.information(self, "Resumo de Vendas", "Nenhuma divergência encontrada.")
+
+    def _rebuild_rollup(self):
+        try:
+            linhas = self.vendas_diarias_service.rebuild()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao reconstruir o resumo:\n\n{str(e)}")
+            return
+        self.rollup_table.setRowCount(0)
+        QMessageBox.information(self, "Sucesso", f"Resumo reconstruído ({linhas} dias/produtos).")
@@ -137,8 +137,7 @@ class ProductForm(QDialog):
         product_tag_ids = {tag["id"] for tag in product_tags}
 
         for cb in self.tag_checks:
-            if cb.tag_id in product_tag_ids:
-                cb.setChecked(True)
+            cb.setChecked(cb.tag_id in product_tag_ids)
 
     def _save(self):
         nome = self.nome_input.text().strip()
@@ -167,7 +166,8 @@ class ProductForm(QDialog):
                 data_validade,
                 ativo,
                 tag_ids,
-                estoque_minimo
+                estoque_minimo,
+                self.product.get("versao")
             )
         else:
             result = self.controller.create_product(
@@ -182,5 +182,27 @@ class ProductForm(QDialog):
 
         if result.get("success"):
             self.accept()
+        elif result.get("conflito"):
+            self._handle_conflict(result["error"])
         else:
             QMessageBox.warning(self, "Erro", result.get("error", "Erro desconhecido"))
+
+    def _handle_conflict(self, mensagem: str):
+        """Produto alterado por outro terminal: oferece recarregar os dados atuais."""
+        reply = QMessageBox.question(
+            self,
+            "Produto alterado",
+            f"{mensagem}\n\nDeseja recarregar o produto? As alterações feitas neste formulário serão descartadas.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        product = self.controller.get_product(self.product["id"])
+        if not product:
+            QMessageBox.warning(self, "Erro", "O produto foi removido.")
+            self.reject()
+            return
+
+        self.product = product
+        self._load_product()
@@ -0,0 +1,204 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+    QDoubleSpinBox, QLineEdit, QPushButton, QMessageBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QTabWidget, QWidget
+)
+from controllers.price_controller import PriceController
+from controllers.tag_controller import TagController
+from utils.dates import format_date
+
+
+MODOS = [
+    ("Percentual (%)", "PERCENTUAL"),
+    ("Valor fixo (R$)", "FIXO"),
+    ("Margem desejada (%)", "MARGEM"),
+]
+
+
+class RepriceDialog(QDialog):
+    """Reajuste de preços de venda em lote, com prévia e histórico para desfazer"""
+
+    def __init__(self, parent=None, produto_ids=None):
+        super().__init__(parent)
+        self.setWindowTitle("Reajustar Preços")
+        self.resize(750, 550)
+
+        self.controller = PriceController()
+        self.tag_controller = TagController()
+        self.produto_ids = produto_ids or None
+
+        self._build_ui()
+        self._load_history()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+
+        tabs = QTabWidget()
+        tabs.addTab(self._create_reprice_tab(), "Reajuste")
+        tabs.addTab(self._create_history_tab(), "Histórico")
+        layout.addWidget(tabs)
+
+    def _create_reprice_tab(self) -> QWidget:
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        form = QFormLayout()
+
+        self.scope_combo = QComboBox()
+        if self.produto_ids:
+            self.scope_combo.addItem(f"Produtos selecionados ({len(self.produto_ids)})", None)
+        else:
+            self.scope_combo.addItem("Qualquer tag", None)
+        for tag in self.tag_controller.list_tags():
+            self.scope_combo.addItem(f"Tag: {tag['nome']}", tag["id"])
+        form.addRow("Produtos:", self.scope_combo)
+
+        self.name_filter = QLineEdit()
+        self.name_filter.setPlaceholderText("Filtrar pelo nome (opcional)")
+        form.addRow("Nome contém:", self.name_filter)
+
+        self.mode_combo = QComboBox()
+        for label, modo in MODOS:
+            self.mode_combo.addItem(label, modo)
+        form.addRow("Tipo de reajuste:", self.mode_combo)
+
+        self.value_spin = QDoubleSpinBox()
+        self.value_spin.setRange(-100000, 100000)
+        self.value_spin.setDecimals(2)
+        form.addRow("Valor:", self.value_spin)
+
+        self.description = QLineEdit()
+        self.description.setPlaceholderText("Ex.: Reajuste de verão")
+        form.addRow("Descrição:", self.description)
+
+        layout.addLayout(form)
+
+        self.preview_table = QTableWidget()
+        self.preview_table.setColumnCount(5)
+        self.preview_table.setHorizontalHeaderLabels([
+            "ID", "Produto", "Valor Compra", "Preço Atual", "Novo Preço"
+        ])
+        self.preview_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.preview_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(self.preview_table)
+
+        self.preview_label = QLabel("")
+        layout.addWidget(self.preview_label)
+
+        buttons = QHBoxLayout()
+        btn_preview = QPushButton("Pré-visualizar")
+        btn_preview.clicked.connect(self._preview)
+        btn_apply = QPushButton("Aplicar Reajuste")
+        btn_apply.clicked.connect(self._apply)
+        buttons.addWidget(btn_preview)
+        buttons.addStretch()
+        buttons.addWidget(btn_apply)
+        layout.addLayout(buttons)
+
+        return widget
+
+    def _create_history_tab(self) -> QWidget:
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.history_table = QTableWidget()
+        self.history_table.setColumnCount(6)
+        self.history_table.setHorizontalHeaderLabels([
+            "ID", "Data", "Descrição", "Tipo", "Valor", "Produtos"
+        ])
+        self.history_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.history_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        layout.addWidget(self.history_table)
+
+        buttons = QHBoxLayout()
+        btn_undo = QPushButton("Desfazer Reajuste")
+        btn_undo.clicked.connect(self._undo)
+        buttons.addStretch()
+        buttons.addWidget(btn_undo)
+        layout.addLayout(buttons)
+
+        return widget
+
+    def _params(self):
+        """Parâmetros do reajuste conforme os campos do formulário"""
+        tag_id = self.scope_combo.currentData()
+        termo = self.name_filter.text().strip() or None
+        produto_ids = self.produto_ids if tag_id is None else None
+        return {
+            "modo": self.mode_combo.currentData(),
+            "valor": self.value_spin.value(),
+            "tag_id": tag_id,
+            "termo": termo,
+            "produto_ids": produto_ids,
+        }
+
+    def _preview(self):
+        resp = self.controller.preview(**self._params())
+        if not resp["success"]:
+            QMessageBox.warning(self, "Aviso", resp["error"])
+            return
+
+        produtos = resp["produtos"]
+        self.preview_table.setRowCount(len(produtos))
+        for row, p in enumerate(produtos):
+            self.preview_table.setItem(row, 0, QTableWidgetItem(str(p["id"])))
+            self.preview_table.setItem(row, 1, QTableWidgetItem(p["nome"]))
+            self.preview_table.setItem(row, 2, QTableWidgetItem(f"{p['valor_compra']:.2f}"))
+            self.preview_table.setItem(row, 3, QTableWidgetItem(f"{p['valor_venda']:.2f}"))
+            self.preview_table.setItem(row, 4, QTableWidgetItem(f"{p['valor_venda_novo']:.2f}"))
+        self.preview_label.setText(f"{len(produtos)} produtos terão o preço alterado.")
+
+    def _apply(self):
+        params = self._params()
+        reply = QMessageBox.question(
+            self,
+            "Confirmar Reajuste",
+            "Aplicar o reajuste aos produtos do filtro?\nEle pode ser desfeito na aba Histórico.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        resp = self.controller.apply(descricao=self.description.text().strip(), **params)
+        if not resp["success"]:
+            QMessageBox.warning(self, "Erro", resp["error"])
+            return
+
+        QMessageBox.information(self, "Sucesso", f"Preço alterado em {resp['produtos']} produtos.")
+        self.preview_table.setRowCount(0)
+        self.preview_label.setText("")
+        self._load_history()
+
+    def _load_history(self):
+        reajustes = self.controller.list_reajustes()
+        labels = {modo: label for label, modo in MODOS}
+        self.history_table.setRowCount(len(reajustes))
+        for row, r in enumerate(reajustes):
+            descricao = r["descricao"] or ""
+            if r["desfeito"]:
+                descricao = f"{descricao} (desfeito)".strip()
+            self.history_table.setItem(row, 0, QTableWidgetItem(str(r["id"])))
+            self.history_table.setItem(row, 1, QTableWidgetItem(format_date(r["data"])))
+            self.history_table.setItem(row, 2, QTableWidgetItem(descricao))
+            self.history_table.setItem(row, 3, QTableWidgetItem(labels.get(r["modo"], r["modo"])))
+            self.history_table.setItem(row, 4, QTableWidgetItem(f"{r['valor']:.2f}"))
+            self.history_table.setItem(row, 5, QTableWidgetItem(str(r["produtos"])))
+
+    def _undo(self):
+        selected = self.history_table.selectionModel().selectedRows()
+        if not selected:
+            QMessageBox.warning(self, "Aviso", "Selecione um reajuste para desfazer")
+            return
+
+        reajuste_id = int(self.history_table.item(selected[0].row(), 0).text())
+        resp = self.controller.undo(reajuste_id)
+        if not resp["success"]:
+            QMessageBox.warning(self, "Erro", resp["error"])
+            return
+
+        mensagem = f"{resp['revertidos']} produtos voltaram ao preço anterior."
+        if resp["mantidos"]:
+            mensagem += f"\n{resp['mantidos']} tiveram o preço alterado depois e foram mantidos."
+        QMessageBox.information(self, "Reajuste desfeito", mensagem)
+        self._load_history()
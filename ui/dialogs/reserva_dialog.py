@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
+    QTableWidgetItem, QPushButton, QMessageBox, QCheckBox, QAbstractItemView,
+    QHeaderView
+)
+from controllers.reserva_controller import ReservaController
+from utils.dates import format_date
+
+
+class ReservaDialog(QDialog):
+    """Reservas de estoque ativas: liberar ou converter em venda"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Reservas de Estoque")
+        self.resize(850, 400)
+
+        self.controller = ReservaController()
+
+        self._build_ui()
+        self._load_reservas()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Reservas ativas (vencidas são liberadas automaticamente)"))
+
+        self.table = QTableWidget(0, 7)
+        self.table.setHorizontalHeaderLabels(["ID", "Cliente", "Produto", "Qtd", "Observação", "Reservado em", "Vence em"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        btn_layout = QHBoxLayout()
+        self.fiado_checkbox = QCheckBox("Converter como fiado")
+        self.btn_convert = QPushButton("Converter em Venda")
+        self.btn_convert.clicked.connect(self._convert_selected)
+        self.btn_release = QPushButton("Liberar")
+        self.btn_release.clicked.connect(self._release_selected)
+        self.btn_close = QPushButton("Fechar")
+        self.btn_close.clicked.connect(self.close)
+
+        btn_layout.addWidget(self.fiado_checkbox)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.btn_convert)
+        btn_layout.addWidget(self.btn_release)
+        btn_layout.addWidget(self.btn_close)
+        layout.addLayout(btn_layout)
+
+    def _load_reservas(self):
+        reservas = self.controller.list_reservas_ativas()
+        self.table.setRowCount(len(reservas))
+        for row, r in enumerate(reservas):
+            self.table.setItem(row, 0, QTableWidgetItem(str(r["id"])))
+            self.table.setItem(row, 1, QTableWidgetItem(r["cliente"]))
+            self.table.setItem(row, 2, QTableWidgetItem(r["produto_nome"]))
+            self.table.setItem(row, 3, QTableWidgetItem(str(r["quantidade"])))
+            self.table.setItem(row, 4, QTableWidgetItem(r["observacao"] or ""))
+            self.table.setItem(row, 5, QTableWidgetItem(format_date(r["data_reserva"])))
+            self.table.setItem(row, 6, QTableWidgetItem(self._format_expiry(r["expira_em"])))
+
+    @staticmethod
+    def _format_expiry(value):
+        # O vencimento é em horas, então mostra também o horário (gravado em UTC)
+        try:
+            utc = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            return format_date(value)
+        local = utc.replace(tzinfo=timezone.utc).astimezone()
+        return local.strftime("%d-%m-%Y %H:%M")
+
+    def _selected_id(self):
+        selected = self.table.selectionModel().selectedRows()
+        if not selected:
+            QMessageBox.warning(self, "Aviso", "Selecione uma reserva")
+            return None
+        return int(self.table.item(selected[0].row(), 0).text())
+
+    def _convert_selected(self):
+        reserva_id = self._selected_id()
+        if reserva_id is None:
+            return
+
+        resp = self.controller.converter_em_venda(reserva_id, self.fiado_checkbox.isChecked())
+        if not resp["success"]:
+            QMessageBox.warning(self, "Erro", resp["error"])
+        else:
+            QMessageBox.information(
+                self, "Sucesso", f"Venda #{resp['venda_id']} registrada: R$ {resp['total']:.2f}"
+            )
+        self._load_reservas()
+
+    def _release_selected(self):
+        reserva_id = self._selected_id()
+        if reserva_id is None:
+            return
+
+        reply = QMessageBox.question(
+            self, "Liberar Reserva",
+            "Cancelar a reserva e devolver a quantidade ao estoque disponível?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        resp = self.controller.liberar(reserva_id)
+        if not resp["success"]:
+            QMessageBox.warning(self, "Erro", resp["error"])
+        self._load_reservas()
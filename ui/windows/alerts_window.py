@@ -84,33 +84,39 @@ class AlertsWindow(QWidget):
     def load_alerts(self):
         """Carrega todos os alertas e preenche as tabelas"""
         products = self.controller.list_products()
-        
-        expired_products = []
-        expiring_products = []
-        low_stock_products = []
-        
-        for product in products:
-            alertas = self.controller.service.get_product_alert_status(product, 7)
-            
-            if "Vencido" in alertas:
-                expired_products.append(product)
-            if "Perto do vencimento" in alertas:
-                expiring_products.append(product)
-            if "Estoque baixo" in alertas:
-                low_stock_products.append(product)
-        
+        products_by_id = {product["id"]: product for product in products}
+
+        low_stock_products = [
+            product for product in products
+            if "Estoque baixo" in self.controller.service.get_product_alert_status(product, 7)
+        ]
+
+        # Validade é controlada por lote: um produto com entregas diferentes
+        # pode ter um lote vencido e outro ainda bom
+        today = date.today().isoformat()
+        expired_lots = []
+        expiring_lots = []
+        for lote in self.controller.expiring_lots(7):
+            row = dict(lote)
+            row["id"] = lote["produto_id"]
+            row["tags"] = products_by_id.get(lote["produto_id"], {}).get("tags", "")
+            if lote["data_validade"] < today:
+                expired_lots.append(row)
+            else:
+                expiring_lots.append(row)
+
         # Atualizar cards
-        self.card_expired.label_count.setText(str(len(expired_products)))
-        self.card_expiring.label_count.setText(str(len(expiring_products)))
+        self.card_expired.label_count.setText(str(len({lote["id"] for lote in expired_lots})))
+        self.card_expiring.label_count.setText(str(len({lote["id"] for lote in expiring_lots})))
         self.card_low_stock.label_count.setText(str(len(low_stock_products)))
         
         # Preencher tabelas
-        self._populate_table(self.table_expired, expired_products, "expired")
-        self._populate_table(self.table_expiring, expiring_products, "expiring")
+        self._populate_table(self.table_expired, expired_lots, "expired")
+        self._populate_table(self.table_expiring, expiring_lots, "expiring")
         self._populate_table(self.table_low_stock, low_stock_products, "low_stock")
     
     def _populate_table(self, table, products, alert_type):
-        """Preenche uma tabela com os produtos e detalhes do alerta"""
+        """Preenche uma tabela com os produtos (ou lotes) e detalhes do alerta"""
         table.setRowCount(len(products))
         
         for row, product in enumerate(products):
@@ -140,18 +146,14 @@ class AlertsWindow(QWidget):
     def _get_alert_details(self, product, alert_type):
         """Retorna uma string com detalhes do alerta"""
         if alert_type == "expired":
-            if product["data_validade"]:
-                validade_date = datetime.strptime(product["data_validade"], "%Y-%m-%d").date()
-                days_passed = (date.today() - validade_date).days
-                return f"Vencido há {days_passed} dias"
-            return "Vencido"
+            validade_date = datetime.strptime(product["data_validade"], "%Y-%m-%d").date()
+            days_passed = (date.today() - validade_date).days
+            return f"Lote #{product['lote_id']} vencido há {days_passed} dias"
         
         elif alert_type == "expiring":
-            if product["data_validade"]:
-                validade_date = datetime.strptime(product["data_validade"], "%Y-%m-%d").date()
-                days_left = (validade_date - date.today()).days
-                return f"Vence em {days_left} dias ({format_date(product['data_validade'])})"
-            return "Próximo do vencimento"
+            validade_date = datetime.strptime(product["data_validade"], "%Y-%m-%d").date()
+            days_left = (validade_date - date.today()).days
+            return f"Lote #{product['lote_id']} vence em {days_left} dias ({format_date(product['data_validade'])})"
         
         else:  # low_stock
             estoque_minimo = product.get("estoque_minimo", 5)
@@ -5,6 +5,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont, QColor
+import config
 from services.analytics_service import AnalyticsService
 from controllers.stock_controller import StockController
 import matplotlib.pyplot as plt
@@ -95,6 +96,18 @@ class AnalyticsWindow(QWidget):
         widget = QWidget()
         layout = QVBoxLayout(widget)
 
+        # Vendas registradas pelo carrinho nos últimos 30 dias
+        vendas_layout = QHBoxLayout()
+        self.label_num_vendas = self._create_stat_box("Vendas no Carrinho (30 dias)", "0")
+        self.label_total_vendas = self._create_stat_box("Total Vendido (30 dias)", "R$ 0,00")
+        self.label_ticket_medio = self._create_stat_box("Ticket Médio", "R$ 0,00")
+
+        vendas_layout.addWidget(self.label_num_vendas)
+        vendas_layout.addWidget(self.label_total_vendas)
+        vendas_layout.addWidget(self.label_ticket_medio)
+
+        layout.addLayout(vendas_layout)
+
         # Top produtos
         group = QGroupBox("Top 5 Produtos Mais Vendidos")
         group_layout = QVBoxLayout(group)
@@ -179,6 +192,28 @@ class AnalyticsWindow(QWidget):
         tab2_layout.addWidget(self.table_rotatividade)
         tabs.addTab(tab2, "Rotatividade")
 
+        # Curva ABC
+        tab_abc = QWidget()
+        tab_abc_layout = QVBoxLayout(tab_abc)
+        tab_abc_layout.addWidget(QLabel(
+            f"Classes pelo faturamento acumulado: A até {config.ANALYTICS_ABC_LIMITE_A}%, "
+            f"B até {config.ANALYTICS_ABC_LIMITE_B}%, C no restante"
+        ))
+        self.table_abc_resumo = QTableWidget(0, 4)
+        self.table_abc_resumo.setHorizontalHeaderLabels([
+            "Classe", "Produtos", "Faturamento", "% do Faturamento"
+        ])
+        self.table_abc_resumo.setMaximumHeight(130)
+        tab_abc_layout.addWidget(self.table_abc_resumo)
+        tab_abc_layout.addWidget(QLabel("Produtos de maior faturamento (Top 50)"))
+        self.table_abc = QTableWidget(0, 5)
+        self.table_abc.setHorizontalHeaderLabels([
+            "Produto", "Classe", "Faturamento", "Participação %", "Acumulado %"
+        ])
+        self.table_abc.setColumnWidth(0, 200)
+        tab_abc_layout.addWidget(self.table_abc)
+        tabs.addTab(tab_abc, "Curva ABC")
+
         # # Produtos encalhados
         # tab3 = QWidget()
         # tab3_layout = QVBoxLayout(tab3)
@@ -299,49 +334,60 @@ class AnalyticsWindow(QWidget):
     def _load_data(self):
         """Carregar todos os dados"""
         try:
-            # Estatísticas gerais
-            stats = self.service.get_total_statistics()
-            self.label_produtos.label.setText(str(stats["total_produtos"]))
-            self.label_itens.label.setText(str(stats["total_itens"]))
-            self.label_vendas.label.setText(str(stats["total_vendas"]))
-            self.label_dias.label.setText(str(stats["dias_com_vendas"]))
-
-            # Estoque
-            estoque = self.service.get_stock_metrics()
-            self.label_valor_custo.label.setText(f"R$ {estoque['valor_custo']:,.2f}")
-            self.label_valor_venda.label.setText(f"R$ {estoque['valor_venda']:,.2f}")
-            margem = estoque['valor_venda'] - estoque['valor_custo']
-            self.label_margem_total.label.setText(f"R$ {margem:,.2f}")
-
-            # Fiados (visão geral)
-            fiados = self.service.get_fiados_summary()
-            self.label_fiados.label.setText(f"R$ {fiados['total_open']:,.2f}")
-
-            # Prejuizos
-            preju = self.service.get_prejuizos_summary()
-            self.label_prejuizos.label.setText(f"R$ {preju['total_valor']:,.2f}")
+            # Todas as consultas rodam juntas no pool de leitura; daqui em
+            # diante só o preenchimento da tela (o que falhou fica como está)
+            snapshot = self.service.get_dashboard_snapshot()
+            for nome, erro in snapshot.erros.items():
+                print(f"Erro ao carregar {nome}: {erro}")
+
+            # Cards da visão geral (estatísticas, estoque, fiados e prejuízos)
+            kpis = snapshot.kpis
+            if kpis is not None:
+                self.label_produtos.label.setText(str(kpis.total_produtos))
+                self.label_itens.label.setText(str(kpis.total_itens))
+                self.label_vendas.label.setText(str(kpis.total_vendas))
+                self.label_dias.label.setText(str(kpis.dias_com_vendas))
+                self.label_valor_custo.label.setText(f"R$ {kpis.valor_custo:,.2f}")
+                self.label_valor_venda.label.setText(f"R$ {kpis.valor_venda:,.2f}")
+                self.label_margem_total.label.setText(f"R$ {kpis.margem_estoque:,.2f}")
+                self.label_fiados.label.setText(f"R$ {kpis.valor_fiados_abertos:,.2f}")
+                self.label_prejuizos.label.setText(f"R$ {kpis.valor_prejuizos:,.2f}")
+
+            vendas = snapshot.vendas_resumo
+            if vendas is not None:
+                self.label_num_vendas.label.setText(str(vendas["num_vendas"]))
+                self.label_total_vendas.label.setText(f"R$ {vendas['total']:,.2f}")
+                self.label_ticket_medio.label.setText(f"R$ {vendas['ticket_medio']:,.2f}")
 
             # Gráficos
-            self._draw_sales_chart()
-            self._draw_categories_chart()
-            self._draw_stock_chart()
+            if snapshot.vendas_grafico is not None:
+                self._draw_sales_chart(*snapshot.vendas_grafico)
+            if snapshot.categorias is not None:
+                self._draw_categories_chart(snapshot.categorias)
+                self._draw_stock_chart(snapshot.categorias)
 
             # Tabelas
-            self._load_top_products()
-            self._load_prejuizos()
-            self._load_losses_detail()
-            self._load_profit_margins()
-            self._load_turnover()
-            self._load_fiados_tab()
+            if snapshot.produtos_top is not None:
+                self._load_top_products(snapshot.produtos_top)
+            if snapshot.prejuizos_motivo is not None:
+                self._load_prejuizos(snapshot.prejuizos_motivo)
+            if snapshot.prejuizos_motivo is not None and snapshot.prejuizos_detalhados is not None:
+                self._load_losses_detail(snapshot.prejuizos_motivo, snapshot.prejuizos_detalhados)
+            if snapshot.margens is not None:
+                self._load_profit_margins(snapshot.margens)
+            if snapshot.rotatividade is not None:
+                self._load_turnover(snapshot.rotatividade)
+            if snapshot.curva_abc is not None:
+                self._load_abc_curve(snapshot.curva_abc)
+            self._load_fiados_tab(snapshot)
             # self._load_inactive_products()
 
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {str(e)}")
 
-    def _draw_sales_chart(self):
+    def _draw_sales_chart(self, dates, values):
         """Desenhar gráfico de vendas"""
         try:
-            dates, values = self.service.get_sales_chart_data(30)
             
             self.figure_sales.clear()
             ax = self.figure_sales.add_subplot(111)
@@ -359,11 +405,9 @@ class AnalyticsWindow(QWidget):
         except Exception as e:
             print(f"Erro ao desenhar gráfico de vendas: {e}")
 
-    def _draw_categories_chart(self):
+    def _draw_categories_chart(self, categorias):
         """Desenhar gráfico de categorias"""
         try:
-            categorias = self.service.get_category_performance()
-
             self.figure_categories.clear()
             ax = self.figure_categories.add_subplot(111)
 
@@ -388,11 +432,9 @@ class AnalyticsWindow(QWidget):
         except Exception as e:
             print(f"Erro ao desenhar gráfico de categorias: {e}")
 
-    def _draw_stock_chart(self):
+    def _draw_stock_chart(self, categorias):
         """Desenhar gráfico de estoque"""
         try:
-            categorias = self.service.get_category_performance()
-
             self.figure_stock.clear()
             ax = self.figure_stock.add_subplot(111)
 
@@ -416,10 +458,9 @@ class AnalyticsWindow(QWidget):
         except Exception as e:
             print(f"Erro ao desenhar gráfico de estoque: {e}")
 
-    def _load_top_products(self):
+    def _load_top_products(self, produtos):
         """Carregar tabela de top produtos"""
         try:
-            produtos = self.service.get_top_products_data(5)
             self.table_top_produtos.setRowCount(0)
 
             for produto in produtos:
@@ -437,9 +478,8 @@ class AnalyticsWindow(QWidget):
         except Exception as e:
             print(f"Erro ao carregar top produtos: {e}")
 
-    def _load_prejuizos(self):
+    def _load_prejuizos(self, prej):
         try:
-            prej = self.service.get_prejuizos_by_motivo(10)
             self.table_prejuizos.setRowCount(0)
             for item in prej:
                 row = self.table_prejuizos.rowCount()
@@ -450,11 +490,10 @@ class AnalyticsWindow(QWidget):
         except Exception as e:
             print(f"Erro ao carregar prejuizos: {e}")
 
-    def _load_losses_detail(self):
+    def _load_losses_detail(self, prej_motivo, prejuizos):
         """Carregar tabelas detalhadas de prejuízos"""
         try:
             # Carregar prejuízos por motivo na aba de prejuízos
-            prej_motivo = self.service.get_prejuizos_by_motivo(10)
             self.table_losses_by_motivo.setRowCount(0)
             for item in prej_motivo:
                 row = self.table_losses_by_motivo.rowCount()
@@ -465,7 +504,6 @@ class AnalyticsWindow(QWidget):
 
             # Carregar lista detalhada de prejuízos
             from utils.dates import format_date
-            prejuizos = self.service.get_prejuizos_detalhados()
             self.table_losses_detail.setRowCount(0)
             
             total_value = 0
@@ -511,6 +549,20 @@ class AnalyticsWindow(QWidget):
         stats_layout.addWidget(self.label_paid_value)
         layout.addLayout(stats_layout)
 
+        # Saldo por cliente (mantido na tabela clientes) e faixas de atraso
+        group_clientes = QGroupBox("Saldo por Cliente")
+        clientes_layout = QVBoxLayout(group_clientes)
+        self.label_fiados_aging = QLabel("")
+        clientes_layout.addWidget(self.label_fiados_aging)
+        self.table_clientes_fiado = QTableWidget(0, 4)
+        self.table_clientes_fiado.setHorizontalHeaderLabels([
+            "Cliente", "Saldo em Aberto", "Fiados", "Fiado Mais Antigo (dias)"
+        ])
+        self.table_clientes_fiado.setColumnWidth(0, 200)
+        self.table_clientes_fiado.setColumnWidth(3, 170)
+        clientes_layout.addWidget(self.table_clientes_fiado)
+        layout.addWidget(group_clientes)
+
         # Tabela detalhada de fiados
         group = QGroupBox("Detalhamento de Fiados")
         group_layout = QVBoxLayout(group)
@@ -533,17 +585,35 @@ class AnalyticsWindow(QWidget):
         layout.addWidget(group)
         return widget
 
-    def _load_fiados_tab(self):
+    def _load_fiados_tab(self, snapshot):
         try:
             # estatísticas
-            stats = self.service.get_fiados_summary()
-            self.label_open_count.label.setText(str(stats['count_open']))
-            self.label_open_value.label.setText(f"R$ {stats['total_open']:,.2f}")
-            self.label_paid_count.label.setText(str(stats['count_paid']))
-            self.label_paid_value.label.setText(f"R$ {stats['total_paid']:,.2f}")
+            kpis = snapshot.kpis
+            if kpis is not None:
+                self.label_open_count.label.setText(str(kpis.fiados_abertos))
+                self.label_open_value.label.setText(f"R$ {kpis.valor_fiados_abertos:,.2f}")
+                self.label_paid_count.label.setText(str(kpis.fiados_pagos))
+                self.label_paid_value.label.setText(f"R$ {kpis.valor_fiados_pagos:,.2f}")
+
+            faixas = snapshot.fiados_aging
+            if faixas is not None:
+                self.label_fiados_aging.setText("   |   ".join(
+                    f"{f['faixa']}: R$ {f['saldo']:,.2f} ({f['clientes']} clientes)" for f in faixas
+                ))
+
+            clientes = snapshot.clientes_em_aberto
+            if clientes is not None:
+                self.table_clientes_fiado.setRowCount(len(clientes))
+                for row, c in enumerate(clientes):
+                    self.table_clientes_fiado.setItem(row, 0, QTableWidgetItem(c['nome']))
+                    self.table_clientes_fiado.setItem(row, 1, QTableWidgetItem(f"R$ {c['saldo_aberto']:,.2f}"))
+                    self.table_clientes_fiado.setItem(row, 2, QTableWidgetItem(str(c['fiados_abertos'])))
+                    self.table_clientes_fiado.setItem(row, 3, QTableWidgetItem(str(c['dias_em_aberto'])))
 
             from utils.dates import format_date
-            fiados = self.service.get_fiados_detalhados()
+            fiados = snapshot.fiados_detalhados
+            if fiados is None:
+                return
             self.table_fiados.setRowCount(0)
             for f in fiados:
                 row = self.table_fiados.rowCount()
@@ -588,10 +658,10 @@ class AnalyticsWindow(QWidget):
         else:
             QMessageBox.warning(self, "Erro", result.get("error", "Não foi possível excluir o prejuízo"))
 
-    def _load_profit_margins(self):
+    def _load_profit_margins(self, margens):
         """Carregar tabela de margens de lucro"""
         try:
-            margens = self.service.get_profit_margins()[:10]
+            margens = margens[:10]
             self.table_margens.setRowCount(0)
 
             for margem in margens:
@@ -612,10 +682,10 @@ class AnalyticsWindow(QWidget):
         dlg = FiadoManagerDialog(self)
         dlg.exec()
 
-    def _load_turnover(self):
+    def _load_turnover(self, rotatividade):
         """Carregar tabela de rotatividade"""
         try:
-            rotatividade = self.service.get_turnover_analysis(30)[:10]
+            rotatividade = rotatividade[:10]
             self.table_rotatividade.setRowCount(0)
 
             for item in rotatividade:
@@ -629,6 +699,40 @@ class AnalyticsWindow(QWidget):
         except Exception as e:
             print(f"Erro ao carregar rotatividade: {e}")
 
+    def _load_abc_curve(self, curva):
+        """Carregar resumo por classe e tabela da curva ABC"""
+        try:
+            cores = {"A": QColor("#2e7d32"), "B": QColor("#f9a825"), "C": QColor("#c62828")}
+
+            total = sum(item["faturamento"] for item in curva)
+            self.table_abc_resumo.setRowCount(0)
+            for classe in ("A", "B", "C"):
+                itens = [item for item in curva if item["classe"] == classe]
+                faturamento = sum(item["faturamento"] for item in itens)
+                row = self.table_abc_resumo.rowCount()
+                self.table_abc_resumo.insertRow(row)
+                item_classe = QTableWidgetItem(classe)
+                item_classe.setForeground(cores[classe])
+                self.table_abc_resumo.setItem(row, 0, item_classe)
+                self.table_abc_resumo.setItem(row, 1, QTableWidgetItem(str(len(itens))))
+                self.table_abc_resumo.setItem(row, 2, QTableWidgetItem(f"R$ {faturamento:,.2f}"))
+                percentual = faturamento / total * 100 if total else 0
+                self.table_abc_resumo.setItem(row, 3, QTableWidgetItem(f"{percentual:.1f}%"))
+
+            self.table_abc.setRowCount(0)
+            for item in curva[:50]:
+                row = self.table_abc.rowCount()
+                self.table_abc.insertRow(row)
+                item_classe = QTableWidgetItem(item["classe"])
+                item_classe.setForeground(cores[item["classe"]])
+                self.table_abc.setItem(row, 0, QTableWidgetItem(item["nome"]))
+                self.table_abc.setItem(row, 1, item_classe)
+                self.table_abc.setItem(row, 2, QTableWidgetItem(f"R$ {item['faturamento']:,.2f}"))
+                self.table_abc.setItem(row, 3, QTableWidgetItem(f"{item['participacao']:.1f}%"))
+                self.table_abc.setItem(row, 4, QTableWidgetItem(f"{item['acumulado']:.1f}%"))
+        except Exception as e:
+            print(f"Erro ao carregar curva ABC: {e}")
+
     # def _load_inactive_products(self):
     #     """Carregar tabela de produtos encalhados"""
     #     try:
@@ -229,7 +229,8 @@ class CaixaDashboardWindow(QWidget):
 
             prod = product_repo.get_by_id(produto_id) or {}
             nome = prod.get("nome", f"Produto #{produto_id}")
-            valor_unit = prod.get("valor_venda", 0) or 0
+            # Preço gravado na movimentação (não muda se o produto for reajustado)
+            valor_unit = m["valor_unitario"] or 0
             valor_total = quantidade * valor_unit
 
             hora = data_mov.split(" ")[-1] if isinstance(data_mov, str) else str(data_mov)
@@ -97,7 +97,9 @@ class CaixaWindow(QWidget):
 
         valor, ok = self._get_valor_fechamento()
         if ok and valor is not None:
-            result = self.controller.fechar_caixa(caixa_id, valor)
+            result = self.controller.fechar_caixa(caixa_id, valor, self._versoes.get(caixa_id))
+            if result.get("conflito"):
+                self.load_caixas()
             if result.get("success"):
                 self.load_caixas()
                 QMessageBox.information(
@@ -176,6 +178,8 @@ class CaixaWindow(QWidget):
     def load_caixas(self):
         caixas = self.controller.service.repository.get_all()
         self.table.setRowCount(len(caixas))
+        # Versão lida de cada caixa, enviada junto no fechamento
+        self._versoes = {caixa["id"]: caixa["versao"] for caixa in caixas}
 
         for row, caixa in enumerate(caixas):
             self.table.setItem(row, 0, QTableWidgetItem(str(caixa["id"])))
@@ -329,7 +329,9 @@ class HomeScreen(QWidget):
         if dialog.exec() == QDialog.Accepted:
             valor = dialog.get_valor()
             
-            result = self.caixa_controller.fechar_caixa(self.caixa_atual["id"], valor)
+            result = self.caixa_controller.fechar_caixa(
+                self.caixa_atual["id"], valor, self.caixa_atual.get("versao")
+            )
             
             if result["success"]:
                 msg = f"""{result['message']}
@@ -341,3 +343,5 @@ class HomeScreen(QWidget):
                 self.atualizar_status_caixa()
             else:
                 QMessageBox.warning(self, "Erro", result["error"])
+                if result.get("conflito"):
+                    self.atualizar_status_caixa()
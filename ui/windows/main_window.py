@@ -14,6 +14,7 @@ from ui.windows.caixa_window import CaixaWindow
 from ui.windows.caixa_dashboard_window import CaixaDashboardWindow
 from ui.windows.analytics_window import AnalyticsWindow
 from ui.dialogs.backup_dialog import BackupDialog
+from ui.dialogs.maintenance_dialog import MaintenanceDialog
 
 
 class MainWindow(QMainWindow):
@@ -93,6 +94,9 @@ class MainWindow(QMainWindow):
         action_backup = menu_ferramentas.addAction("Backup e Restauração")
         action_backup.triggered.connect(self._open_backup_dialog)
 
+        action_maintenance = menu_ferramentas.addAction("Manutenção do Banco")
+        action_maintenance.triggered.connect(self._open_maintenance_dialog)
+
     def _create_central_area(self):
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.currentChanged.connect(self._on_tab_changed)
@@ -151,3 +155,8 @@ class MainWindow(QMainWindow):
                 "Reiniciar Aplicação",
                 "Por favor, reinicie a aplicação para carregar os dados importados."
             )
+
+    def _open_maintenance_dialog(self):
+        """Abre o diálogo de manutenção do banco de dados"""
+        dialog = MaintenanceDialog(self)
+        dialog.exec()
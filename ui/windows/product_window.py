@@ -1,13 +1,14 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLineEdit, QTableWidget,
-    QTableWidgetItem, QLabel, QMessageBox
+    QTableWidgetItem, QLabel, QMessageBox, QFileDialog
 )
 from PySide6.QtGui import QColor
 
 from controllers.product_controller import ProductController
 
 from ui.dialogs.product_form import ProductForm
+from ui.dialogs.reprice_dialog import RepriceDialog
 
 
 class ProductWindow(QWidget):
@@ -33,6 +34,12 @@ class ProductWindow(QWidget):
         btn_search.clicked.connect(self.search_products)
 
         btn_new = QPushButton("Novo Produto")
+        btn_import = QPushButton("Importar")
+        btn_import.setToolTip("Importar produtos de uma planilha CSV ou XLSX")
+        btn_import.clicked.connect(self.import_products)
+        btn_reprice = QPushButton("Reajustar Preços")
+        btn_reprice.setToolTip("Reajustar os produtos selecionados ou os de uma tag")
+        btn_reprice.clicked.connect(self.reprice_products)
         btn_delete = QPushButton("Deletar")
         btn_delete.clicked.connect(self.delete_product)
 
@@ -41,6 +48,8 @@ class ProductWindow(QWidget):
         top_bar.addWidget(self.search_input)
         top_bar.addWidget(btn_search)
         top_bar.addWidget(btn_new)
+        top_bar.addWidget(btn_import)
+        top_bar.addWidget(btn_reprice)
         top_bar.addWidget(btn_delete)
 
         # Tabela
@@ -67,6 +76,54 @@ class ProductWindow(QWidget):
         if dialog.exec():
             self.load_products()
 
+    def import_products(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Importar produtos",
+            "",
+            "Planilhas (*.csv *.xlsx)"
+        )
+        if not file_path:
+            return
+
+        result = self.controller.import_products(file_path)
+        if not result["success"]:
+            QMessageBox.warning(self, "Erro", result["error"])
+            return
+
+        self.load_products()
+        erros = result["erros"]
+        if not erros:
+            QMessageBox.information(self, "Sucesso", f"{result['importados']} produtos importados.")
+            return
+
+        # Mostra só o início da lista; o relatório completo pode ser salvo
+        resumo = "\n".join(f"Linha {linha}: {mensagem}" for linha, mensagem in erros[:10])
+        if len(erros) > 10:
+            resumo += f"\n... e mais {len(erros) - 10} linhas"
+        reply = QMessageBox.question(
+            self,
+            "Importação concluída",
+            f"{result['importados']} produtos importados, {len(erros)} linhas com erro:\n\n"
+            f"{resumo}\n\nDeseja salvar o relatório de erros?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            report_path, _ = QFileDialog.getSaveFileName(
+                self, "Salvar relatório de erros", "erros_importacao.csv", "CSV (*.csv)"
+            )
+            if report_path:
+                self.controller.save_import_errors(erros, report_path)
+
+    def reprice_products(self):
+        produto_ids = [
+            int(self.table.item(index.row(), 0).text())
+            for index in self.table.selectionModel().selectedRows()
+        ]
+        dialog = RepriceDialog(self, produto_ids=produto_ids)
+        dialog.exec()
+        self.load_products()
+
     def edit_product(self, row, column):
         produto_id = int(self.table.item(row, 0).text())
         product = self.controller.service.product_repo.get_by_id(produto_id)
@@ -88,7 +145,8 @@ class ProductWindow(QWidget):
         reply = QMessageBox.question(
             self,
             "Confirmar Deleção",
-            f"Tem certeza que deseja deletar '{product_name}'?",
+            f"Tem certeza que deseja deletar '{product_name}'?\n"
+            "O histórico de vendas, fiados e perdas do produto é mantido.",
             QMessageBox.Yes | QMessageBox.No
         )
         
@@ -111,7 +169,7 @@ class ProductWindow(QWidget):
             from utils.dates import format_date
             self.table.setItem(
                 row, 6,
-                QTableWidgetItem(format_date(product["data_validade"]))
+                QTableWidgetItem(format_date(product.get("proxima_validade") or product["data_validade"]))
             )
             self.table.setItem(row, 7, QTableWidgetItem(product.get("tags", "")))
 
@@ -152,7 +210,7 @@ class ProductWindow(QWidget):
             from utils.dates import format_date
             self.table.setItem(
                 row, 6,
-                QTableWidgetItem(format_date(product["data_validade"]))
+                QTableWidgetItem(format_date(product.get("proxima_validade") or product["data_validade"]))
             )
             self.table.setItem(row, 7, QTableWidgetItem(product.get("tags", "")))
 
@@ -2,13 +2,15 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QComboBox, QSpinBox, QDoubleSpinBox,
     QTextEdit, QPushButton,
-    QMessageBox, QGroupBox
+    QMessageBox, QGroupBox, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView
 )
-from PySide6.QtWidgets import QCheckBox, QLineEdit
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QCheckBox, QLineEdit, QInputDialog, QDateEdit
+from PySide6.QtCore import Qt, QDate
 from controllers.stock_controller import StockController
 from controllers.product_controller import ProductController
 from controllers.caixa_controller import CaixaController
+from controllers.reserva_controller import ReservaController
 
 
 class StockWindow(QWidget):
@@ -18,7 +20,12 @@ class StockWindow(QWidget):
         self.stock_controller = StockController()
         self.product_controller = ProductController()
         self.caixa_controller = CaixaController()
+        self.reserva_controller = ReservaController()
         self.current_stock = 0
+        self.current_reserved = 0
+        self.products = {}
+        # Itens do carrinho: {"produto_id", "nome", "quantidade", "valor_unitario"}
+        self.cart = []
         self._build_ui()
         self.load_products()
 
@@ -66,6 +73,19 @@ class StockWindow(QWidget):
         form_layout.addWidget(QLabel("Quantidade:"))
         form_layout.addWidget(self.quantity_input)
 
+        # Validade do lote (apenas para ENTRADA; sem ela vale a do cadastro)
+        validade_layout = QHBoxLayout()
+        self.validade_check = QCheckBox("Validade do lote:")
+        self.validade_input = QDateEdit(QDate.currentDate())
+        self.validade_input.setCalendarPopup(True)
+        self.validade_input.setDisplayFormat("dd-MM-yyyy")
+        self.validade_input.setEnabled(False)
+        self.validade_check.toggled.connect(self.validade_input.setEnabled)
+        validade_layout.addWidget(self.validade_check)
+        validade_layout.addWidget(self.validade_input)
+        validade_layout.addStretch()
+        form_layout.addLayout(validade_layout)
+
         # Observação
         self.observation_input = QTextEdit()
         self.observation_input.setPlaceholderText("Observação (opcional)")
@@ -121,12 +141,57 @@ class StockWindow(QWidget):
         self.btn_register_prejuizo.clicked.connect(self._open_prejuizo_dialog)
         self.btn_register_prejuizo.setMaximumWidth(160)
         
+        self.btn_reserve = QPushButton("Reservar")
+        self.btn_reserve.setMinimumHeight(40)
+        self.btn_reserve.clicked.connect(self._reserve)
+        self.btn_reserve.setMaximumWidth(120)
+
+        self.btn_manage_reservas = QPushButton("Reservas")
+        self.btn_manage_reservas.setMinimumHeight(40)
+        self.btn_manage_reservas.clicked.connect(self._open_reserva_dialog)
+        self.btn_manage_reservas.setMaximumWidth(120)
+
         buttons_layout.addWidget(self.btn_register)
         buttons_layout.addWidget(self.btn_register_prejuizo)
         buttons_layout.addWidget(self.btn_manage_fiados)
+        buttons_layout.addWidget(self.btn_reserve)
+        buttons_layout.addWidget(self.btn_manage_reservas)
         buttons_layout.addWidget(self.btn_clear)
         layout.addLayout(buttons_layout)
 
+        # Carrinho: venda com vários itens gravada de uma vez
+        cart_group = QGroupBox("Carrinho (venda com vários produtos)")
+        cart_layout = QVBoxLayout()
+
+        self.cart_table = QTableWidget()
+        self.cart_table.setColumnCount(4)
+        self.cart_table.setHorizontalHeaderLabels(["Produto", "Quantidade", "Valor Unit.", "Total"])
+        self.cart_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.cart_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.cart_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.cart_table.setMaximumHeight(180)
+        cart_layout.addWidget(self.cart_table)
+
+        self.cart_total_label = QLabel("Total: R$ 0.00")
+        cart_layout.addWidget(self.cart_total_label)
+
+        cart_buttons = QHBoxLayout()
+        self.btn_add_cart = QPushButton("Adicionar ao Carrinho")
+        self.btn_add_cart.clicked.connect(self._add_to_cart)
+        self.btn_remove_cart = QPushButton("Remover Item")
+        self.btn_remove_cart.clicked.connect(self._remove_from_cart)
+        self.btn_checkout = QPushButton("Finalizar Venda")
+        self.btn_checkout.setMinimumHeight(35)
+        self.btn_checkout.clicked.connect(self._checkout)
+        cart_buttons.addWidget(self.btn_add_cart)
+        cart_buttons.addWidget(self.btn_remove_cart)
+        cart_buttons.addStretch()
+        cart_buttons.addWidget(self.btn_checkout)
+        cart_layout.addLayout(cart_buttons)
+
+        cart_group.setLayout(cart_layout)
+        layout.addWidget(cart_group)
+
         layout.addStretch()
         self.setLayout(layout)
 
@@ -136,6 +201,7 @@ class StockWindow(QWidget):
         """
         self.product_combo.clear()
         products = self.product_controller.list_products()
+        self.products = {product["id"]: product for product in products or []}
 
         if not products:
             self.product_combo.addItem("Nenhum produto disponível", None)
@@ -149,22 +215,28 @@ class StockWindow(QWidget):
         
         # Atualiza estoque do primeiro produto
         if products:
-            self.current_stock = products[0].get('quantidade', 0)
-            self._update_stock_label()
+            self._set_current_stock(products[0])
 
     def _on_product_changed(self):
         """Atualiza o estoque quando o produto é alterado."""
         product_id = self.product_combo.currentData()
-        if product_id:
-            products = self.product_controller.list_products()
-            for product in products:
-                if product["id"] == product_id:
-                    self.current_stock = product.get('quantidade', 0)
-                    self._update_stock_label()
-                    break
+        product = self.products.get(product_id)
+        if product:
+            self._set_current_stock(product)
+
+    def _set_current_stock(self, product):
+        """Saídas usam o estoque disponível (quantidade menos o que está reservado)."""
+        self.current_stock = product.get('quantidade_disponivel', product.get('quantidade', 0))
+        self.current_reserved = product.get('quantidade_reservada', 0)
+        self._update_stock_label()
 
     def _on_movement_type_changed(self):
         """Restringe quantidade para saídas baseado no estoque disponível."""
+        entrada = self.type_combo.currentText() == "ENTRADA"
+        self.validade_check.setEnabled(entrada)
+        if not entrada:
+            self.validade_check.setChecked(False)
+
         if self.type_combo.currentText() == "SAIDA":
             self.quantity_input.setMaximum(max(1, self.current_stock))
             if self.quantity_input.value() > self.current_stock:
@@ -174,7 +246,10 @@ class StockWindow(QWidget):
 
     def _update_stock_label(self):
         """Atualiza o label do estoque disponível."""
-        self.stock_label.setText(f"Estoque disponível: {self.current_stock} unidades")
+        texto = f"Estoque disponível: {self.current_stock} unidades"
+        if self.current_reserved:
+            texto += f" ({self.current_reserved} reservadas)"
+        self.stock_label.setText(texto)
 
     def _clear_form(self):
         """Limpa o formulário."""
@@ -182,6 +257,7 @@ class StockWindow(QWidget):
         self.observation_input.clear()
         self.fiado_checkbox.setChecked(False)
         self.cliente_input.clear()
+        self.validade_check.setChecked(False)
 
     def register_movement(self):
         # Validações
@@ -195,6 +271,9 @@ class StockWindow(QWidget):
         observacao = self.observation_input.toPlainText().strip()
         fiado = bool(self.fiado_checkbox.isChecked())
         cliente = self.cliente_input.text().strip() if fiado else None
+        data_validade = None
+        if tipo == "ENTRADA" and self.validade_check.isChecked():
+            data_validade = self.validade_input.date().toString("yyyy-MM-dd")
 
         avulso = bool(self.avulso_checkbox.isChecked())
 
@@ -203,7 +282,7 @@ class StockWindow(QWidget):
             QMessageBox.warning(
                 self, 
                 "Estoque Insuficiente", 
-                f"Quantidade em estoque: {self.current_stock} unidades\nQuantidade solicitada: {quantidade} unidades"
+                f"Quantidade disponível: {self.current_stock} unidades\nQuantidade solicitada: {quantidade} unidades"
             )
             return
 
@@ -224,7 +303,8 @@ class StockWindow(QWidget):
                     quantidade=quantidade,
                     observacao=observacao,
                     fiado=fiado,
-                    cliente=cliente
+                    cliente=cliente,
+                    data_validade=data_validade
                 )
 
             if result.get("success"):
@@ -243,6 +323,93 @@ class StockWindow(QWidget):
             self.btn_register.setEnabled(True)
             self.btn_register.setText("Registrar Movimentação")
 
+    def _add_to_cart(self):
+        """Adiciona o produto/quantidade selecionados ao carrinho."""
+        produto_id = self.product_combo.currentData()
+        product = self.products.get(produto_id)
+        if not product:
+            QMessageBox.warning(self, "Aviso", "Selecione um produto")
+            return
+
+        quantidade = self.quantity_input.value()
+        item = next((i for i in self.cart if i["produto_id"] == produto_id), None)
+        no_carrinho = item["quantidade"] if item else 0
+
+        if no_carrinho + quantidade > self.current_stock:
+            QMessageBox.warning(
+                self,
+                "Estoque Insuficiente",
+                f"Quantidade disponível: {self.current_stock} unidades\n"
+                f"Já no carrinho: {no_carrinho} unidades"
+            )
+            return
+
+        if item:
+            item["quantidade"] += quantidade
+        else:
+            self.cart.append({
+                "produto_id": produto_id,
+                "nome": product["nome"],
+                "quantidade": quantidade,
+                "valor_unitario": product["valor_venda"],
+            })
+        self._refresh_cart()
+
+    def _remove_from_cart(self):
+        row = self.cart_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Aviso", "Selecione um item do carrinho")
+            return
+        del self.cart[row]
+        self._refresh_cart()
+
+    def _refresh_cart(self):
+        self.cart_table.setRowCount(len(self.cart))
+        total = 0.0
+        for row, item in enumerate(self.cart):
+            valor_total = item["quantidade"] * item["valor_unitario"]
+            total += valor_total
+            self.cart_table.setItem(row, 0, QTableWidgetItem(item["nome"]))
+            self.cart_table.setItem(row, 1, QTableWidgetItem(str(item["quantidade"])))
+            self.cart_table.setItem(row, 2, QTableWidgetItem(f"R$ {item['valor_unitario']:.2f}"))
+            self.cart_table.setItem(row, 3, QTableWidgetItem(f"R$ {valor_total:.2f}"))
+        self.cart_total_label.setText(f"Total: R$ {total:.2f}")
+
+    def _checkout(self):
+        """Finaliza a venda do carrinho (usa Fiado/Cliente/Observação do formulário)."""
+        if not self.cart:
+            QMessageBox.warning(self, "Aviso", "O carrinho está vazio")
+            return
+
+        fiado = bool(self.fiado_checkbox.isChecked())
+        cliente = self.cliente_input.text().strip() if fiado else None
+        observacao = self.observation_input.toPlainText().strip()
+
+        self.btn_checkout.setEnabled(False)
+        try:
+            result = self.stock_controller.registrar_venda(
+                [(item["produto_id"], item["quantidade"]) for item in self.cart],
+                fiado=fiado,
+                cliente=cliente,
+                observacao=observacao
+            )
+        finally:
+            self.btn_checkout.setEnabled(True)
+
+        if not result.get("success"):
+            QMessageBox.warning(self, "Erro", result.get("error", "Erro ao registrar venda"))
+            return
+
+        QMessageBox.information(
+            self,
+            "Sucesso",
+            f"Venda #{result['venda_id']} registrada\nTotal: R$ {result['total']:.2f}"
+        )
+        self.cart = []
+        self._refresh_cart()
+        self._clear_form()
+        self.load_products()
+
     def _on_fiado_changed(self):
         checked = self.fiado_checkbox.isChecked()
         if checked and self.type_combo.currentText() != "SAIDA":
@@ -281,6 +448,40 @@ class StockWindow(QWidget):
         if dlg.exec():
             # atualiza lista de produtos/estoque visível
             self.load_products()
+
+    def _reserve(self):
+        """Reserva a quantidade do formulário para um cliente."""
+        produto_id = self.product_combo.currentData()
+        if produto_id is None:
+            QMessageBox.warning(self, "Aviso", "Selecione um produto")
+            return
+
+        cliente = self.cliente_input.text().strip()
+        if not cliente:
+            cliente, ok = QInputDialog.getText(self, "Reservar", "Nome do cliente:")
+            if not ok:
+                return
+
+        resp = self.reserva_controller.reservar(
+            produto_id=produto_id,
+            quantidade=self.quantity_input.value(),
+            cliente=cliente,
+            observacao=self.observation_input.toPlainText().strip()
+        )
+        if not resp["success"]:
+            QMessageBox.warning(self, "Erro", resp["error"])
+            return
+
+        QMessageBox.information(self, "Sucesso", f"Reserva #{resp['reserva_id']} registrada.")
+        self.load_products()
+
+    def _open_reserva_dialog(self):
+        from ui.dialogs.reserva_dialog import ReservaDialog
+
+        dlg = ReservaDialog(self)
+        dlg.exec()
+        self.load_products()
+
     def refresh(self):
         """Recarrega os dados quando a aba fica visível."""
         self.load_products()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 
 def format_date(value: str | None) -> str:
@@ -35,3 +35,26 @@ def format_date(value: str | None) -> str:
         return value
     except Exception:
         return value
+
+
+def to_date(value: date | datetime | str) -> date:
+    """Convert a date, datetime or ISO string ('YYYY-MM-DD[ HH:MM:SS]') into a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def day_range(start: date | datetime | str, end: date | datetime | str | None = None) -> tuple[str, str]:
+    """
+    Return half-open ISO bounds [start, end + 1 day) for an inclusive period of days.
+
+    Timestamps are stored as ISO text, so `col >= lower AND col < upper` selects
+    the same rows as `DATE(col) BETWEEN DATE(start) AND DATE(end)` while still
+    letting SQLite use an index on the column. With no end, the range is the
+    single day `start`.
+    """
+    start_day = to_date(start)
+    end_day = to_date(end) if end is not None else start_day
+    return start_day.isoformat(), (end_day + timedelta(days=1)).isoformat()
@@ -0,0 +1,16 @@
+import unicodedata
+
+
+def normalize_key(value: str | None) -> str:
+    """
+    Build a comparison key for free-text names (e.g. customers).
+
+    Accents are removed, case is folded and internal whitespace is collapsed,
+    so "José  da Silva", "jose da silva" and " JOSÉ DA SILVA " share a key.
+    """
+    if not value:
+        return ""
+
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(without_accents.casefold().split())